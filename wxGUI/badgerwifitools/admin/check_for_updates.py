@@ -7,11 +7,12 @@ from common import nl
 
 # Replace 'your_username/your_repo' with your actual GitHub repository details
 REPO_URL = "https://api.github.com/repos/nickjvturner/badgerwifi-git/commits/main"
+REQUEST_TIMEOUT = 10  # Seconds
 
 
 def get_latest_commit_sha():
     try:
-        response = requests.get(REPO_URL)
+        response = requests.get(REPO_URL, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         data = response.json()
         return data['sha']
@@ -0,0 +1,161 @@
+# ap_table.py
+
+import numpy as np
+
+from common import model_sort_order
+
+
+def encode_strings(values, sort_key=None):
+    """
+    Encode a sequence of strings as int32 codes into a sorted lookup table.
+
+    Codes follow the table's sort order, so sorting by code sorts by the string (or by sort_key when given).
+    Returns (codes, table).
+    """
+    table = sorted(set(values), key=sort_key)
+    index = {value: code for code, value in enumerate(table)}
+    codes = np.fromiter((index[value] for value in values), dtype=np.int32, count=len(values))
+    return codes, table
+
+
+def _float_column(values):
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+class APTable:
+    """
+    Columnar view of a project's APs for vectorised sorting, selection and range checks.
+
+    Row i describes records[i], the AP dicts the table was built from.
+    Numeric columns are float64 arrays, missing values are NaN.
+    String columns hold int32 codes into a parallel lookup table, e.g. models[table.model[i]].
+    """
+
+    STRING_COLUMNS = {
+        'floor': 'floor_ids',
+        'floor_name': 'floor_names',
+        'model': 'models',
+        'color': 'colors',
+        'mounting': 'mountings',
+    }
+
+    def __init__(self, records, floor_ids, floor_names, models, colors, antenna_heights, antenna_tilts, antenna_directions, mountings):
+        self.records = records
+        self.names = [ap['name'] for ap in records]
+        self.x = np.array([ap['location']['coord']['x'] for ap in records], dtype=np.float64)
+        self.y = np.array([ap['location']['coord']['y'] for ap in records], dtype=np.float64)
+        self.floor, self.floor_ids = encode_strings(floor_ids)
+        self.floor_name, self.floor_names = encode_strings(floor_names)
+        self.model, self.models = encode_strings(models, sort_key=lambda model: model_sort_order.get(model, model))
+        self.color, self.colors = encode_strings(colors)
+        self.mounting, self.mountings = encode_strings(mountings)
+        self.antenna_height = _float_column(antenna_heights)
+        self.antenna_tilt = _float_column(antenna_tilts)
+        self.antenna_direction = _float_column(antenna_directions)
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def from_access_points(cls, access_points, floor_plans_dict):
+        """Build from accessPoints.json records, radio columns are left empty."""
+        floor_ids = [ap['location']['floorPlanId'] for ap in access_points]
+        return cls(
+            access_points,
+            floor_ids,
+            [floor_plans_dict.get(floor_id, {}).get('name', '') for floor_id in floor_ids],
+            [ap.get('model', '') for ap in access_points],
+            [ap.get('color', 'none') for ap in access_points],
+            [None] * len(access_points),
+            [None] * len(access_points),
+            [None] * len(access_points),
+            [''] * len(access_points),
+        )
+
+    @classmethod
+    def from_model(cls, model):
+        """Build from a ProjectModel, antenna columns come from each AP's 5 GHz radio."""
+        access_points = model.access_points
+        return cls(
+            [ap.raw for ap in access_points],
+            [ap.raw['location']['floorPlanId'] for ap in access_points],
+            [ap.floor_name or '' for ap in access_points],
+            [ap.raw.get('model', '') for ap in access_points],
+            [ap.color for ap in access_points],
+            [ap.five_ghz_value('antennaHeight', None) for ap in access_points],
+            [ap.five_ghz_value('antennaTilt', None) for ap in access_points],
+            [ap.five_ghz_value('antennaDirection', None) for ap in access_points],
+            [ap.five_ghz_value('antennaMounting') for ap in access_points],
+        )
+
+    def code_of(self, column, value):
+        """Code of a string value within a column's lookup table, or -1 if no AP has it."""
+        table = getattr(self, self.STRING_COLUMNS[column])
+        try:
+            return table.index(value)
+        except ValueError:
+            return -1
+
+    def where(self, column, value):
+        """Boolean mask of the rows whose string column equals value."""
+        return getattr(self, column) == self.code_of(column, value)
+
+    def on_floor(self, floor_id):
+        """Row indices of the APs placed on a floor."""
+        return np.flatnonzero(self.where('floor', floor_id))
+
+    def isin(self, column, values):
+        """Boolean mask of the rows whose numeric column holds one of values, NaN never matches."""
+        return np.isin(getattr(self, column), np.asarray(values, dtype=np.float64))
+
+    def sort_order(self, *columns, rows=None):
+        """
+        Row indices sorted by the given columns, first column most significant.
+
+        A column is a column name or an array with one value per row. The sort is stable,
+        when rows is given those rows are reordered and ties keep their order in rows.
+        """
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        if not columns or not len(rows):
+            return rows
+        keys = tuple((getattr(self, column) if isinstance(column, str) else np.asarray(column))[rows] for column in reversed(columns))
+        return rows[np.lexsort(keys)]
+
+    def coordinate_groups(self, column, threshold, rows):
+        """
+        Band the APs of each floor along the x or y axis, bands are threshold wide starting from the floor's first AP.
+
+        rows must already be sorted by floor and coordinate. Returns (groups, boundaries), groups numbers each of
+        rows from 1 within its floor and boundaries holds the start of every band in order.
+        """
+        rows = np.asarray(rows)
+        if not len(rows):
+            return np.zeros(0, dtype=np.int64), []
+        values = getattr(self, column)[rows]
+        floors = self.floor[rows]
+
+        floor_changes = np.r_[True, floors[1:] != floors[:-1]]
+        floor_starts = np.flatnonzero(floor_changes)
+        floor_run = np.cumsum(floor_changes) - 1
+        offsets = values - values[floor_starts][floor_run]
+        groups = np.maximum(1, np.ceil(offsets / threshold)).astype(np.int64)
+
+        boundaries = []
+        for run, start in enumerate(floor_starts):
+            group_count = groups[floor_run == run].max()
+            boundaries.extend((values[start] + threshold * np.arange(group_count)).tolist())
+        return groups, boundaries
+
+    def value_counts(self, column):
+        """Count of APs per value of a column, NaN values are left out."""
+        data = getattr(self, column)
+        if column in self.STRING_COLUMNS:
+            table = getattr(self, self.STRING_COLUMNS[column])
+            counts = np.bincount(data, minlength=len(table))
+            return {value: int(count) for value, count in zip(table, counts) if count}
+        values, counts = np.unique(data[~np.isnan(data)], return_counts=True)
+        return dict(zip(values.tolist(), counts.tolist()))
+
+    def take(self, rows):
+        """The AP records for the given row indices."""
+        return [self.records[row] for row in rows]
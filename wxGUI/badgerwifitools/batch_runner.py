@@ -0,0 +1,205 @@
+# batch_runner.py
+
+import os
+import time
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from common import nl
+from common import project_source
+from job_executor import physical_memory, MEMORY_BUDGET_FRACTION
+
+BATCH_LOG_SUFFIX = '_batch_log.txt'
+BATCH_SUMMARY_PREFIX = 'batch_summary_'
+
+# Seconds between checks of the stop_event while waiting on projects
+BATCH_POLL_INTERVAL = 0.5
+
+# Batch step outcomes
+STEP_OK = 'ok'
+STEP_FAILED = 'failed'
+STEP_SKIPPED = 'skipped'
+STEP_CANCELLED = 'cancelled'
+
+# Set in each worker process, shared with the parent so a cancelled batch stops running projects
+_cancel_flag = None
+
+
+def _init_worker(cancel_flag):
+    global _cancel_flag
+    _cancel_flag = cancel_flag
+
+
+def batch_log_path(esx_filepath):
+    esx_filepath = Path(esx_filepath).resolve()
+    return esx_filepath.parent / 'OUTPUT' / f'{esx_filepath.stem}{BATCH_LOG_SUFFIX}'
+
+
+def map_render_memory(esx_filepaths, actions, options, message_callback):
+    """Peak bytes the largest project's map rendering needs, 0 when the pipeline renders no maps."""
+    from map_creator.map_creator_comon import estimate_render_memory
+    from map_creator.create_ap_location_maps import RENDER_IMAGES_HELD as AP_LOCATION_MAP_IMAGES_HELD
+    from map_creator.create_zoomed_ap_location_maps import RENDER_IMAGES_HELD as ZOOMED_AP_MAP_IMAGES_HELD
+    from map_creator.create_pds_maps import RENDER_IMAGES_HELD as PDS_MAP_IMAGES_HELD
+    from esx_project import EsxProject
+
+    images_held = max([{'maps': AP_LOCATION_MAP_IMAGES_HELD, 'zoomed-maps': ZOOMED_AP_MAP_IMAGES_HELD,
+                        'pds-maps': PDS_MAP_IMAGES_HELD}.get(action, 0) for action in actions])
+    if not images_held:
+        return 0
+
+    largest = 0
+    for esx_filepath in esx_filepaths:
+        esx_filepath = Path(esx_filepath)
+        esx_project = None
+        try:
+            if not options.from_directory:
+                esx_project = EsxProject(esx_filepath)
+            project_dir = project_source(esx_filepath.parent, esx_filepath.stem, esx_project)
+            largest = max(largest, estimate_render_memory(project_dir, images_held, message_callback))
+        except (OSError, KeyError, ValueError):
+            # Unreadable projects fail in their own worker, they don't limit the others
+            continue
+        finally:
+            if esx_project is not None:
+                esx_project.close()
+    return largest
+
+
+def batch_worker_count(esx_filepaths, actions, options, message_callback, max_workers=None):
+    """
+    Projects run at once: one per CPU, capped so every worker can render its largest floor plan
+    within the same share of physical memory the job executor admits jobs against.
+    """
+    workers = min(max_workers or os.cpu_count() or 1, len(esx_filepaths))
+    render_memory = map_render_memory(esx_filepaths, actions, options, message_callback)
+    total_memory = physical_memory()
+    if render_memory and total_memory:
+        memory_workers = max(1, int(total_memory * MEMORY_BUDGET_FRACTION) // render_memory)
+        if memory_workers < workers:
+            message_callback(f'Running {memory_workers} project(s) at once, map rendering needs up to {render_memory / 1048576:.0f} MB per project')
+            workers = memory_workers
+    return max(1, workers)
+
+
+def run_project_pipeline(esx_filepath, actions, options):
+    """
+    Run actions in order on one project, in a worker process. Messages go to the project's batch log.
+
+    An action that fails ends the pipeline, the remaining actions are skipped.
+    Returns a picklable summary, {'project', 'log', 'ok', 'seconds', 'steps': [(action, outcome, seconds)]}.
+    """
+    from launcher import ConsoleReporter, run_command
+    from message_sink import INFO, DETAIL
+    import threading
+
+    stop_event = _cancel_flag if _cancel_flag is not None else threading.Event()
+    log_path = batch_log_path(esx_filepath)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    steps = []
+    started = time.perf_counter()
+
+    with open(log_path, 'w', encoding='utf-8') as log_file:
+        reporter = ConsoleReporter(log_file, DETAIL if options.verbose else INFO)
+        reporter.message(f'Batch of {", ".join(actions)} on {esx_filepath}, started {time.strftime("%Y-%m-%d %H:%M:%S")}')
+        for action in actions:
+            if stop_event.is_set():
+                steps.append((action, STEP_CANCELLED, 0.0))
+                continue
+            if steps and steps[-1][1] != STEP_OK:
+                steps.append((action, STEP_SKIPPED, 0.0))
+                continue
+            reporter.message(f'{nl}### {action} ###')
+            action_started = time.perf_counter()
+            ok = run_command(action, esx_filepath, options, reporter, stop_event)
+            outcome = STEP_CANCELLED if stop_event.is_set() else STEP_OK if ok else STEP_FAILED
+            steps.append((action, outcome, time.perf_counter() - action_started))
+
+    return {'project': str(esx_filepath), 'log': str(log_path), 'ok': all(outcome == STEP_OK for _, outcome, _ in steps),
+            'seconds': time.perf_counter() - started, 'steps': steps}
+
+
+def format_batch_summary(results, actions):
+    """A text table, one row per project and one column per action."""
+    name_width = max([len('Project')] + [len(Path(result['project']).name) for result in results])
+    columns = [max(len(action), 14) for action in actions]
+    lines = ['  '.join(['Project'.ljust(name_width)] + [action.ljust(width) for action, width in zip(actions, columns)] + ['Total'])]
+    for result in results:
+        cells = [Path(result['project']).name.ljust(name_width)]
+        for (action, outcome, seconds), width in zip(result['steps'], columns):
+            cells.append((f'{outcome} {seconds:.1f}s' if outcome in (STEP_OK, STEP_FAILED) else outcome).ljust(width))
+        cells.append(f"{result['seconds']:.1f}s")
+        lines.append('  '.join(cells))
+    completed = sum(1 for result in results if result['ok'])
+    lines.append(f'{nl}{completed} of {len(results)} project(s) completed')
+    for result in results:
+        if not result['ok']:
+            lines.append(f"Not completed: {result['project']}, " + (f"see {result['log']}" if result['log'] else result['reason']))
+    return nl.join(lines)
+
+
+def unrun_result(esx_filepath, actions, reason, cancelled=False):
+    """Summary for a project whose pipeline never ran, cancelled while queued or lost with its worker process."""
+    if cancelled:
+        steps = [(action, STEP_CANCELLED, 0.0) for action in actions]
+    else:
+        steps = [(action, STEP_FAILED if number == 0 else STEP_SKIPPED, 0.0) for number, action in enumerate(actions)]
+    return {'project': str(esx_filepath), 'log': None, 'reason': str(reason), 'ok': False, 'seconds': 0.0, 'steps': steps}
+
+
+def run_batch(esx_filepaths, actions, options, message_callback, max_workers=None, stop_event=None, report_dir=None):
+    """
+    Run a pipeline of launcher commands on each project, projects in parallel across a process pool.
+
+    Each project writes its own log to OUTPUT beside its .esx. A summary table is logged and saved to
+    report_dir, by default the first project's OUTPUT directory. Setting stop_event drops the projects
+    still queued and asks running ones to stop. Returns the per project summaries in the order given.
+    """
+    esx_filepaths = list(dict.fromkeys(Path(esx_filepath).resolve() for esx_filepath in esx_filepaths))
+    if not esx_filepaths:
+        message_callback('No .esx files to batch process')
+        return []
+
+    workers = batch_worker_count(esx_filepaths, actions, options, message_callback, max_workers)
+    message_callback(f'Batch: {" > ".join(actions)} on {len(esx_filepaths)} project(s), {workers} at a time{nl}')
+
+    # Spawned rather than forked, forking a process running a GUI toolkit and worker threads is unsafe
+    context = multiprocessing.get_context('spawn')
+    cancel_flag = context.Event()
+    results = {}
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(cancel_flag,)) as pool:
+        futures = {pool.submit(run_project_pipeline, esx_filepath, actions, options): esx_filepath for esx_filepath in esx_filepaths}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=BATCH_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                esx_filepath = futures[future]
+                if future.cancelled():
+                    result = unrun_result(esx_filepath, actions, 'cancelled before it started', cancelled=True)
+                else:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = unrun_result(esx_filepath, actions, e)
+                results[esx_filepath] = result
+                status = 'completed' if result['ok'] else 'FAILED'
+                message_callback(f"{esx_filepath.name} {status} in {result['seconds']:.1f}s ({len(results)}/{len(esx_filepaths)})")
+            if stop_event is not None and stop_event.is_set() and not cancel_flag.is_set():
+                message_callback('Stopping batch, queued projects are dropped')
+                cancel_flag.set()
+                for future in pending:
+                    future.cancel()
+
+    ordered = [results[esx_filepath] for esx_filepath in esx_filepaths]
+    summary = format_batch_summary(ordered, actions)
+    message_callback(f'{nl}### BATCH SUMMARY ###{nl}{summary}{nl}Batch finished in {time.perf_counter() - started:.1f}s')
+
+    report_dir = Path(report_dir) if report_dir else esx_filepaths[0].parent / 'OUTPUT'
+    report_dir.mkdir(parents=True, exist_ok=True)
+    report_path = report_dir / f'{BATCH_SUMMARY_PREFIX}{time.strftime("%Y%m%d-%H%M%S")}.txt'
+    report_path.write_text(summary + nl, encoding='utf-8')
+    message_callback(f'Summary saved to {report_path}')
+    return ordered
@@ -1,12 +1,23 @@
 # replacement_dict.py
 
 import os
-import wx
 import json
 import shutil
 from pathlib import Path
 import importlib.util
-import base64
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import fast_json
+from esx_project import EsxProject
+from esx_archive import find_modified_members
+from esx_archive import rebundle_esx_incremental
+from information_elements import cached_information_elements
+from information_elements import parse_information_elements
+from information_elements import format_supported_rates
+from message_sink import post_detail
 
 
 # Constants
@@ -81,6 +92,12 @@ UNII_2_channels = [52, 56, 60, 64]
 UNII_2e_channels = list(range(100, 145, 4)) + [144]
 UNII_3_channels = [149, 153, 157, 161, 165, 169, 173]
 
+# 6 GHz UNII bands, the channel numbers overlap those of 2.4 and 5 GHz
+UNII_5_channels = [2] + list(range(1, 94, 4))
+UNII_6_channels = list(range(97, 114, 4))
+UNII_7_channels = list(range(117, 182, 4))
+UNII_8_channels = list(range(185, 234, 4))
+
 wifi_channel_dict = {
     2412: 1,
     2417: 2,
@@ -192,15 +209,88 @@ frequency_band_dict = {
 antenna_band_references = (' BLE', ' 2.4GHz', ' 5GHz', ' 6GHz')
 
 
-def load_json(project_dir, filename, message_callback):
-    """Load JSON data from a file."""
+# Parsed JSON documents keyed by file path, an entry is only reused while the file's mtime and size are unchanged
+JSON_CACHE_MAX_ENTRIES = 32
+_json_cache = OrderedDict()
+_json_cache_lock = threading.Lock()
+
+
+def file_signature(file_path):
+    """(mtime_ns, size) of a file, or None if it does not exist. Used to detect changes without re-reading."""
     try:
-        with open(project_dir / filename) as json_file:
-            return json.load(json_file)
-    except IOError as e:
-        print(f'{filename} not found, the project probably does not contain this data type.')
-        # print(f"Non-critical error{nl}{filename}: {e}")
+        stat = os.stat(file_path)
+    except OSError:
         return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load_json_cached(file_path):
+    signature = file_signature(file_path)
+    if signature is None:
+        raise FileNotFoundError(file_path)
+    cache_key = str(Path(file_path).resolve())
+
+    with _json_cache_lock:
+        cached = _json_cache.get(cache_key)
+        if cached and cached[0] == signature:
+            _json_cache.move_to_end(cache_key)
+            return cached[1]
+
+    data = fast_json.load_file(file_path)
+
+    with _json_cache_lock:
+        _json_cache[cache_key] = (signature, data)
+        _json_cache.move_to_end(cache_key)
+        while len(_json_cache) > JSON_CACHE_MAX_ENTRIES:
+            _json_cache.popitem(last=False)
+    return data
+
+
+def clear_json_cache():
+    with _json_cache_lock:
+        _json_cache.clear()
+
+
+def load_json(project_dir, filename, message_callback, mutable=False):
+    """
+    Load JSON data from an unpacked project directory or an EsxProject archive.
+
+    Parsed documents are cached and shared between callers, treat them as read-only.
+    Callers that modify the data must pass mutable=True to receive their own copy.
+    """
+    if isinstance(project_dir, EsxProject):
+        data = project_dir.load_json(filename)
+    else:
+        try:
+            data = _load_json_cached(project_dir / filename)
+        except IOError as e:
+            print(f'{filename} not found, the project probably does not contain this data type.')
+            # print(f"Non-critical error{nl}{filename}: {e}")
+            return None
+
+    if mutable and data is not None:
+        return fast_json.copy_json(data)
+    return data
+
+
+def project_source(working_directory, project_name, esx_project=None):
+    """What the project readers take as project_dir, the EsxProject when one is open, else the unpacked project directory."""
+    return esx_project if esx_project else Path(working_directory) / project_name
+
+
+def open_project_image(project_dir, image_id):
+    """Open an image from an unpacked project directory or an EsxProject archive as a byte stream."""
+    if isinstance(project_dir, EsxProject):
+        return project_dir.open_image(image_id)
+    return open(project_dir / f'image-{image_id}', 'rb')
+
+
+def copy_project_image(project_dir, image_id, destination):
+    """Copy an image from an unpacked project directory or an EsxProject archive to the destination path."""
+    if isinstance(project_dir, EsxProject):
+        project_dir.copy_image(image_id, destination)
+    else:
+        shutil.copy(project_dir / f'image-{image_id}', destination)
 
 
 def create_floor_plans_dict(floor_plans_json):
@@ -340,6 +430,8 @@ def offender_constructor(required_tag_keys, optional_tag_keys):
         'missing_optional_tags': {},
         'antennaTilt': [],
         'antennaMounting_and_antennaTilt_mismatch': [],
+        'ap_proximity': [],
+        'ap_proximity_unscaled_floors': [],
 
     }
 
@@ -352,15 +444,83 @@ def offender_constructor(required_tag_keys, optional_tag_keys):
     return offenders
 
 
-def save_and_move_json(data, file_path):
-    """Save the updated access points to a JSON file."""
-    with open(file_path, "w") as outfile:
-        json.dump(data, outfile, indent=4)
+JSON_COMPACT_SEPARATORS = (',', ':')
+JSON_INDENT = 4
+
+
+@contextmanager
+def atomic_write(file_path, encoding='utf-8'):
+    """
+    Write to a temporary file alongside file_path, moving it into place only once writing has completed.
 
+    A crash or exception mid-write leaves the existing file untouched.
+    """
+    file_path = Path(file_path)
+    fd, temp_path = tempfile.mkstemp(dir=file_path.parent, prefix=f'.{file_path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding=encoding) as outfile:
+            yield outfile
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        if file_path.exists():
+            shutil.copymode(file_path, temp_path)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+def save_and_move_json(data, file_path, compact=True):
+    """Save the updated access points to a JSON file, compact drops the indentation and whitespace."""
+    with atomic_write(file_path) as outfile:
+        if compact:
+            json.dump(data, outfile, separators=JSON_COMPACT_SEPARATORS, ensure_ascii=False)
+        else:
+            json.dump(data, outfile, indent=JSON_INDENT)
+
+
+def save_json_records(records, file_path, root_key='accessPoints', compact=True):
+    """
+    Stream an iterable of records to a JSON file in the form {root_key: [record, ...]}.
+
+    Each record is encoded as it is consumed, so a generator can be passed and the list is never built in full.
+    """
+    with atomic_write(file_path) as outfile:
+        if compact:
+            outfile.write(f'{{{json.dumps(root_key)}:[')
+            for index, record in enumerate(records):
+                if index:
+                    outfile.write(',')
+                json.dump(record, outfile, separators=JSON_COMPACT_SEPARATORS, ensure_ascii=False)
+            outfile.write(']}')
+        else:
+            record_indent = ' ' * JSON_INDENT * 2
+            outfile.write(f'{{{nl}{" " * JSON_INDENT}{json.dumps(root_key)}: [')
+            for index, record in enumerate(records):
+                outfile.write(f'{"," if index else ""}{nl}{record_indent}')
+                outfile.write(json.dumps(record, indent=JSON_INDENT).replace(nl, nl + record_indent))
+            outfile.write(f'{nl}{" " * JSON_INDENT}]{nl}}}')
 
-def re_bundle_project(project_dir, output_dir, output_name):
-    """Re-bundle the project directory into an .esx file."""
+
+def re_bundle_project(project_dir, output_dir, output_name, source_esx=None, modified_members=None):
+    """
+    Re-bundle the project directory into an .esx file.
+
+    When the original .esx is supplied, unchanged members are copied across without recompression.
+    modified_members lists the member names written since unpacking, if omitted the project
+    directory is compared against the original archive.
+    """
     output_esx_path = output_dir / output_name
+
+    if source_esx and Path(source_esx).exists():
+        if modified_members is None:
+            modified_members, removed_members = find_modified_members(project_dir, source_esx)
+        else:
+            modified_members = {member_name: Path(project_dir) / member_name for member_name in modified_members}
+            removed_members = ()
+        rebundle_esx_incremental(source_esx, str(output_esx_path) + '.esx', modified_members, removed_members)
+        return
+
     shutil.make_archive(str(output_esx_path), 'zip', str(project_dir))
     output_zip_path = str(output_esx_path) + '.zip'
     output_esx_path = str(output_esx_path) + '.esx'
@@ -409,7 +569,7 @@ def rename_aps(sorted_ap_list, message_callback, floor_plans_dict):
         # Define new AP naming scheme
         new_ap_name = f'AP-{ap_sequence_number:03}'
 
-        wx.CallAfter(message_callback, f"{ap['name']} ][ {model_antenna_split(ap['model'])[0]} from: {floor_plans_dict.get(ap['location']['floorPlanId']).get('name')} ][ renamed: {new_ap_name}")
+        post_detail(message_callback, f"{ap['name']} ][ {model_antenna_split(ap['model'])[0]} from: {floor_plans_dict.get(ap['location']['floorPlanId']).get('name')} ][ renamed: {new_ap_name}")
 
         ap['name'] = new_ap_name
         ap_sequence_number += 1
@@ -418,20 +578,16 @@ def rename_aps(sorted_ap_list, message_callback, floor_plans_dict):
 
 
 def rename_process_completion_message(message_callback, output_project_name):
-    wx.CallAfter(message_callback, f"{nl}Modified accessPoints.json re-bundled into {output_project_name}.esx{nl}File saved within the 'OUTPUT' directory{nl}{nl}### PROCESS COMPLETE ###")
+    message_callback(f"{nl}Modified accessPoints.json re-bundled into {output_project_name}.esx{nl}File saved within the 'OUTPUT' directory{nl}{nl}### PROCESS COMPLETE ###")
 
 
 def discover_available_scripts(directory, ignore_files=("_", "common")):
     """
     General-purpose function to discover available Python script files in a specified directory.
-    Excludes files starting with underscores or 'common'.
+    Excludes files starting with underscores or 'common'. The listing is cached by the directory's plugin registry.
     """
-    script_dir = Path(__file__).resolve().parent / directory
-    available_scripts = []
-    for filename in os.listdir(script_dir):
-        if filename.endswith(".py") and not filename.startswith(ignore_files):
-            available_scripts.append(filename[:-3])
-    return sorted(available_scripts)
+    from plugin_registry import get_plugin_registry  # plugin_registry imports common
+    return get_plugin_registry(directory, ignore_files).names()
 
 
 def create_access_point_measurements_dict(access_point_measurements_json):
@@ -482,11 +638,19 @@ def create_measured_radios_dict(measured_radios_json, access_point_measurements_
     return measured_radios_dict
 
 
-def import_module_from_path(module_name, path_to_module):
-    spec = importlib.util.spec_from_file_location(module_name, path_to_module)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
+def deferred_import(module_name, function_name):
+    """
+    Stand-in for module_name.function_name that imports the module on its first call.
+
+    Keeps heavy dependencies (pandas, numpy, PIL...) out of startup, and when the stand-in is a
+    job target the import happens on the worker thread rather than the UI thread.
+    """
+    def call(*args, **kwargs):
+        return getattr(importlib.import_module(module_name), function_name)(*args, **kwargs)
+
+    call.__name__ = call.__qualname__ = function_name
+    call.__module__ = module_name
+    return call
 
 
 def get_ssid_and_mac(measured_radios):
@@ -517,134 +681,27 @@ def get_security_and_technologies(measured_radios):
     return '\n'.join(f"{security} {technologies}" for mac, security, technologies in sorted_access_points)
 
 
-def get_tx_power_from_ies(measured_radios):
-    # Extract MAC addresses and SSIDs from the dictionary
-    access_points = []
+def _sorted_by_mac(measured_radios):
+    """Measurements sorted by MAC address."""
+    return sorted(measured_radios.values(), key=lambda radio: radio['mac'])
 
-    for radio in measured_radios.values():
-        access_points.append((radio['mac'], radio['informationElements']))
 
-    # Sort the access points by MAC address
-    sorted_access_points = sorted(access_points)
-
-    # Format the output string
-    return '\n'.join(f"{decode_tx_power(informationElements)}" for mac, informationElements in sorted_access_points)
+def get_tx_power_from_ies(measured_radios):
+    # Format the output string, one line per MAC address in ascending order
+    return '\n'.join(f"{cached_information_elements(radio).tx_power}" for radio in _sorted_by_mac(measured_radios))
 
 
 def decode_tx_power(ie_base64):
-    # Decode the Base64-encoded IE string
-    ie_bytes = base64.b64decode(ie_base64)
-
-    index = 0
-    ie_length = len(ie_bytes)
-    tx_power = None  # Initialize transmit power as None
-
-    while index < ie_length:
-        # Ensure there are at least 2 bytes left for Element ID and Length
-        if index + 2 > ie_length:
-            break
-
-        element_id = ie_bytes[index]
-        length = ie_bytes[index + 1]
-        index += 2  # Move past Element ID and Length fields
-
-        # Ensure the data for the IE is within the bounds
-        if index + length > ie_length:
-            break
-
-        element_data = ie_bytes[index:index + length]
-
-        # Check if Element ID is 35 (TPC Report IE)
-        if element_id == 35:
-            if length >= 2:
-                tx_power_field = element_data[0]
-                link_margin = element_data[1]
-
-               # The Transmit Power field is an unsigned integer representing dBm
-                tx_power = tx_power_field  # in dBm
-                print(f"Transmit Power: {tx_power} dBm")
-        index += length  # Move to the next IE
-
-    if tx_power is None:
-        print("Element ID 35 (TPC Report IE) not found or does not contain transmit power.")
-    return tx_power
+    return parse_information_elements(ie_base64).tx_power
 
 
 def get_supported_rates_from_ies(measured_radios):
-    # Extract MAC addresses and SSIDs from the dictionary
-    access_points = []
-
-    for radio in measured_radios.values():
-        access_points.append((radio['mac'], radio['informationElements']))
-
-    # Sort the access points by MAC address
-    sorted_access_points = sorted(access_points)
-
-    # Format the output string
-    return '\n'.join(f"{decode_supported_data_rates(informationElements)}" for mac, informationElements in sorted_access_points)
+    # Format the output string, one line per MAC address in ascending order
+    return '\n'.join(format_supported_rates(cached_information_elements(radio).supported_rates) for radio in _sorted_by_mac(measured_radios))
 
 
 def decode_supported_data_rates(ie_base64):
-    # Decode the Base64-encoded IE string
-    ie_bytes = base64.b64decode(ie_base64)
-
-    index = 0
-    ie_length = len(ie_bytes)
-    supported_rates = []
-
-    while index < ie_length:
-        # Ensure there are at least 2 bytes left for Element ID and Length
-        if index + 2 > ie_length:
-            break
-
-        element_id = ie_bytes[index]
-        length = ie_bytes[index + 1]
-        index += 2  # Move past Element ID and Length fields
-
-        # Ensure the data for the IE is within the bounds
-        if index + length > ie_length:
-            break
-
-        element_data = ie_bytes[index:index + length]
-
-        # Check for Supported Rates IE (Element ID 1) and Extended Supported Rates IE (Element ID 50)
-        if element_id == 1 or element_id == 50:
-            for rate_byte in element_data:
-                rate = (rate_byte & 0x7F) * 0.5  # Rates are in units of 0.5 Mbps
-                # Check if the MSB is set; if so, it's a basic rate
-                is_basic = bool(rate_byte & 0x80)
-                supported_rates.append({'rate': rate, 'basic': is_basic})
-        index += length  # Move to the next IE
-
-    # Remove duplicates and sort rates in ascending order
-    unique_rates = {}
-    for rate_info in supported_rates:
-        rate = rate_info['rate']
-        is_basic = rate_info['basic']
-        # If the rate is already in the dict, mark it as basic if either occurrence is basic
-        if rate in unique_rates:
-            unique_rates[rate] = unique_rates[rate] or is_basic
-        else:
-            unique_rates[rate] = is_basic
-
-    # Sort the rates
-    sorted_rates = sorted(unique_rates.items())
-
-    # Create a list of rate strings
-    rates_display = []
-    for rate, is_basic in sorted_rates:
-        rate_str = f"{int(rate)}"
-        if is_basic:
-            rate_str += " (B)"
-        rates_display.append(rate_str)
-
-    # Join the rates into a single string
-    rates_output = ", ".join(rates_display)
-
-    # Output the supported data rates
-    print(rates_output)
-
-    return rates_output
+    return format_supported_rates(parse_information_elements(ie_base64).supported_rates)
 
 
 def extract_frequency_channel_and_width(data, band):
@@ -664,81 +721,77 @@ def extract_frequency_channel_and_width(data, band):
 
 
 def get_channel_from_ies(measured_radios):
-    # Extract MAC addresses and SSIDs from the dictionary
-    access_points = []
+    # Primary channel, from HE 6 GHz Operation on 6 GHz BSSs, else the DS Parameter Set or HT Operation
+    return '\n'.join(f"{cached_information_elements(radio).primary_channel}" for radio in _sorted_by_mac(measured_radios))
 
-    for radio in measured_radios.values():
-        access_points.append((radio['mac'], radio['informationElements']))
 
-    # Sort the access points by MAC address
-    sorted_access_points = sorted(access_points)
+def get_channel_width_from_ies(measured_radios):
+    # Format the output string, one line per MAC address in ascending order
+    return '\n'.join(f"{cached_information_elements(radio).channel_width}" for radio in _sorted_by_mac(measured_radios))
 
-    # Format the output string
-    return '\n'.join(f"{decode_channel(informationElements)}" for mac, informationElements in sorted_access_points)
 
+def get_standards_from_ies(measured_radios):
+    # Format the output string, one line per MAC address in ascending order
+    return '\n'.join('/'.join(cached_information_elements(radio).standards) or 'Legacy' for radio in _sorted_by_mac(measured_radios))
 
-def decode_channel(ie_base64):
-    # Decode the Base64-encoded IE string
-    ie_bytes = base64.b64decode(ie_base64)
 
-    index = 0
-    ie_length = len(ie_bytes)
-    channel = None  # Initialize channel as None
+def get_rsn_from_ies(measured_radios):
+    # Format the output string, one line per MAC address in ascending order
+    return '\n'.join(cached_information_elements(radio).security for radio in _sorted_by_mac(measured_radios))
 
-    while index < ie_length:
-        # Ensure there are at least 2 bytes left for Element ID and Length
-        if index + 2 > ie_length:
-            break
 
-        element_id = ie_bytes[index]
-        length = ie_bytes[index + 1]
-        index += 2  # Move past Element ID and Length fields
+def get_bss_load_from_ies(measured_radios):
+    # Associated stations and channel utilisation, blank where the BSS Load element is absent
+    lines = []
+    for radio in _sorted_by_mac(measured_radios):
+        record = cached_information_elements(radio)
+        lines.append(f"{record.station_count} / {record.channel_utilization}%" if record.station_count is not None else '')
+    return '\n'.join(lines)
 
-        # Ensure the data for the IE is within the bounds
-        if index + length > ie_length:
-            break
 
-        element_data = ie_bytes[index:index + length]
+def get_country_from_ies(*measured_radios):
+    # Country codes advertised across one or more bands, each listed once
+    countries = {cached_information_elements(radio).country for band in measured_radios for radio in band.values()}
+    return ', '.join(sorted(country for country in countries if country))
 
-        # Check if Element ID is 3 (DS Parameter Set)
-        if element_id == 3:
-            if length >= 1:
-                channel = element_data[0]
-                print(f"Channel: {channel}")
-                # Optionally, you can return here if only one occurrence is expected
-                # return channel
-        index += length  # Move to the next IE
 
-    if channel is None:
-        print("Element ID 3 (DS Parameter Set) not found or does not contain channel information.")
-    return channel
-
-
-def get_wifi_band_from_ie_channel(measured_radios):
-    # Extract MAC addresses and SSIDs from the dictionary
-    access_points = []
-
-    for radio in measured_radios.values():
-        access_points.append((radio['mac'], radio['informationElements']))
+def decode_channel(ie_base64):
+    return parse_information_elements(ie_base64).channel
 
-    # Sort the access points by MAC address
-    sorted_access_points = sorted(access_points)
 
-    # Format the output string
-    return '\n'.join(f"{lookup_wifi_band(decode_channel(informationElements))}" for mac, informationElements in sorted_access_points)
+def get_wifi_band_from_ie_channel(measured_radios, band=None):
+    # Format the output string, one line per MAC address in ascending order
+    # band is the measured radios bucket ('two', 'five' or 'six'), else the band each channel was resolved in is used
+    lines = []
+    for radio in _sorted_by_mac(measured_radios):
+        record = cached_information_elements(radio)
+        lines.append(f"{lookup_wifi_band(record.primary_channel, band or record.band)}")
+    return '\n'.join(lines)
 
 
-def lookup_wifi_band(channel):
+def lookup_wifi_band(channel, band=None):
     """
     Returns the Wi-Fi band for a given channel number.
 
     Parameters:
     - channel (int): The Wi-Fi channel number.
+    - band (str): 'six' for a 6 GHz channel, whose numbers overlap the 2.4 and 5 GHz ones.
 
     Returns:
     - str: The band in which the channel exists.
     """
 
+    if band == 'six':
+        if channel in UNII_5_channels:
+            return 'UNII-5'
+        elif channel in UNII_6_channels:
+            return 'UNII-6'
+        elif channel in UNII_7_channels:
+            return 'UNII-7'
+        elif channel in UNII_8_channels:
+            return 'UNII-8'
+        return 'Unknown or unsupported channel'
+
     if channel in ISM_channels:
         return 'ISM'
     elif channel in UNII_1_channels:
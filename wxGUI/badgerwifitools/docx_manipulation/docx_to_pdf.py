@@ -2,25 +2,20 @@
 
 from pathlib import Path
 
-import wx
-import threading
 from docx2pdf import convert
 
 from common import nl
+from job_executor import get_executor
 
 
-def convert_docx_to_pdf(docx_files, message_callback):
+def convert_docx_to_pdf(docx_files, message_callback, executor=None):
     """
     Converts a list of DOCX files to PDF format.
     """
-    # Wrapper function to run process in a separate thread
-    def run_in_thread():
-        convert_single_docx_to_pdf(docx_files, message_callback)
+    message_callback(f'{nl}DOCX to PDF conversion process started')
 
-    wx.CallAfter(message_callback, f'{nl}DOCX to PDF conversion process started')
-
-    # Start the long-running task in a separate thread
-    threading.Thread(target=run_in_thread).start()
+    # Queue on the shared job executor, docx2pdf can't be interrupted so the job is not cancellable
+    return (executor or get_executor()).submit('DOCX to PDF', convert_single_docx_to_pdf, (docx_files, message_callback), cancellable=False)
 
 
 def convert_single_docx_to_pdf(docx_files, message_callback):
@@ -40,6 +35,6 @@ def convert_single_docx_to_pdf(docx_files, message_callback):
 
         try:
             convert(str(docx_path), str(output_dir))
-            wx.CallAfter(message_callback, f'PDF created Successfully: {docx_path.name}{nl}')
+            message_callback(f'PDF created Successfully: {docx_path.name}{nl}')
         except Exception as e:
-            wx.CallAfter(message_callback, f'Error converting {docx_path.name}: {e}')
+            message_callback(f'Error converting {docx_path.name}: {e}')
@@ -1,29 +1,26 @@
 # insert_images.py
 
 from pathlib import Path
-import threading
 
-import wx
 from docx import Document
 from docx.shared import Mm
 
 from common import nl
+from message_sink import post_detail
+from progress import ProgressTracker
+from job_executor import get_executor
 
 from docx_manipulation.replacement_dict import image_search
 from docx_manipulation.replacement_dict import text_search
 
 
-def insert_images_threaded(docx_file, message_callback, progress_callback, stop_event):
-	# Wrapper function to run insert_images in a separate thread
-	def run_in_thread():
-		insert_images(docx_file, message_callback, progress_callback, stop_event)
-
-	# Start the long-running task in a separate thread
-	threading.Thread(target=run_in_thread).start()
+def insert_images_threaded(docx_file, message_callback, progress_callback, executor=None):
+	# Queue on the shared job executor, the job gets its own stop_event
+	return (executor or get_executor()).submit('Image insertion', insert_images, (docx_file, message_callback, progress_callback))
 
 
 def insert_images(docx_file, message_callback, progress_callback, stop_event):
-	wx.CallAfter(message_callback, f'Image Insertion process started')
+	message_callback(f'Image Insertion process started')
 
 	file = Path(docx_file)
 	working_directory = file.parent
@@ -37,7 +34,11 @@ def insert_images(docx_file, message_callback, progress_callback, stop_event):
 	# Keep track
 	image_insertion_points = 0
 
-	wx.CallAfter(message_callback, f'Searching file for image insertion points{nl}')
+	message_callback(f'Searching file for image insertion points{nl}')
+
+	# The total is only known once the insertion points are counted
+	progress = ProgressTracker(progress_callback, 'Image insertion', unit='image')
+	progress.phase('Counting image insertion points')
 
 	# count image insertions to be conducted
 	for table in document.tables:
@@ -46,7 +47,8 @@ def insert_images(docx_file, message_callback, progress_callback, stop_event):
 			for cell in row.cells:
 				for paragraph in cell.paragraphs:
 					if stop_event.is_set():
-						wx.CallAfter(message_callback, f'{nl}### PROCESS ABORTED ###')
+						message_callback(f'{nl}### PROCESS ABORTED ###')
+						progress.finish(cancelled=True)
 						return
 					if paragraph.text in ['Tilt:', 'Height:']:
 						# if the row contains 'Tilt' or 'Height' ignore, skip it
@@ -55,11 +57,11 @@ def insert_images(docx_file, message_callback, progress_callback, stop_event):
 						if str_prefix + key in paragraph.text:
 							if count_image_insertion_point:
 								image_insertion_points += 1
-								wx.CallAfter(progress_callback, f'counting image insertion strings: {image_insertion_points}')
 
 	total_image_insertion_points = int(image_insertion_points)
 
-	wx.CallAfter(message_callback, f'{nl}')
+	message_callback(f'{nl}')
+	progress.phase('Inserting images', total_image_insertion_points)
 
 	# progress counter
 	images_inserted = 0
@@ -71,18 +73,21 @@ def insert_images(docx_file, message_callback, progress_callback, stop_event):
 					for key in image_search.keys():
 						if str_prefix + key in paragraph.text:
 							if stop_event.is_set():
-								wx.CallAfter(message_callback, f'{nl}### PROCESS ABORTED ###')
+								message_callback(f'{nl}### PROCESS ABORTED ###')
+								progress.finish(cancelled=True)
 								return
 							paragraph.text = paragraph.text.replace(str_prefix + key, '')
 							picture_path = Path(__file__).resolve().parent / 'images' / image_search[key]['image']
 							paragraph.add_run().add_picture(str(picture_path), height=Mm(image_search[key]['height']))
 							images_inserted += 1
 							message = f"{key} image inserted, with height: {image_search[key]['height']} mm  ({images_inserted}/{total_image_insertion_points})"
-							wx.CallAfter(message_callback, message)
+							post_detail(message_callback, message)
+							progress.advance()
 
 	text_replacements = []
 
-	wx.CallAfter(message_callback, f'{nl}Searching for text replacement strings{nl}')
+	message_callback(f'{nl}Searching for text replacement strings{nl}')
+	progress.phase('Replacing text')
 
 	for table in document.tables:
 		for row in table.rows:
@@ -91,19 +96,23 @@ def insert_images(docx_file, message_callback, progress_callback, stop_event):
 					for key in text_search.keys():
 						if key in paragraph.text:
 							if stop_event.is_set():
-								wx.CallAfter(message_callback, f'{nl}### PROCESS ABORTED ###')
+								message_callback(f'{nl}### PROCESS ABORTED ###')
+								progress.finish(cancelled=True)
 								return
 							text_replacements.append(key)
 							paragraph.text = paragraph.text.replace(key, text_search[key])
-							# wx.CallAfter(progress_callback, f'text strings replaced: {len(text_replacements)}')
-							wx.CallAfter(message_callback, f'"{key}" replaced with "{text_search[key]}"')
+							message_callback(f'"{key}" replaced with "{text_search[key]}"')
 
 	# Create directory to hold output directories
 	output_dir = working_directory / 'OUTPUT'
 	output_dir.mkdir(parents=True, exist_ok=True)
 
-	wx.CallAfter(message_callback, f'{nl}{nl}### Please wait while file is saved ###{nl}')
-	document.save(output_dir / Path(file.stem + '-OUTPUT-IMAGES_ADDED.docx'))
+	message_callback(f'{nl}{nl}### Please wait while file is saved ###{nl}')
+	progress.phase('Saving')
+	output_path = output_dir / Path(file.stem + '-OUTPUT-IMAGES_ADDED.docx')
+	document.save(output_path)
+	progress.advance(0, output_path.stat().st_size)
+	progress.finish()
 
 	message_callback(f'* {images_inserted} images inserted *')
 	message_callback(f'* {len(text_replacements)} text strings replaced *')
@@ -1,12 +1,9 @@
 import pandas as pd
 from pathlib import Path
 
-from common import load_json
-from common import create_floor_plans_dict
-from common import create_tag_keys_dict
-from common import create_simulated_radios_dict
-from common import create_notes_dict
-from common import create_antenna_types_dict
+from common import project_source
+
+from project_model import load_project_model
 
 nl = '\n'
 
@@ -37,30 +34,18 @@ def format_headers(df, writer):
         worksheet.write(0, idx, col, header_format)
 
 
-def create_ap_list(working_directory, project_name, message_callback, create_custom_ap_list):
+def create_ap_list(working_directory, project_name, message_callback, create_custom_ap_list, esx_project=None):
     message_callback(f'Generating BoM XLSX for: {project_name}\n')
-    project_dir = Path(working_directory) / project_name
-
-    # Load JSON data
-    floor_plans_json = load_json(project_dir, 'floorPlans.json', message_callback)
-    access_points_json = load_json(project_dir, 'accessPoints.json', message_callback)
-    simulated_radios_json = load_json(project_dir, 'simulatedRadios.json', message_callback)
-    antenna_types_json = load_json(project_dir, 'antennaTypes.json', message_callback)
-    tag_keys_json = load_json(project_dir, 'tagKeys.json', message_callback)
-    notes_json = load_json(project_dir, 'notes.json', message_callback)
+    project_dir = project_source(working_directory, project_name, esx_project)
 
-    # Process data
-    floor_plans_dict = create_floor_plans_dict(floor_plans_json)
-    tag_keys_dict = create_tag_keys_dict(tag_keys_json)
-    simulated_radio_dict = create_simulated_radios_dict(simulated_radios_json)
-    antenna_types_dict = create_antenna_types_dict(antenna_types_json)
-    notes_dict = create_notes_dict(notes_json)
+    # Build or reuse the shared project model, project profiles receive its dict views
+    model = load_project_model(project_dir, message_callback)
 
-    custom_ap_list = create_custom_ap_list(access_points_json, floor_plans_dict, tag_keys_dict, simulated_radio_dict, antenna_types_dict, notes_dict)
+    custom_ap_list = create_custom_ap_list(model.access_points_json, model.floor_plans_dict, model.tag_keys_dict, model.simulated_radio_dict, model.antenna_types_dict, model.notes_dict)
 
     # Create a pandas dataframe and export to Excel
     df = pd.DataFrame(custom_ap_list)
-    output_filename = f'{project_dir} - AP List.xlsx'
+    output_filename = f'{Path(working_directory) / project_name} - AP List.xlsx'
 
     try:
         writer = pd.ExcelWriter(output_filename, engine='xlsxwriter')
@@ -1,27 +1,237 @@
 # backup_esx.py
 
-import shutil
+import os
+import json
+import base64
+import hashlib
+import zipfile
+import tempfile
 from pathlib import Path
 from datetime import datetime
 
+from esx_archive import COPY_CHUNK_SIZE
+from esx_archive import member_record_span
+
+BACKUP_OBJECTS_DIR = 'objects'
+BACKUP_MANIFEST_SUFFIX = '.esxbackup.json'
+BACKUP_MANIFEST_VERSION = 1
+
+
+def backup_folder_path(working_directory, esx_project_name):
+    return working_directory / f"{esx_project_name}_BACKUP"
+
+
+def _object_path(objects_dir, digest):
+    return objects_dir / digest[:2] / digest
+
+
+def _member_key(info):
+    """Identify a member's compressed data by its CRC and sizes, used to find it in the previous backup without reading it."""
+    return f'{info.CRC:08x}:{info.compress_size}:{info.file_size}:{info.compress_type}'
+
+
+def _load_previous_objects(backup_folder, objects_dir):
+    """Map member keys from the most recent backup manifest to the objects still holding their compressed data."""
+    manifest_paths = sorted(backup_folder.glob(f'*{BACKUP_MANIFEST_SUFFIX}'), key=lambda path: path.stat().st_mtime)
+    if not manifest_paths:
+        return {}
+    try:
+        with open(manifest_paths[-1], 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    previous_objects = {}
+    for segment in manifest.get('segments', []):
+        if 'member_key' in segment and _object_path(objects_dir, segment['object']).exists():
+            previous_objects[segment['member_key']] = segment['object']
+    return previous_objects
+
+
+def _read_chunks(fp, start, end):
+    fp.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = fp.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile('Unexpected end of archive')
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _hash_span(fp, start, end):
+    sha256 = hashlib.sha256()
+    for chunk in _read_chunks(fp, start, end):
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _store_span(objects_dir, fp, start, end):
+    """
+    Store a span of the archive under its SHA-256.
+
+    The span is hashed first and only copied into the store when no object has that digest yet.
+    Returns (digest, stored).
+    """
+    digest = _hash_span(fp, start, end)
+    object_path = _object_path(objects_dir, digest)
+    if object_path.exists():
+        return digest, False
+
+    object_path.parent.mkdir(parents=True, exist_ok=True)
+    sha256 = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=object_path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in _read_chunks(fp, start, end):
+                sha256.update(chunk)
+                f.write(chunk)
+        if sha256.hexdigest() != digest:
+            raise ValueError('.esx file changed while it was being backed up')
+        os.replace(temp_path, object_path)
+        return digest, True
+    finally:
+        Path(temp_path).unlink(missing_ok=True)
+
+
+def _inline_segment(data):
+    return {'inline': base64.b64encode(data).decode('ascii')}
+
+
+def _read_span(fp, start, end):
+    fp.seek(start)
+    return fp.read(end - start)
+
+
+def create_backup_manifest(esx_filepath, backup_folder):
+    """
+    Split the .esx into segments and store each member's compressed data once, by its SHA-256.
+
+    Members whose CRC and sizes match the previous backup reuse its object without being read.
+
+    Local headers, data descriptors and any gaps between members are kept inline in the manifest,
+    the central directory and member data are stored as objects. The segments reproduce the .esx byte for byte.
+    Returns (manifest, new_bytes) where new_bytes is the amount of data added to the store.
+    """
+    objects_dir = backup_folder / BACKUP_OBJECTS_DIR
+    previous_objects = _load_previous_objects(backup_folder, objects_dir)
+    segments = []
+    new_bytes = 0
+
+    with zipfile.ZipFile(esx_filepath, 'r') as zip_ref:
+        fp = zip_ref.fp
+        file_size = fp.seek(0, os.SEEK_END)
+        position = 0
+
+        for info in sorted(zip_ref.infolist(), key=lambda i: i.header_offset):
+            record_start, data_start, record_end = member_record_span(zip_ref, info)
+            data_end = data_start + info.compress_size
+
+            if record_start > position:
+                segments.append(_inline_segment(_read_span(fp, position, record_start)))
+            segments.append(_inline_segment(_read_span(fp, record_start, data_start)))
+
+            member_key = _member_key(info)
+            digest = previous_objects.get(member_key)
+            if digest is None:
+                digest, stored = _store_span(objects_dir, fp, data_start, data_end)
+                if stored:
+                    new_bytes += info.compress_size
+            segments.append({'object': digest, 'size': info.compress_size, 'member': info.filename, 'member_key': member_key})
+
+            if record_end > data_end:
+                segments.append(_inline_segment(_read_span(fp, data_end, record_end)))
+            position = record_end
+
+        # Central directory and end of central directory record
+        digest, stored = _store_span(objects_dir, fp, position, file_size)
+        if stored:
+            new_bytes += file_size - position
+        segments.append({'object': digest, 'size': file_size - position})
+
+    manifest = {
+        'version': BACKUP_MANIFEST_VERSION,
+        'source': Path(esx_filepath).name,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'size': file_size,
+        'segments': segments
+    }
+    return manifest, new_bytes
+
 
 def backup_esx(working_directory, esx_project_name, esx_filepath, message_callback):
     """
     Create a backup of .esx file in a new directory date and time stamped
+
+    Each backup is a small manifest, member data shared with earlier backups is only stored once.
+    Use restore_esx_backup to rebuild the .esx.
     """
 
     # Create a backup folder if it doesn't exist
-    backup_folder = working_directory / f"{esx_project_name}_BACKUP"
+    backup_folder = backup_folder_path(working_directory, esx_project_name)
     backup_folder.mkdir(parents=True, exist_ok=True)
 
-    # Generate a unique name for the backup .esx file with timestamp
+    # Generate a unique name for the backup manifest with timestamp
     current_time = datetime.now().strftime("%Y-%m-%d__%H-%M-%S")
-    backup_esx_filename = Path(f"{esx_filepath.stem}_backup_{current_time}.esx").name
-    backup_esx_path = backup_folder / backup_esx_filename
+    backup_manifest_filename = Path(f"{esx_filepath.stem}_backup_{current_time}{BACKUP_MANIFEST_SUFFIX}").name
+    backup_manifest_path = backup_folder / backup_manifest_filename
 
     try:
-        # Copy the original .esx file to the backup folder
-        shutil.copy2(esx_filepath, backup_esx_path)
-        message_callback(f"{esx_project_name}.esx file backed up to '{backup_esx_path}'.")
+        manifest, new_bytes = create_backup_manifest(esx_filepath, backup_folder)
+        with open(backup_manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        message_callback(f"{esx_project_name}.esx file backed up to '{backup_manifest_path}'.")
+        message_callback(f"{new_bytes / 1024 / 1024:.1f} MB of {manifest['size'] / 1024 / 1024:.1f} MB was new to the backup store.")
     except Exception as e:
         message_callback(f"Error backing up .esx file: {e}")
+
+
+def _copy_object(objects_dir, digest, output_file):
+    """Append a stored object to output_file, raising ValueError if its content no longer matches its SHA-256."""
+    sha256 = hashlib.sha256()
+    with open(_object_path(objects_dir, digest), 'rb') as object_file:
+        while chunk := object_file.read(COPY_CHUNK_SIZE):
+            sha256.update(chunk)
+            output_file.write(chunk)
+    if sha256.hexdigest() != digest:
+        raise ValueError(f"backup object {digest} is corrupt, its content does not match its SHA-256")
+
+
+def restore_esx_backup(backup_manifest_path, message_callback, output_path=None):
+    """
+    Rebuild the exact .esx described by a backup manifest.
+
+    By default the .esx is written next to the manifest, using the manifest's name.
+    """
+    backup_manifest_path = Path(backup_manifest_path)
+    objects_dir = backup_manifest_path.parent / BACKUP_OBJECTS_DIR
+    if output_path is None:
+        output_path = backup_manifest_path.with_name(backup_manifest_path.name[:-len(BACKUP_MANIFEST_SUFFIX)] + '.esx')
+    output_path = Path(output_path)
+
+    try:
+        with open(backup_manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != BACKUP_MANIFEST_VERSION:
+            raise ValueError(f"unsupported backup manifest version {manifest.get('version')}")
+
+        fd, temp_path = tempfile.mkstemp(dir=output_path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as output_file:
+                for segment in manifest['segments']:
+                    if 'inline' in segment:
+                        output_file.write(base64.b64decode(segment['inline']))
+                        continue
+                    _copy_object(objects_dir, segment['object'], output_file)
+
+                if output_file.tell() != manifest['size']:
+                    raise ValueError(f"restored size {output_file.tell()} does not match the backed up size {manifest['size']}")
+            os.replace(temp_path, output_path)
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+
+        message_callback(f"Backup restored to '{output_path}'.")
+        return output_path
+    except Exception as e:
+        message_callback(f"Error restoring backup: {e}")
+        return None
@@ -0,0 +1,252 @@
+# diff_esx.py
+
+from pathlib import Path
+
+from esx_project import EsxProject
+
+nl = '\n'
+
+# Record types compared by id, member name: top level key
+KEYED_MEMBERS = {
+    'floorPlans.json': 'floorPlans',
+    'accessPoints.json': 'accessPoints',
+    'simulatedRadios.json': 'simulatedRadios',
+    'tagKeys.json': 'tagKeys',
+    'notes.json': 'notes',
+}
+
+# Scalar values longer than this are reported as changed without printing them
+MAX_VALUE_LENGTH = 60
+
+
+def diff_members(project_a, project_b):
+    """Compare the zip CRC tables, returns (added, removed, changed) member names."""
+    members_a = {name: project_a.member_info(name) for name in project_a.member_names}
+    members_b = {name: project_b.member_info(name) for name in project_b.member_names}
+
+    added = sorted(members_b.keys() - members_a.keys())
+    removed = sorted(members_a.keys() - members_b.keys())
+    changed = sorted(
+        name for name in members_a.keys() & members_b.keys()
+        if (members_a[name].CRC, members_a[name].file_size) != (members_b[name].CRC, members_b[name].file_size)
+    )
+    return added, removed, changed
+
+
+def index_by_id(project, member_name):
+    """Index the records of a JSON member by id, an absent member yields an empty index."""
+    data = project.load_json(member_name)
+    if not data:
+        return {}
+    return {record['id']: record for record in data.get(KEYED_MEMBERS[member_name], [])}
+
+
+def diff_records(records_a, records_b):
+    """Compare two id indexes, returns (added_ids, removed_ids, changed_ids)."""
+    added = [record_id for record_id in records_b if record_id not in records_a]
+    removed = [record_id for record_id in records_a if record_id not in records_b]
+    changed = [record_id for record_id, record in records_b.items() if record_id in records_a and records_a[record_id] != record]
+    return added, removed, changed
+
+
+def changed_fields(record_a, record_b, ignore=('id',)):
+    """Top level keys whose values differ between two versions of a record."""
+    return [key for key in sorted(record_a.keys() | record_b.keys()) if key not in ignore and record_a.get(key) != record_b.get(key)]
+
+
+def describe_value(value):
+    text = str(value)
+    if isinstance(value, dict) or len(text) > MAX_VALUE_LENGTH:
+        return None
+    return text
+
+
+def describe_field_changes(record_a, record_b, fields):
+    descriptions = []
+    for field in fields:
+        old_value, new_value = describe_value(record_a.get(field)), describe_value(record_b.get(field))
+        if old_value is None or new_value is None:
+            descriptions.append(field)
+        else:
+            descriptions.append(f'{field}: {old_value} -> {new_value}')
+    return descriptions
+
+
+def diff_esx(esx_filepath_a, esx_filepath_b):
+    """
+    Compare two .esx project files.
+
+    Members with matching CRCs are skipped without being parsed, changed JSON members are
+    compared record by record using id indexes. Returns a dict describing the differences.
+    """
+    with EsxProject(esx_filepath_a) as project_a, EsxProject(esx_filepath_b) as project_b:
+        added_members, removed_members, changed_members = diff_members(project_a, project_b)
+        differing = set(added_members) | set(removed_members) | set(changed_members)
+
+        result = {
+            'added_members': added_members,
+            'removed_members': removed_members,
+            'changed_members': changed_members,
+        }
+
+        # Only parse the members whose CRC differs, the rest are known to be identical
+        indexes = {}
+        for member_name in KEYED_MEMBERS:
+            if member_name in differing:
+                indexes[member_name] = (index_by_id(project_a, member_name), index_by_id(project_b, member_name))
+
+        # Floor names are needed to describe APs even when floorPlans.json itself is unchanged
+        floors_a, floors_b = indexes.get('floorPlans.json') or (index_by_id(project_a, 'floorPlans.json'),) * 2
+        floor_name = lambda floor_id: (floors_b.get(floor_id) or floors_a.get(floor_id) or {}).get('name', floor_id)
+
+        if 'floorPlans.json' in indexes or any(name.startswith('image-') for name in changed_members):
+            result['floor_plans'] = diff_floor_plans(floors_a, floors_b, set(changed_members))
+
+        aps_a, aps_b = indexes.get('accessPoints.json') or (index_by_id(project_a, 'accessPoints.json'),) * 2
+        ap_name = lambda ap_id: (aps_b.get(ap_id) or aps_a.get(ap_id) or {}).get('name', ap_id)
+
+        if 'accessPoints.json' in indexes:
+            tag_keys = indexes.get('tagKeys.json') or (index_by_id(project_a, 'tagKeys.json'),) * 2
+            tag_key_names = {tag_id: tag['key'] for tag_key_index in tag_keys for tag_id, tag in tag_key_index.items()}
+            result['access_points'] = diff_access_points(aps_a, aps_b, floor_name, tag_key_names)
+
+        if 'simulatedRadios.json' in indexes:
+            result['radios'] = diff_radios(*indexes['simulatedRadios.json'], ap_name)
+
+        if 'tagKeys.json' in indexes:
+            result['tag_keys'] = diff_simple_records(*indexes['tagKeys.json'], lambda tag: tag.get('key'))
+
+        if 'notes.json' in indexes:
+            result['notes'] = diff_simple_records(*indexes['notes.json'], lambda note: note.get('text', '')[:MAX_VALUE_LENGTH])
+
+    return result
+
+
+def diff_floor_plans(floors_a, floors_b, changed_members):
+    added, removed, changed = diff_records(floors_a, floors_b)
+    result = {
+        'added': [floors_b[floor_id]['name'] for floor_id in added],
+        'removed': [floors_a[floor_id]['name'] for floor_id in removed],
+        'renamed': [],
+        'swapped': [],
+        'changed': [],
+    }
+
+    for floor_id in floors_b.keys() & floors_a.keys():
+        floor_a, floor_b = floors_a[floor_id], floors_b[floor_id]
+        if floor_a.get('name') != floor_b.get('name'):
+            result['renamed'].append(f"{floor_a.get('name')} -> {floor_b.get('name')}")
+
+        image_id = floor_b.get('imageId')
+        if floor_a.get('imageId') != image_id or f'image-{image_id}' in changed_members:
+            result['swapped'].append(floor_b.get('name'))
+
+        if floor_id in changed:
+            fields = changed_fields(floor_a, floor_b, ignore=('id', 'name', 'imageId', 'bitmapImageId'))
+            if fields:
+                result['changed'].append(f"{floor_b.get('name')} ({', '.join(describe_field_changes(floor_a, floor_b, fields))})")
+    return result
+
+
+def _ap_tags(ap, tag_key_names):
+    return {tag_key_names.get(tag.get('tagKeyId'), tag.get('tagKeyId')): tag.get('value') for tag in ap.get('tags', [])}
+
+
+def diff_access_points(aps_a, aps_b, floor_name, tag_key_names):
+    added, removed, changed = diff_records(aps_a, aps_b)
+    result = {
+        'added': [f"{aps_b[ap_id]['name']} on {floor_name(aps_b[ap_id].get('location', {}).get('floorPlanId'))}" for ap_id in added],
+        'removed': [f"{aps_a[ap_id]['name']} from {floor_name(aps_a[ap_id].get('location', {}).get('floorPlanId'))}" for ap_id in removed],
+        'moved': [],
+        'renamed': [],
+        'retagged': [],
+        'changed': [],
+    }
+
+    for ap_id in changed:
+        ap_a, ap_b = aps_a[ap_id], aps_b[ap_id]
+        name = ap_b['name']
+
+        location_a, location_b = ap_a.get('location', {}), ap_b.get('location', {})
+        if location_a.get('floorPlanId') != location_b.get('floorPlanId'):
+            result['moved'].append(f"{name}: {floor_name(location_a.get('floorPlanId'))} -> {floor_name(location_b.get('floorPlanId'))}")
+        elif location_a.get('coord') != location_b.get('coord'):
+            coord_a, coord_b = location_a.get('coord', {}), location_b.get('coord', {})
+            dx = coord_b.get('x', 0) - coord_a.get('x', 0)
+            dy = coord_b.get('y', 0) - coord_a.get('y', 0)
+            result['moved'].append(f"{name}: on {floor_name(location_b.get('floorPlanId'))} by ({dx:+.1f}, {dy:+.1f})")
+
+        if ap_a['name'] != name:
+            result['renamed'].append(f"{ap_a['name']} -> {name}")
+
+        if ap_a.get('tags') != ap_b.get('tags'):
+            tags_a, tags_b = _ap_tags(ap_a, tag_key_names), _ap_tags(ap_b, tag_key_names)
+            tag_changes = [f'{key}: {tags_a.get(key)} -> {tags_b.get(key)}' for key in sorted(tags_a.keys() | tags_b.keys(), key=str) if tags_a.get(key) != tags_b.get(key)]
+            if tag_changes:
+                result['retagged'].append(f"{name} ({', '.join(tag_changes)})")
+
+        fields = changed_fields(ap_a, ap_b, ignore=('id', 'name', 'location', 'tags'))
+        if fields:
+            result['changed'].append(f"{name} ({', '.join(describe_field_changes(ap_a, ap_b, fields))})")
+    return result
+
+
+def diff_radios(radios_a, radios_b, ap_name):
+    added, removed, changed = diff_records(radios_a, radios_b)
+    radio_label = lambda radio: f"{ap_name(radio.get('accessPointId'))} radio {radio.get('accessPointIndex')}"
+    return {
+        'added': [radio_label(radios_b[radio_id]) for radio_id in added],
+        'removed': [radio_label(radios_a[radio_id]) for radio_id in removed],
+        'changed': [
+            f"{radio_label(radios_b[radio_id])} ({', '.join(describe_field_changes(radios_a[radio_id], radios_b[radio_id], changed_fields(radios_a[radio_id], radios_b[radio_id])))})"
+            for radio_id in changed
+        ],
+    }
+
+
+def diff_simple_records(records_a, records_b, label):
+    added, removed, changed = diff_records(records_a, records_b)
+    return {
+        'added': [label(records_b[record_id]) for record_id in added],
+        'removed': [label(records_a[record_id]) for record_id in removed],
+        'changed': [f'{label(records_a[record_id])} -> {label(records_b[record_id])}' for record_id in changed],
+    }
+
+
+SECTION_TITLES = {
+    'floor_plans': 'Floor plans',
+    'access_points': 'Access points',
+    'radios': 'Simulated radios',
+    'tag_keys': 'Tag keys',
+    'notes': 'Notes',
+}
+
+
+def diff_esx_projects(esx_filepath, other_esx_filepath, message_callback):
+    """Compare the current .esx against another revision and report the differences."""
+    esx_filepath, other_esx_filepath = Path(esx_filepath), Path(other_esx_filepath)
+    message_callback(f'Comparing {esx_filepath.name} -> {other_esx_filepath.name}{nl}')
+
+    try:
+        result = diff_esx(esx_filepath, other_esx_filepath)
+    except Exception as e:
+        message_callback(f'Failed to compare project files: {e}')
+        return None
+
+    if not (result['added_members'] or result['removed_members'] or result['changed_members']):
+        message_callback('Project files are identical')
+        return result
+
+    message_callback(f"Members added: {len(result['added_members'])}, removed: {len(result['removed_members'])}, changed: {len(result['changed_members'])}")
+
+    for section, title in SECTION_TITLES.items():
+        if section not in result:
+            continue
+        entries = [(change, item) for change, items in result[section].items() for item in items]
+        if not entries:
+            continue
+        message_callback(f'{nl}{title}')
+        for change, item in entries:
+            message_callback(f'  {change.replace("_", " ")}: {item}')
+
+    return result
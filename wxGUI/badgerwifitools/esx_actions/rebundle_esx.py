@@ -1,9 +1,13 @@
 # rebundle_esx.py
 
-import wx
 import shutil
 from pathlib import Path
 
+from esx_archive import find_modified_members
+from esx_archive import rebundle_esx_incremental
+from esx_actions.unpack_esx import load_unpack_manifest
+from esx_actions.unpack_esx import unpack_manifest_path
+
 nl = '\n'
 
 
@@ -11,17 +15,27 @@ def rebundle_project(working_directory, project_name, message_callback):
     """Re-bundle the project directory into an .esx file."""
 
     project_dir = working_directory / project_name
+    source_esx = Path(working_directory) / (project_name + '.esx')
 
     new_file_base_name = project_name + '_re-zip'
     new_file_name_zip = new_file_base_name + '.zip'
     new_file_name_esx = new_file_base_name + '.esx'
 
     try:
-        # Create a ZIP archive - shutil.make_archive adds the .zip extension automatically
-        shutil.make_archive(working_directory / new_file_base_name, 'zip', working_directory / project_name)
-        shutil.move(working_directory / new_file_name_zip, working_directory / new_file_name_esx)
-
-        wx.CallAfter(message_callback, f'{new_file_name_esx} successfully re-bundled into .esx file')
+        if source_esx.exists():
+            # Only recompress members that differ from the original .esx, copy everything else raw
+            # Members never extracted, e.g. after a JSON only unpack, are carried over from the original
+            extracted_members = load_unpack_manifest(unpack_manifest_path(working_directory, project_name)) or None
+            modified_members, removed_members = find_modified_members(project_dir, source_esx, extracted_members)
+            copied_count, written_count = rebundle_esx_incremental(
+                source_esx, working_directory / new_file_name_esx, modified_members, removed_members)
+            message_callback(f'{written_count} modified member(s) written, {copied_count} copied unchanged from {source_esx.name}')
+        else:
+            # Create a ZIP archive - shutil.make_archive adds the .zip extension automatically
+            shutil.make_archive(working_directory / new_file_base_name, 'zip', working_directory / project_name)
+            shutil.move(working_directory / new_file_name_zip, working_directory / new_file_name_esx)
+
+        message_callback(f'{new_file_name_esx} successfully re-bundled into .esx file')
     except Exception as e:
         print(e)
-        wx.CallAfter(message_callback, f"Error: Failed to re-bundle {project_name} into .esx file.")
+        message_callback(f"Error: Failed to re-bundle {project_name} into .esx file.")
@@ -1,20 +1,250 @@
 # unpack_esx.py
 
+import os
+import json
+import shutil
 import zipfile
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 nl = '\n'
 
+UNPACK_MANIFEST_SUFFIX = '_unpack_manifest.json'
+UNPACK_MANIFEST_VERSION = 1
 
-def unpack_esx_file(working_directory, project_name, esx_filepath, message_callback):
+# Member filters, ordered from narrowest to widest
+UNPACK_JSON_ONLY = 'json'
+UNPACK_JSON_AND_FLOOR_PLANS = 'json_floor_plans'
+UNPACK_EVERYTHING = 'everything'
+UNPACK_SCOPES = (UNPACK_JSON_ONLY, UNPACK_JSON_AND_FLOOR_PLANS, UNPACK_EVERYTHING)
+
+UNPACK_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def unpack_manifest_path(working_directory, project_name):
+    """The manifest is kept alongside the extracted directory, not inside it, so it is never re-bundled."""
+    return Path(working_directory) / f'{project_name}{UNPACK_MANIFEST_SUFFIX}'
+
+
+def load_unpack_manifest(manifest_path):
+    """Return the members recorded by a previous unpack, or an empty dict if there is no usable manifest."""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if manifest.get('version') != UNPACK_MANIFEST_VERSION:
+        return {}
+    return manifest.get('members', {})
+
+
+def save_unpack_manifest(manifest_path, esx_filepath, members):
+    manifest = {
+        'version': UNPACK_MANIFEST_VERSION,
+        'source': Path(esx_filepath).name,
+        'members': members
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4)
+
+
+def is_extracted_member_current(entry, info, file_path):
+    """Check the file on disk is exactly what was extracted for a member with the same CRC and size."""
+    if not entry or entry['crc'] != info.CRC or entry['size'] != info.file_size:
+        return False
+    try:
+        stat = file_path.stat()
+    except OSError:
+        return False
+    # A changed mtime means the file was edited after unpacking, restore it from the archive
+    return stat.st_size == entry['size'] and stat.st_mtime_ns == entry['mtime_ns']
+
+
+def manifest_entry(info, file_path):
+    return {
+        'size': info.file_size,
+        'crc': info.CRC,
+        'mtime_ns': file_path.stat().st_mtime_ns
+    }
+
+
+def find_sibling_extractions(working_directory, project_name):
+    """
+    Index members extracted for other projects in the same working directory by (CRC, size).
+
+    Lets a new revision of a project reuse identical members already on disk rather than decompress them again.
+    """
+    sibling_members = {}
+    for manifest_path in Path(working_directory).glob(f'*{UNPACK_MANIFEST_SUFFIX}'):
+        sibling_name = manifest_path.name[:-len(UNPACK_MANIFEST_SUFFIX)]
+        if sibling_name == project_name:
+            continue
+        sibling_dir = Path(working_directory) / sibling_name
+        for member_name, entry in load_unpack_manifest(manifest_path).items():
+            sibling_members.setdefault((entry['crc'], entry['size']), (sibling_dir / member_name, entry))
+    return sibling_members
+
+
+def unpack_scope_covers(unpacked_scope, required_scope):
+    """Return True if a project unpacked with unpacked_scope already contains everything required_scope needs."""
+    if unpacked_scope not in UNPACK_SCOPES:
+        return False
+    return UNPACK_SCOPES.index(unpacked_scope) >= UNPACK_SCOPES.index(required_scope)
+
+
+def floor_plan_image_names(zip_ref):
+    """Names of the image members referenced by floorPlans.json."""
+    try:
+        floor_plans_json = json.loads(zip_ref.read('floorPlans.json'))
+    except KeyError:
+        return set()
+
+    image_names = set()
+    for floor in floor_plans_json.get('floorPlans', []):
+        for image_key in ('imageId', 'bitmapImageId'):
+            if floor.get(image_key):
+                image_names.add(f'image-{floor[image_key]}')
+    return image_names
+
+
+def select_members(zip_ref, member_filter):
+    """Return the file members of the archive matched by the member filter."""
+    members = [info for info in zip_ref.infolist() if not info.is_dir()]
+
+    if member_filter == UNPACK_EVERYTHING:
+        return members
+    if member_filter == UNPACK_JSON_ONLY:
+        return [info for info in members if info.filename.endswith('.json')]
+    if member_filter == UNPACK_JSON_AND_FLOOR_PLANS:
+        image_names = floor_plan_image_names(zip_ref)
+        return [info for info in members if info.filename.endswith('.json') or info.filename in image_names]
+    raise ValueError(f'Unknown member filter: {member_filter}')
+
+
+class _ThreadLocalArchive:
+    """Give each worker thread its own handle on the archive, ZipFile reads are not safe to share across threads."""
+
+    def __init__(self, esx_filepath):
+        self.esx_filepath = esx_filepath
+        self._local = threading.local()
+        self._handles = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        zip_ref = getattr(self._local, 'zip_ref', None)
+        if zip_ref is None:
+            zip_ref = zipfile.ZipFile(self.esx_filepath, 'r')
+            self._local.zip_ref = zip_ref
+            with self._lock:
+                self._handles.append(zip_ref)
+        return zip_ref
+
+    def close(self):
+        for zip_ref in self._handles:
+            zip_ref.close()
+        self._handles.clear()
+
+
+def _extract_member(archive, info, project_dir, sibling_path):
+    """Extract a single member, copying it from a sibling project when an identical file already exists."""
+    file_path = project_dir / info.filename
+    if sibling_path:
+        shutil.copyfile(sibling_path, file_path)
+        reused = True
+    else:
+        archive.get().extract(info, project_dir)
+        reused = False
+    return manifest_entry(info, file_path), reused
+
+
+def unpack_esx_file(working_directory, project_name, esx_filepath, message_callback, member_filter=UNPACK_EVERYTHING, max_workers=UNPACK_MAX_WORKERS, stop_event=None):
     """
     Unpacks the specified .esx file into a directory.
+
+    member_filter selects which members are extracted: UNPACK_JSON_ONLY, UNPACK_JSON_AND_FLOOR_PLANS
+    or UNPACK_EVERYTHING. Members are inflated on a thread pool.
+
+    A manifest of member names, sizes and CRCs is written alongside the directory,
+    re-unpacking only extracts members that have changed or are missing on disk.
+    Setting stop_event abandons the members not yet extracted, the manifest is left as it was.
     """
 
     try:
         # Unzip the .esx project file into a folder named after the project_name
         message_callback(f'Unpacking .esx project: {project_name}')
+        project_dir = Path(working_directory) / project_name
+        manifest_path = unpack_manifest_path(working_directory, project_name)
+        previous_members = load_unpack_manifest(manifest_path)
+        sibling_members = None
+
+        members = {}
+        pending = []
+        extracted_count = 0
+        reused_count = 0
+        unchanged_count = 0
+
         with zipfile.ZipFile(esx_filepath, 'r') as zip_ref:
-            zip_ref.extractall(working_directory / project_name)
+            archive_members = {info.filename: info for info in zip_ref.infolist()}
+            selected_members = select_members(zip_ref, member_filter)
+
+        project_dir.mkdir(parents=True, exist_ok=True)
+
+        for info in selected_members:
+            file_path = project_dir / info.filename
+
+            if is_extracted_member_current(previous_members.get(info.filename), info, file_path):
+                members[info.filename] = previous_members[info.filename]
+                unchanged_count += 1
+                continue
+
+            if sibling_members is None:
+                sibling_members = find_sibling_extractions(working_directory, project_name)
+
+            sibling_path, sibling_entry = sibling_members.get((info.CRC, info.file_size), (None, None))
+            if sibling_path and not is_extracted_member_current(sibling_entry, info, sibling_path):
+                sibling_path = None
+
+            # Create directories up front so worker threads never race on them
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            pending.append((info, sibling_path))
+
+        archive = _ThreadLocalArchive(esx_filepath)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(_extract_member, archive, info, project_dir, sibling_path): info for info, sibling_path in pending}
+                for completed, future in enumerate(as_completed(futures), 1):
+                    if stop_event and stop_event.is_set():
+                        for pending_future in futures:
+                            pending_future.cancel()
+                        message_callback(f'{nl}### PROCESS ABORTED ###')
+                        return False
+                    info = futures[future]
+                    members[info.filename], reused = future.result()
+                    if reused:
+                        reused_count += 1
+                    else:
+                        extracted_count += 1
+                    message_callback(f'Extracted {info.filename} ({completed}/{len(pending)})')
+        finally:
+            archive.close()
+
+        # Members outside the filter keep their manifest entry while the extracted file is still intact
+        for member_name, entry in previous_members.items():
+            if member_name in members or member_name not in archive_members:
+                continue
+            if is_extracted_member_current(entry, archive_members[member_name], project_dir / member_name):
+                members[member_name] = entry
+
+        # Remove members extracted previously that no longer exist within the .esx
+        for member_name in previous_members.keys() - archive_members.keys():
+            (project_dir / member_name).unlink(missing_ok=True)
+
+        save_unpack_manifest(manifest_path, esx_filepath, members)
+
+        if unchanged_count or reused_count:
+            message_callback(f'{extracted_count} member(s) extracted, {reused_count} reused from other projects, {unchanged_count} already up to date')
         message_callback(f"Project successfully unzipped{nl}")
         return True
     except Exception as e:
@@ -1,17 +1,19 @@
 # validate_esx.py
 
-from common import load_json
-from common import create_floor_plans_dict
-from common import create_tag_keys_dict
-from common import create_simulated_radios_dict
+import numpy as np
+
 from common import offender_constructor
-from common import create_custom_ap_dict
 from common import acceptable_antenna_tilt_angles
-
-from common import FIVE_GHZ_RADIO_ID
+from common import project_source
 
 from common import nl, SPACER, PASS, FAIL, CAUTION, HASH_BAR
 
+from project_model import load_project_model
+from project_model import DUPLICATE_AP_NAME_MARKER
+
+# APs on the same floor closer than this are reported, in metres
+MIN_AP_SEPARATION = 1.0
+
 
 def validate_ap_name_formatting(offenders, total_ap_count, message_callback):
     message_callback(f"{SPACER}### AP NAME FORMATTING ###")
@@ -91,17 +93,34 @@ def validate_antenna_tilt(offenders, total_ap_count, message_callback):
     return True
 
 
-def validate_antenna_mounting_and_tilt_mismatch(offenders, total_ap_count, message_callback, custom_ap_dict):
+def validate_antenna_mounting_and_tilt_mismatch(offenders, total_ap_count, message_callback, access_points_by_name):
     message_callback(f"{SPACER}### ANTENNA MOUNTING AND TILT ###")
     if len(offenders.get('antennaMounting_and_antennaTilt_mismatch', [])) > 0:
         message_callback(f"{CAUTION}The following {len(offenders.get('antennaMounting_and_antennaTilt_mismatch', []))} APs may be configured incorrectly{nl}These APs are WALL mounted with 0 degrees of tilt, is this intentional?")
         for ap in offenders['antennaMounting_and_antennaTilt_mismatch']:
-            message_callback(f"{ap} | {custom_ap_dict[ap]['model']}")
+            message_callback(f"{ap} | {access_points_by_name[ap].model}")
         return True
     message_callback(f"{PASS}All {total_ap_count} APs have a conforming antenna mounting and tilt")
     return True
 
 
+def validate_ap_proximity(offenders, total_ap_count, message_callback):
+    message_callback(f"{SPACER}### AP PROXIMITY ###")
+    unscaled_floors = offenders.get('ap_proximity_unscaled_floors', [])
+    for floor_name in unscaled_floors:
+        message_callback(f"{CAUTION}{floor_name} has no scale set, AP proximity was not checked on this floor")
+    if len(offenders.get('ap_proximity', [])) > 0:
+        message_callback(f"{CAUTION}The following {len(offenders.get('ap_proximity', []))} pairs of APs are placed less than {MIN_AP_SEPARATION} metres apart, are any stacked or duplicated?")
+        for ap_pair in offenders['ap_proximity']:
+            message_callback(ap_pair)
+        return True
+    if unscaled_floors:
+        message_callback(f"{PASS}APs on the scaled floors are at least {MIN_AP_SEPARATION} metres from their neighbours")
+        return True
+    message_callback(f"{PASS}All {total_ap_count} APs are at least {MIN_AP_SEPARATION} metres from their neighbours")
+    return True
+
+
 def validate_view_as_mobile_disabled(project_configuration_json, message_callback):
     view_as_mobile = None
     for item in project_configuration_json["projectConfiguration"]["displayOptions"]:
@@ -126,63 +145,61 @@ def validate_ekahau_crop(floor_plans_json, message_callback):
         return True
 
 
-def validate_esx(working_directory, project_name, message_callback, required_tag_keys, optional_tag_keys):
+def validate_esx(working_directory, project_name, message_callback, required_tag_keys, optional_tag_keys, esx_project=None):
     message_callback(f'Performing Validation for: {project_name}')
 
-    project_dir = working_directory / project_name
+    project_dir = project_source(working_directory, project_name, esx_project)
 
-    # Load JSON data
-    floor_plans_json = load_json(project_dir, 'floorPlans.json', message_callback)
-    access_points_json = load_json(project_dir, 'accessPoints.json', message_callback)
-    simulated_radios_json = load_json(project_dir, 'simulatedRadios.json', message_callback)
-    tag_keys_json = load_json(project_dir, 'tagKeys.json', message_callback)
-    project_configuration_json = load_json(project_dir, 'projectConfiguration.json', message_callback)
-
-    # Process data
-    floor_plans_dict = create_floor_plans_dict(floor_plans_json)
-    tag_keys_dict = create_tag_keys_dict(tag_keys_json)
-    simulated_radio_dict = create_simulated_radios_dict(simulated_radios_json)
-
-    # Process access points
-    custom_ap_dict = create_custom_ap_dict(access_points_json, floor_plans_dict, simulated_radio_dict)
-
-    for ap in access_points_json['accessPoints']:
-        for tag in ap['tags']:
-            custom_ap_dict[ap['name']]['tags'][tag_keys_dict.get(tag['tagKeyId'])] = tag['value']
+    # Build or reuse the shared project model
+    model = load_project_model(project_dir, message_callback)
+    access_points_by_name = {ap.unique_name: ap for ap in model.access_points}
 
     offenders = offender_constructor(required_tag_keys, optional_tag_keys)
 
+    # Colour and 5 GHz antenna checks run over the whole AP table at once
+    table = model.ap_table
+    unique_names = [ap.unique_name for ap in model.access_points]
+
+    def names_where(mask):
+        return [unique_names[row] for row in np.flatnonzero(mask)]
+
+    offenders['color'].extend(names_where(table.where('color', 'none')))
+    offenders['antennaHeight'].extend(names_where(table.antenna_height == 2.4))
+    offenders['antennaTilt'].extend(names_where(~table.isin('antenna_tilt', acceptable_antenna_tilt_angles)))
+    offenders['antennaMounting_and_antennaTilt_mismatch'].extend(names_where(table.where('mounting', 'WALL') & (table.antenna_tilt == 0)))
+
+    # Stacked or duplicated placements, found per floor from the spatial index rather than comparing every pair of APs
+    for floor_id, floor_index in model.spatial_index.items():
+        floor = model.floor_plans.get(floor_id)
+        floor_name = floor.name if floor else floor_id
+        # Without a scale the distances are in pixels, a separation in metres means nothing there
+        if not floor_index.scaled:
+            offenders['ap_proximity_unscaled_floors'].append(floor_name)
+            continue
+        for row_a, row_b, distance in floor_index.pairs_within(MIN_AP_SEPARATION):
+            offenders['ap_proximity'].append(f"{unique_names[row_a]} | {unique_names[row_b]} | {distance:.2f}m | {floor_name}")
+
     # Count occurrences of each
-    for ap in custom_ap_dict.values():
+    for ap in model.access_points:
+        ap_name = ap.unique_name
+        ap_tags = ap.tag_values
 
-        if not ap['name'].startswith('AP-') or not ap['name'][3:].isdigit():
-            offenders['ap_name_format'].append(ap['name'])
+        if not ap_name.startswith('AP-') or not ap_name[3:].isdigit():
+            offenders['ap_name_format'].append(ap_name)
 
         # if an AP name contains string '_BW_DUPLICATE_AP_NAME_' it is not unique
-        if '_BW_DUPLICATE_AP_NAME_' in ap['name']:
-            offenders['ap_name_duplication'].append(ap['name'])
+        if DUPLICATE_AP_NAME_MARKER in ap_name:
+            offenders['ap_name_duplication'].append(ap_name)
 
-        if ap['color'] == 'none':
-            offenders['color'].append(ap['name'])
-
-        if ap['antennaHeight'] == 2.4:
-            offenders['antennaHeight'].append(ap['name'])
-
-        for radio in ap['radios'].values():
+        for radio in ap.radios.values():
             if radio.get('radioTechnology') == 'BLUETOOTH' and radio.get('enabled', False):
-                offenders['bluetooth'].append(ap['name'])
-
-        if ap.get('radios', {}).get(FIVE_GHZ_RADIO_ID, {}).get('antennaTilt') not in acceptable_antenna_tilt_angles:
-            offenders['antennaTilt'].append(ap['name'])
-
-        if ap.get('antennaMounting') == 'WALL' and ap.get('radios', {}).get(FIVE_GHZ_RADIO_ID, {}).get('antennaTilt') == 0:
-            offenders['antennaMounting_and_antennaTilt_mismatch'].append(ap['name'])
+                offenders['bluetooth'].append(ap_name)
 
         for tagKey in required_tag_keys:
-            if tagKey not in ap['tags']:
-                offenders['missing_required_tags'][tagKey].append(ap['name'])
+            if tagKey not in ap_tags:
+                offenders['missing_required_tags'][tagKey].append(ap_name)
 
-    total_ap_count = len(custom_ap_dict)
+    total_ap_count = len(model.access_points)
     total_required_tag_keys_count = len(required_tag_keys)
 
     # Perform all validations
@@ -193,9 +210,10 @@ def validate_esx(working_directory, project_name, message_callback, required_tag
         validate_height_manipulation(offenders, total_ap_count, message_callback),
         validate_required_tags(offenders, total_ap_count, total_required_tag_keys_count, required_tag_keys, message_callback),
         validate_antenna_tilt(offenders, total_ap_count, message_callback),
-        validate_antenna_mounting_and_tilt_mismatch(offenders, total_ap_count, message_callback, custom_ap_dict),
-        validate_view_as_mobile_disabled(project_configuration_json, message_callback),
-        validate_ekahau_crop(floor_plans_json, message_callback)
+        validate_antenna_mounting_and_tilt_mismatch(offenders, total_ap_count, message_callback, access_points_by_name),
+        validate_ap_proximity(offenders, total_ap_count, message_callback),
+        validate_view_as_mobile_disabled(model.project_configuration_json, message_callback),
+        validate_ekahau_crop(model.floor_plans_json, message_callback)
     ]
 
     # Print pass/fail states
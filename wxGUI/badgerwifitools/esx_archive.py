@@ -0,0 +1,351 @@
+# esx_archive.py
+
+import os
+import copy
+import time
+import zlib
+import struct
+import zipfile
+from pathlib import Path
+
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Local file header layout, see APPNOTE.TXT section 4.3.7
+LOCAL_HEADER_STRUCT = '<4s2B4HL2L2H'
+LOCAL_HEADER_SIZE = struct.calcsize(LOCAL_HEADER_STRUCT)
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+LOCAL_HEADER_FILENAME_LENGTH = 10
+LOCAL_HEADER_EXTRA_LENGTH = 11
+
+# Central directory and end records, see APPNOTE.TXT sections 4.3.12 to 4.3.16
+CENTRAL_HEADER_STRUCT = '<4s4B4HL2L5H2L'
+CENTRAL_HEADER_SIGNATURE = b'PK\x01\x02'
+END_RECORD_STRUCT = '<4s4H2LH'
+END_RECORD_SIGNATURE = b'PK\x05\x06'
+ZIP64_END_RECORD_STRUCT = '<4sQ2H2L4Q'
+ZIP64_END_RECORD_SIGNATURE = b'PK\x06\x06'
+ZIP64_LOCATOR_STRUCT = '<4sLQL'
+ZIP64_LOCATOR_SIGNATURE = b'PK\x06\x07'
+
+DATA_DESCRIPTOR_FLAG = 0x08
+DATA_DESCRIPTOR_SIGNATURE = b'PK\x07\x08'
+UTF8_FLAG = 0x800
+ZIP64_EXTRA_ID = 0x0001
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_COUNT_LIMIT = 0xFFFF
+ZIP64_VERSION = 45
+
+# Magic numbers of image formats that are already compressed, deflating these again gains nothing
+PRECOMPRESSED_SIGNATURES = (
+    b'\x89PNG\r\n\x1a\n',
+    b'\xff\xd8\xff',  # JPEG
+    b'GIF87a',
+    b'GIF89a',
+)
+
+
+def is_precompressed(header_bytes):
+    """Return True if the leading bytes identify an already compressed image format."""
+    return header_bytes.startswith(PRECOMPRESSED_SIGNATURES)
+
+
+def choose_compress_type(source):
+    """Select STORED for already compressed PNG/JPEG data and DEFLATED for everything else."""
+    if isinstance(source, (bytes, bytearray)):
+        header_bytes = bytes(source[:8])
+    else:
+        with open(source, 'rb') as f:
+            header_bytes = f.read(8)
+    return zipfile.ZIP_STORED if is_precompressed(header_bytes) else zipfile.ZIP_DEFLATED
+
+
+def _has_zip64_extra(extra):
+    """Check the extra field of a local header for a ZIP64 record."""
+    index = 0
+    while index + 4 <= len(extra):
+        header_id, data_size = struct.unpack('<HH', extra[index:index + 4])
+        if header_id == ZIP64_EXTRA_ID:
+            return True
+        index += 4 + data_size
+    return False
+
+
+def member_record_span(zip_file, info):
+    """
+    Locate the raw local record of a member within the archive.
+
+    Returns (record_start, data_start, record_end) where the record spans the local header,
+    the compressed data and any trailing data descriptor.
+    """
+    fp = zip_file.fp
+    fp.seek(info.header_offset)
+    header = fp.read(LOCAL_HEADER_SIZE)
+    if len(header) != LOCAL_HEADER_SIZE or header[:4] != LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f'Bad local file header for {info.filename}')
+
+    local_header = struct.unpack(LOCAL_HEADER_STRUCT, header)
+    filename_length = local_header[LOCAL_HEADER_FILENAME_LENGTH]
+    extra_length = local_header[LOCAL_HEADER_EXTRA_LENGTH]
+
+    data_start = info.header_offset + LOCAL_HEADER_SIZE + filename_length + extra_length
+    record_end = data_start + info.compress_size
+
+    if info.flag_bits & DATA_DESCRIPTOR_FLAG:
+        fp.seek(info.header_offset + LOCAL_HEADER_SIZE + filename_length)
+        zip64 = _has_zip64_extra(fp.read(extra_length))
+        fp.seek(record_end)
+        descriptor_length = 4 + (16 if zip64 else 8)
+        if fp.read(4) == DATA_DESCRIPTOR_SIGNATURE:
+            descriptor_length += 4
+        record_end += descriptor_length
+
+    return info.header_offset, data_start, record_end
+
+
+def _copy_span(source_fp, target_fp, start, end):
+    source_fp.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = source_fp.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile('Unexpected end of archive')
+        target_fp.write(chunk)
+        remaining -= len(chunk)
+
+
+def _source_chunks(source):
+    """Yield the content of bytes or a file on disk in COPY_CHUNK_SIZE pieces."""
+    if isinstance(source, (bytes, bytearray)):
+        view = memoryview(source)
+        for index in range(0, len(view), COPY_CHUNK_SIZE):
+            yield view[index:index + COPY_CHUNK_SIZE]
+        return
+    with open(source, 'rb') as f:
+        while chunk := f.read(COPY_CHUNK_SIZE):
+            yield chunk
+
+
+def _strip_zip64_extra(extra):
+    """Drop any ZIP64 record from an extra field, the writer adds its own when the sizes need it."""
+    kept = b''
+    index = 0
+    while index + 4 <= len(extra):
+        header_id, data_size = struct.unpack('<HH', extra[index:index + 4])
+        if header_id != ZIP64_EXTRA_ID:
+            kept += extra[index:index + 4 + data_size]
+        index += 4 + data_size
+    return kept
+
+
+def _central_header(info):
+    """Central directory entry for a member, the filename is encoded as in its local header."""
+    filename = info.filename.encode('utf-8' if info.flag_bits & UTF8_FLAG else 'cp437')
+    file_size, compress_size, header_offset = info.file_size, info.compress_size, info.header_offset
+
+    zip64_fields = []
+    if file_size > ZIP64_LIMIT or compress_size > ZIP64_LIMIT:
+        zip64_fields += [file_size, compress_size]
+        file_size = compress_size = ZIP64_LIMIT
+    if header_offset > ZIP64_LIMIT:
+        zip64_fields.append(header_offset)
+        header_offset = ZIP64_LIMIT
+
+    extra = _strip_zip64_extra(info.extra)
+    extract_version, create_version = info.extract_version, info.create_version
+    if zip64_fields:
+        extra = struct.pack(f'<HH{len(zip64_fields)}Q', ZIP64_EXTRA_ID, 8 * len(zip64_fields), *zip64_fields) + extra
+        extract_version = max(extract_version, ZIP64_VERSION)
+        create_version = max(create_version, ZIP64_VERSION)
+
+    year, month, day, hour, minute, second = info.date_time
+    dos_date = (year - 1980) << 9 | month << 5 | day
+    dos_time = hour << 11 | minute << 5 | second // 2
+
+    header = struct.pack(CENTRAL_HEADER_STRUCT, CENTRAL_HEADER_SIGNATURE, create_version, info.create_system,
+                         extract_version, info.reserved, info.flag_bits, info.compress_type, dos_time, dos_date,
+                         info.CRC, compress_size, file_size, len(filename), len(extra), len(info.comment),
+                         0, info.internal_attr, info.external_attr, header_offset)
+    return header + filename + extra + info.comment
+
+
+class EsxArchiveWriter:
+    """
+    Write a .esx from raw member records copied out of another archive plus newly compressed members.
+
+    Local records are written as members are added and the central directory when the writer is closed,
+    so copied members never go through ZipFile's write path.
+    """
+
+    def __init__(self, path):
+        self.fp = open(path, 'wb')
+        self.members = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.fp.close()
+
+    def copy_raw_member(self, source_zip, info):
+        """
+        Copy a member from a source ZipFile without decompressing it.
+
+        The local header, compressed bytes, CRC and any data descriptor are written as-is.
+        """
+        record_start, _, record_end = member_record_span(source_zip, info)
+
+        target_info = copy.copy(info)
+        target_info.header_offset = self.fp.tell()
+        _copy_span(source_zip.fp, self.fp, record_start, record_end)
+
+        self.members.append(target_info)
+        return target_info
+
+    def write_member(self, member_name, source):
+        """Compress and write a new or modified member, source may be bytes or a path on disk."""
+        if isinstance(source, (bytes, bytearray)):
+            info = zipfile.ZipInfo(member_name, time.localtime(time.time())[:6])
+            info.external_attr = 0o600 << 16
+            info.file_size = len(source)
+        else:
+            info = zipfile.ZipInfo.from_file(source, arcname=member_name)
+        info.compress_type = choose_compress_type(source)
+        if not member_name.isascii():
+            info.flag_bits |= UTF8_FLAG
+
+        # Decided up front so the header rewritten below is the same length, same margin as ZipFile uses
+        zip64 = info.file_size * 1.05 > ZIP64_LIMIT
+        info.CRC = info.compress_size = 0
+        info.header_offset = self.fp.tell()
+        self.fp.write(info.FileHeader(zip64))
+
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15) if info.compress_type == zipfile.ZIP_DEFLATED else None
+        crc = file_size = compress_size = 0
+        for chunk in _source_chunks(source):
+            crc = zlib.crc32(chunk, crc)
+            file_size += len(chunk)
+            if compressor:
+                chunk = compressor.compress(chunk)
+            self.fp.write(chunk)
+            compress_size += len(chunk)
+        if compressor:
+            chunk = compressor.flush()
+            self.fp.write(chunk)
+            compress_size += len(chunk)
+
+        # Sizes and CRC are only known now, rewrite the local header in place
+        info.CRC, info.file_size, info.compress_size = crc, file_size, compress_size
+        data_end = self.fp.tell()
+        self.fp.seek(info.header_offset)
+        self.fp.write(info.FileHeader(zip64))
+        self.fp.seek(data_end)
+
+        self.members.append(info)
+        return info.compress_type
+
+    def close(self):
+        """Write the central directory and end of central directory records, with ZIP64 records when needed."""
+        if self.fp.closed:
+            return
+        start_dir = self.fp.tell()
+        for info in self.members:
+            self.fp.write(_central_header(info))
+        end_dir = self.fp.tell()
+
+        count, size_dir = len(self.members), end_dir - start_dir
+        if count > ZIP64_COUNT_LIMIT or size_dir > ZIP64_LIMIT or start_dir > ZIP64_LIMIT:
+            self.fp.write(struct.pack(ZIP64_END_RECORD_STRUCT, ZIP64_END_RECORD_SIGNATURE, struct.calcsize(ZIP64_END_RECORD_STRUCT) - 12,
+                                      ZIP64_VERSION, ZIP64_VERSION, 0, 0, count, count, size_dir, start_dir))
+            self.fp.write(struct.pack(ZIP64_LOCATOR_STRUCT, ZIP64_LOCATOR_SIGNATURE, 0, end_dir, 1))
+            count, size_dir, start_dir = min(count, ZIP64_COUNT_LIMIT), min(size_dir, ZIP64_LIMIT), min(start_dir, ZIP64_LIMIT)
+
+        self.fp.write(struct.pack(END_RECORD_STRUCT, END_RECORD_SIGNATURE, 0, 0, count, count, size_dir, start_dir, 0))
+        self.fp.close()
+
+
+def rebundle_esx_incremental(source_esx, output_esx, modified_members, removed_members=()):
+    """
+    Build a new .esx from the original archive plus a set of modified or added members.
+
+    Untouched members are copied raw, only the members in modified_members are compressed.
+    modified_members maps member names to bytes or to a path on disk.
+    Returns a tuple of (copied_count, written_count).
+    """
+    output_esx = Path(output_esx)
+    temp_output = output_esx.with_name(output_esx.name + '.tmp')
+    removed_members = set(removed_members)
+    pending = dict(modified_members)
+
+    copied_count = 0
+    written_count = 0
+
+    try:
+        with zipfile.ZipFile(source_esx, 'r') as source_zip, EsxArchiveWriter(temp_output) as target_zip:
+            for info in source_zip.infolist():
+                if info.filename in removed_members:
+                    continue
+
+                if info.filename in pending:
+                    # Keep the original member order, replace the member in place
+                    target_zip.write_member(info.filename, pending.pop(info.filename))
+                    written_count += 1
+                else:
+                    target_zip.copy_raw_member(source_zip, info)
+                    copied_count += 1
+
+            # Anything left over is a newly added member
+            for member_name, source in pending.items():
+                target_zip.write_member(member_name, source)
+                written_count += 1
+
+        os.replace(temp_output, output_esx)
+    finally:
+        if temp_output.exists():
+            temp_output.unlink()
+
+    return copied_count, written_count
+
+
+def file_crc32(file_path):
+    """Calculate the CRC-32 of a file on disk, as stored within a zip central directory."""
+    crc = 0
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(COPY_CHUNK_SIZE):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def find_modified_members(project_dir, source_esx, extracted_members=None):
+    """
+    Compare an unpacked project directory against the original .esx.
+
+    Returns (modified_members, removed_members), modified_members maps member names to paths
+    on disk for every file that is new or whose size or CRC differs from the archive.
+    When the project was only partially unpacked, pass the names of the members that were extracted
+    so members never written to disk are not treated as removed.
+    """
+    project_dir = Path(project_dir)
+    modified_members = {}
+
+    with zipfile.ZipFile(source_esx, 'r') as source_zip:
+        archive_members = {info.filename: info for info in source_zip.infolist() if not info.is_dir()}
+
+    on_disk = set()
+    for file_path in project_dir.rglob('*'):
+        if not file_path.is_file():
+            continue
+        member_name = file_path.relative_to(project_dir).as_posix()
+        on_disk.add(member_name)
+
+        info = archive_members.get(member_name)
+        if info is None or file_path.stat().st_size != info.file_size or file_crc32(file_path) != info.CRC:
+            modified_members[member_name] = file_path
+
+    removed_members = set(archive_members) - on_disk
+    if extracted_members is not None:
+        removed_members &= set(extracted_members)
+    return modified_members, removed_members
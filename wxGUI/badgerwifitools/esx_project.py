@@ -0,0 +1,122 @@
+# esx_project.py
+
+import shutil
+import zipfile
+import threading
+from pathlib import Path
+
+import fast_json
+
+
+# JSON members commonly found within an Ekahau .esx project file
+PROJECT_JSON_MEMBERS = (
+    'project',
+    'projectConfiguration',
+    'floorPlans',
+    'accessPoints',
+    'simulatedRadios',
+    'antennaTypes',
+    'tagKeys',
+    'notes',
+    'accessPointMeasurements',
+    'measuredRadios',
+    'surveys',
+    'wallPoints',
+    'wallSegments',
+    'attenuationAreas',
+    'buildings',
+    'buildingFloors',
+)
+
+
+def _json_member_property(member_stem):
+    """Create a read-only property exposing a lazily parsed JSON member."""
+    def getter(self):
+        return self.load_json(f'{member_stem}.json')
+
+    getter.__doc__ = f"Parsed contents of {member_stem}.json, or None if the project does not contain it."
+    return property(getter)
+
+
+class EsxProject:
+    """
+    Read-only view of an Ekahau .esx project file.
+
+    The archive is opened once, JSON members are parsed on first access and cached,
+    images are exposed as on-demand byte streams. Nothing is extracted to disk.
+    """
+
+    def __init__(self, esx_filepath):
+        self.esx_filepath = Path(esx_filepath)
+        self.name = self.esx_filepath.stem
+        self._zip_file = zipfile.ZipFile(self.esx_filepath, 'r')
+        self._members = {info.filename: info for info in self._zip_file.infolist()}
+        self._json_cache = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return f"EsxProject('{self.esx_filepath}')"
+
+    def close(self):
+        """Close the underlying archive."""
+        self._zip_file.close()
+        self._json_cache.clear()
+
+    @property
+    def member_names(self):
+        """Names of every member within the archive."""
+        return list(self._members)
+
+    def has_member(self, member_name):
+        return member_name in self._members
+
+    def member_info(self, member_name):
+        """Return the ZipInfo for a member, or None if it does not exist."""
+        return self._members.get(member_name)
+
+    def load_json(self, filename):
+        """Parse a JSON member on first access, subsequent calls return the cached document."""
+        with self._lock:
+            if filename in self._json_cache:
+                return self._json_cache[filename]
+
+            if filename not in self._members:
+                print(f'{filename} not found, the project probably does not contain this data type.')
+                data = None
+            else:
+                data = fast_json.loads(self._zip_file.read(filename))
+
+            self._json_cache[filename] = data
+            return data
+
+    def open_member(self, member_name):
+        """Return a readable byte stream for any member within the archive."""
+        return self._zip_file.open(member_name)
+
+    def open_image(self, image_id):
+        """Return a readable byte stream for an image member, e.g. a floor plan or note photo."""
+        return self.open_member(f'image-{image_id}')
+
+    def read_image(self, image_id):
+        """Return the bytes of an image member."""
+        with self.open_image(image_id) as image_stream:
+            return image_stream.read()
+
+    def copy_member(self, member_name, destination):
+        """Stream a single member out of the archive to the destination path."""
+        with self.open_member(member_name) as source, open(destination, 'wb') as target:
+            shutil.copyfileobj(source, target)
+
+    def copy_image(self, image_id, destination):
+        self.copy_member(f'image-{image_id}', destination)
+
+
+# Expose each known JSON member as a lazily parsed property, e.g. EsxProject.floorPlans
+for _member_stem in PROJECT_JSON_MEMBERS:
+    setattr(EsxProject, _member_stem, _json_member_property(_member_stem))
@@ -4,15 +4,15 @@
 The original, well written script by Francois Verges (@VergesFrancois)
 Adapted, modified, mangled by Nick Turner (@nickjvturner)
 """
-import wx
 
 from common import load_json
 from common import nl
+from message_sink import post_detail
 
 import shutil
 
 
-def export_ap_images(working_directory, project_name, message_callback):
+def export_ap_images(working_directory, project_name, message_callback, stop_event=None):
 
 	project_dir = working_directory / project_name
 
@@ -28,15 +28,18 @@ def export_ap_images(working_directory, project_name, message_callback):
 	notes_json = load_json(project_dir, 'notes.json', message_callback)
 
 	if not notes_json:
-		wx.CallAfter(message_callback, f'No notes found in the project{nl}')
+		message_callback(f'No notes found in the project{nl}')
 		return
 
-	wx.CallAfter(message_callback, f'Extracting AP Images from: {project_name}{nl}')
+	message_callback(f'Extracting AP Images from: {project_name}{nl}')
 
 	image_extraction_counter = []
 
 	# Loop through all the APs in the project
 	for ap in access_points_json['accessPoints']:
+		if stop_event and stop_event.is_set():
+			message_callback(f'{nl}### PROCESS ABORTED ###')
+			return
 		image_count = 1
 
 		# Check if the AP has any notes
@@ -78,8 +81,8 @@ def export_ap_images(working_directory, project_name, message_callback):
 									image_extraction_counter.append(source_image_file)
 
 									shutil.copy(source_image_full_path, output_destination)
-									wx.CallAfter(message_callback, f"{ap_image_name} Image extracted")
+									post_detail(message_callback, f"{ap_image_name} Image extracted")
 
 									image_count += 1
 
-	wx.CallAfter(message_callback, f'{nl}{len(image_extraction_counter)} images extracted{nl}')
+	message_callback(f'{nl}{len(image_extraction_counter)} images extracted{nl}')
@@ -0,0 +1,38 @@
+# fast_json.py
+
+import json
+
+# orjson is optional, it parses the larger project files several times faster than the standard library
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKEND = 'orjson' if orjson else 'json'
+
+
+def loads(data):
+    """Parse a JSON document from bytes or str using the fastest available backend."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_file(file_path):
+    """Read and parse a JSON file."""
+    with open(file_path, 'rb') as json_file:
+        return loads(json_file.read())
+
+
+def copy_json(data):
+    """
+    Return an independent copy of a parsed JSON tree.
+
+    Only dicts and lists need copying, strings, numbers, booleans and None are immutable and shared.
+    Considerably faster than copy.deepcopy as there is no memo bookkeeping.
+    """
+    if isinstance(data, dict):
+        return {key: copy_json(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [copy_json(value) for value in data]
+    return data
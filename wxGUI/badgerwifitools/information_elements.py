@@ -0,0 +1,353 @@
+# information_elements.py
+
+import base64
+
+# Element IDs read from surveyed beacon and probe response frames
+SUPPORTED_RATES = 1
+DS_PARAMETER_SET = 3
+COUNTRY = 7
+BSS_LOAD = 11
+TPC_REPORT = 35
+HT_CAPABILITIES = 45
+RSN = 48
+EXTENDED_SUPPORTED_RATES = 50
+HT_OPERATION = 61
+EXTENDED_CAPABILITIES = 127
+VHT_CAPABILITIES = 191
+VHT_OPERATION = 192
+VENDOR_SPECIFIC = 221
+ELEMENT_ID_EXTENSION = 255
+
+PARSED_ELEMENTS = frozenset((
+    SUPPORTED_RATES, DS_PARAMETER_SET, COUNTRY, BSS_LOAD, TPC_REPORT, HT_CAPABILITIES, RSN, EXTENDED_SUPPORTED_RATES,
+    HT_OPERATION, EXTENDED_CAPABILITIES, VHT_CAPABILITIES, VHT_OPERATION, VENDOR_SPECIFIC, ELEMENT_ID_EXTENSION,
+))
+
+# Element ID Extension values, the first byte of an element 255 body
+HE_CAPABILITIES = 35
+HE_OPERATION = 36
+EHT_OPERATION = 106
+EHT_CAPABILITIES = 108
+
+# HE Operation Parameters flags
+HE_VHT_OPERATION_INFO_PRESENT = 1 << 14
+HE_CO_HOSTED_BSS = 1 << 15
+HE_6GHZ_OPERATION_INFO_PRESENT = 1 << 17
+
+# Channel width codes of the HE 6 GHz Operation Information and EHT Operation Information control fields
+HE_6GHZ_WIDTHS = (20, 40, 80, 160)
+EHT_WIDTHS = (20, 40, 80, 160, 320)
+
+# Bands a primary channel is resolved in, keyed as in common.create_measured_radios_dict
+BAND_2_4_GHZ = 'two'
+BAND_5_GHZ = 'five'
+BAND_6_GHZ = 'six'
+
+# Highest 2.4 GHz channel, DS Parameter Set and HT Operation channels above it are 5 GHz
+MAX_2_4_GHZ_CHANNEL = 14
+
+# Extended Capabilities bits commonly checked on enterprise surveys
+BSS_TRANSITION = 19
+INTERWORKING = 31
+
+# Suite selectors under the IEEE 802.11 OUI 00-0F-AC
+IEEE_80211_OUI = b'\x00\x0f\xac'
+CIPHER_SUITES = {
+    1: 'WEP-40', 2: 'TKIP', 4: 'CCMP-128', 5: 'WEP-104', 6: 'BIP-CMAC-128', 8: 'GCMP-128', 9: 'GCMP-256',
+    10: 'CCMP-256', 11: 'BIP-GMAC-128', 12: 'BIP-GMAC-256', 13: 'BIP-CMAC-256',
+}
+AKM_SUITES = {
+    1: '802.1X', 2: 'PSK', 3: 'FT-802.1X', 4: 'FT-PSK', 5: '802.1X-SHA256', 6: 'PSK-SHA256', 8: 'SAE', 9: 'FT-SAE',
+    11: '802.1X-SuiteB', 12: '802.1X-SuiteB-192', 13: 'FT-802.1X-SHA384', 18: 'OWE', 24: 'SAE-EXT-KEY', 25: 'FT-SAE-EXT-KEY',
+}
+
+# Decoded records are kept per measurement id, the cache is emptied when it grows past this
+IE_CACHE_MAX_ENTRIES = 200000
+
+
+class InformationElements:
+    """The fields read from a measurement's informationElements blob, None where the element was absent."""
+    __slots__ = (
+        'channel', 'tx_power', 'link_margin', 'supported_rates',
+        'ht_primary_channel', 'ht_width', 'vht_width', 'he_6ghz_primary_channel', 'he_6ghz_width', 'eht_width',
+        'ht', 'vht', 'he', 'eht',
+        'group_cipher', 'pairwise_ciphers', 'akm_suites', 'mfp_capable', 'mfp_required',
+        'country', 'country_environment', 'country_channels',
+        'station_count', 'channel_utilization',
+        'extended_capabilities', 'vendor_ouis',
+    )
+
+    def __init__(self):
+        self.channel = None  # DS Parameter Set, absent from most 5 and 6 GHz frames, see primary_channel
+        self.tx_power = None
+        self.link_margin = None
+        self.supported_rates = {}  # Rate in Mbps: True if it is a basic rate
+        self.ht_primary_channel = None
+        self.ht_width = None
+        self.vht_width = None
+        self.he_6ghz_primary_channel = None
+        self.he_6ghz_width = None
+        self.eht_width = None
+        # Capabilities advertised
+        self.ht = self.vht = self.he = self.eht = False
+        # RSN
+        self.group_cipher = None
+        self.pairwise_ciphers = []
+        self.akm_suites = []
+        self.mfp_capable = None
+        self.mfp_required = None
+        # Country, first channel, number of channels and max transmit power of each subband
+        self.country = None
+        self.country_environment = None
+        self.country_channels = []
+        # BSS Load, channel utilization is a percentage
+        self.station_count = None
+        self.channel_utilization = None
+        self.extended_capabilities = 0  # Bit field, see has_extended_capability
+        self.vendor_ouis = []
+
+    def __repr__(self):
+        return f"InformationElements(channel={self.primary_channel}, band={self.band}, width={self.channel_width}, tx_power={self.tx_power})"
+
+    @property
+    def primary_channel(self):
+        """
+        Primary channel from HE 6 GHz Operation, only sent by 6 GHz BSSs, else the DS Parameter Set, else HT Operation.
+
+        6 GHz channel numbers overlap the 2.4 and 5 GHz ones, see band.
+        """
+        for channel in (self.he_6ghz_primary_channel, self.channel, self.ht_primary_channel):
+            if channel is not None:
+                return channel
+        return None
+
+    @property
+    def band(self):
+        """Band of primary_channel, BAND_2_4_GHZ, BAND_5_GHZ or BAND_6_GHZ, None when no channel was advertised."""
+        if self.he_6ghz_primary_channel is not None:
+            return BAND_6_GHZ
+        channel = self.primary_channel
+        if channel is None:
+            return None
+        return BAND_2_4_GHZ if channel <= MAX_2_4_GHZ_CHANNEL else BAND_5_GHZ
+
+    @property
+    def channel_width(self):
+        """Operating width in MHz, from the newest operation element present."""
+        for width in (self.eht_width, self.he_6ghz_width, self.vht_width, self.ht_width):
+            if width is not None:
+                return width
+        return 20
+
+    @property
+    def standards(self):
+        """Generations advertised, e.g. ['HT', 'VHT', 'HE']."""
+        return [name for name, supported in (('HT', self.ht), ('VHT', self.vht), ('HE', self.he), ('EHT', self.eht)) if supported]
+
+    @property
+    def security(self):
+        """RSN summary, e.g. 'SAE, FT-SAE / CCMP-128 / MFP required', or 'Open' when there is no RSN element."""
+        if not self.akm_suites and not self.pairwise_ciphers:
+            return 'Open'
+        mfp = 'MFP required' if self.mfp_required else 'MFP capable' if self.mfp_capable else 'MFP disabled'
+        return f"{', '.join(self.akm_suites)} / {', '.join(self.pairwise_ciphers)} / {mfp}"
+
+    def has_extended_capability(self, bit):
+        return bool(self.extended_capabilities >> bit & 1)
+
+
+def _suite_name(view, offset, names):
+    # A suite selector is an OUI followed by a suite type
+    if view[offset:offset + 3] == IEEE_80211_OUI:
+        return names.get(view[offset + 3], f'00-0F-AC:{view[offset + 3]}')
+    return f"{view[offset:offset + 3].hex('-').upper()}:{view[offset + 3]}"
+
+
+def _parse_rsn(record, view, start, end):
+    # Version (2), group cipher suite (4), pairwise count (2) and suites, AKM count (2) and suites, RSN capabilities (2)
+    offset = start + 2
+    if offset + 4 > end:
+        return
+    record.group_cipher = _suite_name(view, offset, CIPHER_SUITES)
+    offset += 4
+
+    for suites, names in ((record.pairwise_ciphers, CIPHER_SUITES), (record.akm_suites, AKM_SUITES)):
+        if offset + 2 > end:
+            return
+        count = view[offset] | view[offset + 1] << 8
+        offset += 2
+        for _ in range(count):
+            if offset + 4 > end:
+                return
+            suites.append(_suite_name(view, offset, names))
+            offset += 4
+
+    if offset + 2 <= end:
+        capabilities = view[offset] | view[offset + 1] << 8
+        record.mfp_required = bool(capabilities & 0x40)
+        record.mfp_capable = bool(capabilities & 0x80)
+
+
+def _vht_width(channel_width, ccfs0, ccfs1):
+    if channel_width == 0:
+        return None  # 20 or 40 MHz, given by HT Operation
+    if channel_width == 1:
+        # 80 MHz, or 160 and 80+80 MHz signalled through CCFS1
+        return 80 if ccfs1 == 0 else 160
+    return 160  # Deprecated 160 and 80+80 MHz encodings
+
+
+def _parse_he_operation(record, view, start, end):
+    # Extension ID (1), HE Operation Parameters (3), BSS Color (1), Basic HE-MCS and NSS set (2), then optional fields
+    if start + 7 > end:
+        return
+    parameters = view[start + 1] | view[start + 2] << 8 | view[start + 3] << 16
+    offset = start + 7
+    if parameters & HE_VHT_OPERATION_INFO_PRESENT:
+        offset += 3
+    if parameters & HE_CO_HOSTED_BSS:
+        offset += 1
+    if parameters & HE_6GHZ_OPERATION_INFO_PRESENT and offset + 5 <= end:
+        # Primary channel, control, CCFS0, CCFS1, minimum rate
+        record.he_6ghz_primary_channel = view[offset]
+        record.he_6ghz_width = HE_6GHZ_WIDTHS[view[offset + 1] & 0x03]
+
+
+def _parse_eht_operation(record, view, start, end):
+    # Extension ID (1), EHT Operation Parameters (1), Basic EHT-MCS and NSS set (4), then the optional operation information
+    if start + 7 > end or not view[start + 1] & 0x01:
+        return
+    width_code = view[start + 6] & 0x07
+    if width_code < len(EHT_WIDTHS):
+        record.eht_width = EHT_WIDTHS[width_code]
+
+
+def parse_information_elements(ie_base64):
+    """
+    Decode a Base64 IE blob and read every element of interest in a single walk.
+
+    The decoded bytes are walked through a memoryview, element bodies are never copied.
+    """
+    view = memoryview(base64.b64decode(ie_base64))
+    record = InformationElements()
+
+    index = 0
+    ie_length = len(view)
+
+    # Ensure there are at least 2 bytes left for Element ID and Length
+    while index + 2 <= ie_length:
+        element_id = view[index]
+        length = view[index + 1]
+        start = index + 2  # Element body, past the Element ID and Length fields
+        end = start + length
+
+        # Ensure the data for the IE is within the bounds
+        if end > ie_length:
+            break
+
+        if element_id not in PARSED_ELEMENTS:
+            pass
+
+        elif element_id == SUPPORTED_RATES or element_id == EXTENDED_SUPPORTED_RATES:
+            supported_rates = record.supported_rates
+            for rate_byte in view[start:end]:
+                rate = (rate_byte & 0x7F) * 0.5  # Rates are in units of 0.5 Mbps
+                # If the MSB is set it's a basic rate, a rate listed twice is basic if either occurrence is
+                supported_rates[rate] = supported_rates.get(rate, False) or bool(rate_byte & 0x80)
+
+        elif element_id == DS_PARAMETER_SET:
+            if length >= 1:
+                record.channel = view[start]
+
+        elif element_id == VENDOR_SPECIFIC:
+            if length >= 3:
+                record.vendor_ouis.append(view[start:start + 3].hex(':').upper())
+
+        elif element_id == HT_OPERATION:
+            if length >= 2:
+                record.ht_primary_channel = view[start]
+                # Secondary channel offset above (1) or below (3) with any channel width allowed
+                info = view[start + 1]
+                record.ht_width = 40 if info & 0x04 and info & 0x03 in (1, 3) else 20
+
+        elif element_id == VHT_OPERATION:
+            if length >= 3:
+                record.vht_width = _vht_width(view[start], view[start + 1], view[start + 2])
+
+        elif element_id == ELEMENT_ID_EXTENSION:
+            if length >= 1:
+                extension_id = view[start]
+                if extension_id == HE_CAPABILITIES:
+                    record.he = True
+                elif extension_id == HE_OPERATION:
+                    _parse_he_operation(record, view, start, end)
+                elif extension_id == EHT_CAPABILITIES:
+                    record.eht = True
+                elif extension_id == EHT_OPERATION:
+                    _parse_eht_operation(record, view, start, end)
+
+        elif element_id == HT_CAPABILITIES:
+            record.ht = True
+
+        elif element_id == VHT_CAPABILITIES:
+            record.vht = True
+
+        elif element_id == RSN:
+            _parse_rsn(record, view, start, end)
+
+        elif element_id == TPC_REPORT:
+            if length >= 2:
+                # The Transmit Power field is an unsigned integer representing dBm
+                record.tx_power = view[start]
+                record.link_margin = view[start + 1]
+
+        elif element_id == BSS_LOAD:
+            if length >= 3:
+                record.station_count = view[start] | view[start + 1] << 8
+                record.channel_utilization = round(view[start + 2] * 100 / 255)
+
+        elif element_id == COUNTRY:
+            if length >= 3:
+                record.country = bytes(view[start:start + 2]).decode('ascii', 'replace')
+                record.country_environment = chr(view[start + 2])
+                # Subband triplets, first channel numbers of 201 and above introduce operating extension triplets
+                for offset in range(start + 3, end - 2, 3):
+                    if view[offset] < 201:
+                        record.country_channels.append((view[offset], view[offset + 1], view[offset + 2]))
+
+        elif element_id == EXTENDED_CAPABILITIES:
+            record.extended_capabilities = int.from_bytes(view[start:end], 'little')
+
+        index = end  # Move to the next IE
+
+    return record
+
+
+_ie_cache = {}
+
+
+def cached_information_elements(measurement):
+    """
+    The decoded IEs of an accessPointMeasurement, each blob is only decoded once.
+
+    Records are keyed by measurement id and reused while the measurement's blob is unchanged.
+    """
+    ie_base64 = measurement['informationElements']
+    cached = _ie_cache.get(measurement.get('id'))
+    if cached is not None and cached[0] == ie_base64:
+        return cached[1]
+
+    record = parse_information_elements(ie_base64)
+    if len(_ie_cache) >= IE_CACHE_MAX_ENTRIES:
+        _ie_cache.clear()
+    _ie_cache[measurement.get('id')] = (ie_base64, record)
+    return record
+
+
+def clear_ie_cache():
+    _ie_cache.clear()
+
+
+def format_supported_rates(supported_rates):
+    """Rates in ascending order, basic rates marked (B), e.g. '6 (B), 9, 12 (B)'."""
+    return ", ".join(f"{int(rate)} (B)" if is_basic else f"{int(rate)}" for rate, is_basic in sorted(supported_rates.items()))
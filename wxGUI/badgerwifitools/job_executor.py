@@ -0,0 +1,260 @@
+# job_executor.py
+
+import os
+import time
+import threading
+import itertools
+import traceback
+from collections import deque
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+DEFAULT_MAX_WORKERS = 2
+
+# Finished and pending jobs kept for inspection
+JOB_HISTORY_SIZE = 100
+
+# Share of physical memory that admitted jobs' memory estimates may add up to
+MEMORY_BUDGET_FRACTION = 0.5
+
+_job_numbers = itertools.count(1)
+
+# The job each worker thread is running, see current_job
+_worker_state = threading.local()
+
+
+def physical_memory():
+    """Total physical memory in bytes, or None where it can't be determined."""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        pass
+    try:
+        import ctypes
+
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                        ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                        ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                        ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                        ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+
+        status = MemoryStatus()
+        status.dwLength = ctypes.sizeof(MemoryStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys
+    except (AttributeError, OSError):
+        pass
+    return None
+
+
+class Job:
+    """
+    One unit of work submitted to a JobExecutor.
+
+    cancel_event is the job's own stop_event, handed to the target when the job is cancellable.
+    result holds the target's return value once DONE, error and error_traceback the exception once FAILED.
+    """
+
+    def __init__(self, name, target, args=(), kwargs=None, memory_estimate=0, cancellable=True):
+        self.id = next(_job_numbers)
+        self.name = name
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.memory_estimate = memory_estimate
+        self.cancellable = cancellable
+        self.cancel_event = threading.Event()
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.error_traceback = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self._done = threading.Event()
+
+    def __repr__(self):
+        return f"Job({self.id}, '{self.name}', {self.state})"
+
+    @property
+    def is_finished(self):
+        return self.state in FINISHED_STATES
+
+    def cancel(self):
+        """Ask the job to stop, a running job stops at its next stop_event check."""
+        self.cancel_event.set()
+
+    def wait(self, timeout=None):
+        """Block until the job has finished, returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def describe(self):
+        if self.state == FAILED:
+            return f'{self.name} failed: {self.error}'
+        if self.state == DONE and self.started:
+            return f'{self.name} finished in {self.finished - self.started:.1f}s'
+        return f'{self.name} {self.state}'
+
+
+class JobExecutor:
+    """
+    Run jobs from a FIFO queue on a fixed number of worker threads.
+
+    A job is started when a worker slot is free and its memory_estimate fits in what remains of
+    memory_budget, the first queued job waits rather than being overtaken. A job is always admitted
+    when nothing else is running, so an estimate above the budget still runs, alone.
+    Listeners are called from worker threads with the job on every state change.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, memory_budget=None):
+        if memory_budget is None:
+            total_memory = physical_memory()
+            memory_budget = int(total_memory * MEMORY_BUDGET_FRACTION) if total_memory else None
+        self.max_workers = max_workers
+        self.memory_budget = memory_budget
+        self.listeners = []
+        self.jobs = deque(maxlen=JOB_HISTORY_SIZE)  # Most recently submitted jobs, in order
+        self._queue = deque()
+        self._running = []
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._workers = [threading.Thread(target=self._work, name=f'job-worker-{number}', daemon=True) for number in range(max_workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def submit(self, name, target, args=(), kwargs=None, memory_estimate=0, cancellable=True):
+        """
+        Queue target(*args, **kwargs) and return its Job.
+
+        Cancellable targets are also passed stop_event=job.cancel_event.
+        """
+        job = Job(name, target, args, kwargs, memory_estimate, cancellable)
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError('JobExecutor has been shut down')
+            self.jobs.append(job)
+            self._queue.append(job)
+            self._condition.notify_all()
+        self._notify(job)
+        return job
+
+    def cancel(self, job):
+        """Cancel a job, a queued job is dropped from the queue and a running job is asked to stop."""
+        with self._condition:
+            queued = job in self._queue
+            if queued:
+                self._queue.remove(job)
+                job.state = CANCELLED
+                job.finished = time.time()
+        job.cancel()
+        if queued:
+            job._done.set()
+            self._notify(job)
+
+    def cancel_all(self):
+        with self._condition:
+            jobs = list(self._queue) + list(self._running)
+        for job in jobs:
+            self.cancel(job)
+
+    def active_jobs(self):
+        """Running jobs then queued jobs, in order."""
+        with self._condition:
+            return list(self._running) + list(self._queue)
+
+    def shutdown(self, cancel=True, wait=False):
+        if cancel:
+            self.cancel_all()
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _admissible(self, job):
+        if not self._running or not self.memory_budget:
+            return True
+        return sum(running.memory_estimate for running in self._running) + job.memory_estimate <= self.memory_budget
+
+    def _next_job(self):
+        with self._condition:
+            while True:
+                if self._shutdown and not self._queue:
+                    return None
+                if self._queue and self._admissible(self._queue[0]):
+                    job = self._queue.popleft()
+                    job.state = RUNNING
+                    job.started = time.time()
+                    self._running.append(job)
+                    return job
+                self._condition.wait()
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            self._notify(job)
+            self._run(job)
+            with self._condition:
+                self._running.remove(job)
+                self._condition.notify_all()
+            job._done.set()
+            self._notify(job)
+
+    def _run(self, job):
+        kwargs = dict(job.kwargs)
+        if job.cancellable:
+            kwargs['stop_event'] = job.cancel_event
+        _worker_state.job = job
+        try:
+            job.result = job.target(*job.args, **kwargs)
+            job.state = CANCELLED if job.cancellable and job.cancel_event.is_set() else DONE
+        except Exception as e:
+            job.error = e
+            job.error_traceback = traceback.format_exc()
+            job.state = FAILED
+        finally:
+            _worker_state.job = None
+        job.finished = time.time()
+
+    def _notify(self, job):
+        for listener in list(self.listeners):
+            try:
+                listener(job)
+            except Exception:
+                traceback.print_exc()
+
+
+def current_job():
+    """The Job running on the calling thread, None outside the executor's worker threads."""
+    return getattr(_worker_state, 'job', None)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """The executor shared by the GUI and the worker modules, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = JobExecutor()
+        return _executor
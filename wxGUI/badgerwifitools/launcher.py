@@ -0,0 +1,309 @@
+# launcher.py
+
+"""
+Command line entry point.
+
+badgerwifitools                                      opens the GUI
+badgerwifitools <command> [options] project.esx ...  runs a command headless, once per project
+badgerwifitools batch --actions unpack,maps a.esx b.esx  runs a pipeline per project, projects in parallel
+
+Headless runs never import wx. Worker modules report through the same callbacks the GUI hands them:
+message_callback(message[, level]), progress_callback(ProgressEvent) and a stop_event.
+"""
+
+import sys
+import time
+import argparse
+import threading
+from pathlib import Path
+
+# Modules import each other as top level modules, as when running main.py from this directory
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from common import nl
+from common import PROJECT_PROFILES_DIR
+from common import RENAME_APS_DIR
+from common import discover_available_scripts
+from message_sink import accepts_level, INFO, DETAIL
+from plugin_registry import get_plugin_registry
+
+DEFAULT_PROJECT_PROFILE = 'vanilla'
+DEFAULT_UNPACK_SCOPE = 'everything'
+DEFAULT_BOUNDARY_SEPARATOR = 200
+DEFAULT_AP_ICON_SIZE = 25
+DEFAULT_AP_NAME_LABEL_SIZE = 30
+DEFAULT_ZOOMED_AP_CROP_SIZE = 2000
+
+# Seconds between progress lines for one job, phase changes and completion are always shown
+PROGRESS_PRINT_INTERVAL = 5.0
+
+
+class ConsoleReporter:
+    """message_callback and progress_callback for headless runs, writing to a stream instead of the GUI log."""
+
+    def __init__(self, stream=None, verbosity=INFO):
+        self.stream = stream or sys.stdout
+        self.verbosity = verbosity
+        self._lock = threading.Lock()
+        self._last_progress = {}
+
+    @accepts_level
+    def message(self, message, level=INFO):
+        if level > self.verbosity:
+            return
+        with self._lock:
+            self.stream.write(f'{message}\n')
+            self.stream.flush()
+
+    def progress(self, event):
+        shown_phase, shown_at = self._last_progress.get(event.job_id, (None, 0.0))
+        now = time.monotonic()
+        if event.finished or event.phase != shown_phase or now - shown_at >= PROGRESS_PRINT_INTERVAL:
+            self._last_progress[event.job_id] = (event.phase, now)
+            self.message(event.describe(), DETAIL if not event.finished else INFO)
+
+
+class HeadlessProject:
+    """Paths for one .esx project, laid out as the GUI would: the project directory and OUTPUT sit beside the .esx."""
+
+    def __init__(self, esx_filepath, from_directory=False):
+        self.esx_filepath = Path(esx_filepath).resolve()
+        self.working_directory = self.esx_filepath.parent
+        self.esx_project_name = self.esx_filepath.stem
+        self.project_dir = self.working_directory / self.esx_project_name
+        self.from_directory = from_directory
+        self._esx_project = None
+
+    def esx_project(self):
+        """The open archive for actions able to read it directly, None when reading the unpacked directory."""
+        if self.from_directory:
+            return None
+        if self._esx_project is None:
+            from esx_project import EsxProject
+            self._esx_project = EsxProject(self.esx_filepath)
+        return self._esx_project
+
+    def close(self):
+        if self._esx_project is not None:
+            self._esx_project.close()
+            self._esx_project = None
+
+
+def load_project_profile(profile_name):
+    return get_plugin_registry(PROJECT_PROFILES_DIR).load(profile_name)
+
+
+def load_rename_script(script_name):
+    return get_plugin_registry(RENAME_APS_DIR).load(script_name)
+
+
+def ensure_unpacked(project, reporter, member_filter, stop_event):
+    from esx_actions.unpack_esx import unpack_esx_file
+    return unpack_esx_file(project.working_directory, project.esx_project_name, project.esx_filepath, reporter.message, member_filter, stop_event=stop_event)
+
+
+def run_unpack(project, options, reporter, stop_event):
+    from esx_actions.unpack_esx import UNPACK_JSON_ONLY, UNPACK_JSON_AND_FLOOR_PLANS, UNPACK_EVERYTHING
+    scopes = {'json': UNPACK_JSON_ONLY, 'floor-plans': UNPACK_JSON_AND_FLOOR_PLANS, 'everything': UNPACK_EVERYTHING}
+    return ensure_unpacked(project, reporter, scopes[options.scope], stop_event)
+
+
+def run_validate(project, options, reporter, stop_event):
+    from esx_actions.validate_esx import validate_esx
+    profile = load_project_profile(options.profile)
+    return validate_esx(project.working_directory, project.esx_project_name, reporter.message,
+                        getattr(profile, 'requiredTagKeys', None), getattr(profile, 'optionalTagKeys', None), project.esx_project())
+
+
+def run_summarise(project, options, reporter, stop_event):
+    from project_detail.Summarise import run as summarise_esx
+    return summarise_esx(project.working_directory, project.esx_project_name, reporter.message, project.esx_project())
+
+
+def run_ap_list(project, options, reporter, stop_event):
+    from esx_actions.ap_list_creator import create_ap_list
+    profile = load_project_profile(options.profile)
+    return create_ap_list(project.working_directory, project.esx_project_name, reporter.message, profile.create_custom_ap_list, project.esx_project())
+
+
+def run_rename(project, options, reporter, stop_event):
+    from esx_actions.unpack_esx import UNPACK_JSON_ONLY
+    from rename_aps.ap_renamer import ap_renamer
+    script_name = options.script or getattr(load_project_profile(options.profile), 'preferred_ap_rename_script', None)
+    if not script_name:
+        reporter.message(f'No rename script given and the {options.profile} profile has no preferred_ap_rename_script, use --script')
+        return False
+    if not ensure_unpacked(project, reporter, UNPACK_JSON_ONLY, stop_event):
+        return False
+    return ap_renamer(project.working_directory, project.esx_project_name, load_rename_script(script_name), reporter.message, options.boundary)
+
+
+def run_maps(project, options, reporter, stop_event):
+    from map_creator.create_ap_location_maps import create_ap_location_maps
+    return create_ap_location_maps(project.working_directory, project.esx_project_name, reporter.message, options.icon_size, options.label_size,
+                                   stop_event, project.esx_project(), reporter.progress)
+
+
+def run_zoomed_maps(project, options, reporter, stop_event):
+    from map_creator.create_zoomed_ap_location_maps import create_zoomed_ap_location_maps
+    return create_zoomed_ap_location_maps(project.working_directory, project.esx_project_name, reporter.message, options.crop_size, options.icon_size,
+                                          options.label_size, stop_event, project.esx_project(), reporter.progress)
+
+
+def run_pds_maps(project, options, reporter, stop_event):
+    from map_creator.create_pds_maps import create_pds_maps
+    return create_pds_maps(project.working_directory, project.esx_project_name, reporter.message, options.icon_size, options.label_size,
+                           stop_event, project.esx_project(), reporter.progress)
+
+
+def run_export_images(project, options, reporter, stop_event):
+    from esx_actions.unpack_esx import UNPACK_EVERYTHING
+    from exports.export_ap_images import export_ap_images
+    from exports.export_note_images import export_note_images
+    if not ensure_unpacked(project, reporter, UNPACK_EVERYTHING, stop_event):
+        return False
+    export_ap_images(project.working_directory, project.esx_project_name, reporter.message, stop_event=stop_event)
+    return export_note_images(project.working_directory, project.esx_project_name, reporter.message)
+
+
+def run_rebundle(project, options, reporter, stop_event):
+    from esx_actions.rebundle_esx import rebundle_project
+    if not project.project_dir.exists():
+        reporter.message(f'{project.project_dir} not found, unpack and edit the project before re-bundling')
+        return False
+    return rebundle_project(project.working_directory, project.esx_project_name, reporter.message)
+
+
+# Command name: (function, help), the order batch actions are offered in
+COMMANDS = {
+    'unpack': (run_unpack, 'Unpack the .esx beside it, only changed members are extracted again'),
+    'validate': (run_validate, 'Validate the project against a project profile'),
+    'summarise': (run_summarise, 'Summarise the project contents'),
+    'ap-list': (run_ap_list, "Export the AP list to Excel with a project profile's layout"),
+    'rename': (run_rename, 'Rename APs with a rename script, the result is written to OUTPUT'),
+    'maps': (run_maps, 'Create AP location maps'),
+    'zoomed-maps': (run_zoomed_maps, 'Create zoomed per AP location maps'),
+    'pds-maps': (run_pds_maps, 'Create post deployment survey maps'),
+    'export-images': (run_export_images, 'Export the images attached to AP and map notes'),
+    'rebundle': (run_rebundle, 'Re-bundle the unpacked project directory into a new .esx'),
+}
+
+DEFAULT_BATCH_ACTIONS = ('unpack', 'validate', 'ap-list', 'maps', 'rebundle')
+
+
+def default_options(**overrides):
+    """Options for every command at their defaults, as the parser would give them, e.g. for a batch started from the GUI."""
+    options = dict(verbose=False, from_directory=False, profile=DEFAULT_PROJECT_PROFILE, scope=DEFAULT_UNPACK_SCOPE, script=None,
+                   boundary=DEFAULT_BOUNDARY_SEPARATOR, icon_size=DEFAULT_AP_ICON_SIZE, label_size=DEFAULT_AP_NAME_LABEL_SIZE,
+                   crop_size=DEFAULT_ZOOMED_AP_CROP_SIZE)
+    options.update(overrides)
+    return argparse.Namespace(**options)
+
+
+def add_command_options(command_parser, command):
+    command_parser.add_argument('-v', '--verbose', action='store_true', help='Show per AP detail messages and progress')
+    command_parser.add_argument('--from-directory', action='store_true', help='Read the unpacked project directory instead of the .esx archive')
+    command_parser.add_argument('--profile', default=DEFAULT_PROJECT_PROFILE, help=f'Project profile, default {DEFAULT_PROJECT_PROFILE}')
+    if command in ('unpack', 'batch'):
+        command_parser.add_argument('--scope', choices=('json', 'floor-plans', 'everything'), default=DEFAULT_UNPACK_SCOPE)
+    if command in ('rename', 'batch'):
+        command_parser.add_argument('--script', help="Rename script, defaults to the profile's preferred script")
+        command_parser.add_argument('--boundary', type=int, default=DEFAULT_BOUNDARY_SEPARATOR, help='Boundary separator for scripts that use one')
+    if command in ('maps', 'zoomed-maps', 'pds-maps', 'batch'):
+        command_parser.add_argument('--icon-size', type=int, default=DEFAULT_AP_ICON_SIZE)
+        command_parser.add_argument('--label-size', type=int, default=DEFAULT_AP_NAME_LABEL_SIZE)
+    if command in ('zoomed-maps', 'batch'):
+        command_parser.add_argument('--crop-size', type=int, default=DEFAULT_ZOOMED_AP_CROP_SIZE)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='badgerwifitools', description='BadgerWiFi tools, run without a command to open the GUI.')
+    parser.add_argument('--profile-startup', action='store_true', help='Print how long the GUI took to start and its slowest imports')
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+
+    for name, (function, help_text) in COMMANDS.items():
+        command_parser = subparsers.add_parser(name, help=help_text, description=help_text)
+        command_parser.add_argument('projects', nargs='+', type=Path, metavar='project.esx')
+        add_command_options(command_parser, name)
+
+    batch_help = 'Run a pipeline of commands on each project, projects run in parallel in separate processes'
+    batch_parser = subparsers.add_parser('batch', help=batch_help, description=batch_help)
+    batch_parser.add_argument('projects', nargs='+', type=Path, metavar='project.esx')
+    batch_parser.add_argument('--actions', default=','.join(DEFAULT_BATCH_ACTIONS),
+                              help=f"Comma separated commands run in order on each project, default {','.join(DEFAULT_BATCH_ACTIONS)}")
+    batch_parser.add_argument('--workers', type=int, help='Projects processed at once, defaults to the CPU count within the memory budget')
+    add_command_options(batch_parser, 'batch')
+
+    subparsers.add_parser('list', help='List the available project profiles and rename scripts')
+    return parser
+
+
+def run_command(command, project_path, options, reporter, stop_event):
+    """Run one command against one project, returns False if it failed."""
+    function, _ = COMMANDS[command]
+    project = HeadlessProject(project_path, options.from_directory)
+    if not project.esx_filepath.exists():
+        reporter.message(f'{project.esx_filepath} not found')
+        return False
+    try:
+        return function(project, options, reporter, stop_event) is not False
+    except Exception as e:
+        reporter.message(f'{command} failed for {project.esx_filepath.name}: {e}')
+        return False
+    finally:
+        project.close()
+
+
+def run_headless(options):
+    reporter = ConsoleReporter(verbosity=DETAIL if options.verbose else INFO)
+    stop_event = threading.Event()
+    failures = []
+    for project_path in options.projects:
+        reporter.message(f'{nl}### {options.command}: {project_path} ###')
+        if not run_command(options.command, project_path, options, reporter, stop_event):
+            failures.append(project_path)
+    if len(options.projects) > 1:
+        reporter.message(f'{nl}{len(options.projects) - len(failures)} of {len(options.projects)} project(s) completed')
+    for project_path in failures:
+        reporter.message(f'Failed: {project_path}')
+    return 1 if failures else 0
+
+
+def run_batch_command(options):
+    from batch_runner import run_batch
+    actions = [action.strip() for action in options.actions.split(',') if action.strip()]
+    unknown = [action for action in actions if action not in COMMANDS]
+    if unknown or not actions:
+        print(f"Unknown batch action(s): {', '.join(unknown) or 'none given'}, choose from {', '.join(COMMANDS)}")
+        return 2
+    reporter = ConsoleReporter()
+    results = run_batch(options.projects, actions, options, reporter.message, max_workers=options.workers)
+    return 0 if results and all(result['ok'] for result in results) else 1
+
+
+def list_available():
+    print('Project profiles:')
+    for profile_name in discover_available_scripts(PROJECT_PROFILES_DIR):
+        print(f'  {profile_name}')
+    print('Rename scripts:')
+    for script_name in discover_available_scripts(RENAME_APS_DIR):
+        print(f'  {script_name}')
+    return 0
+
+
+def main(argv=None):
+    options = build_parser().parse_args(argv)
+    if options.command is None:
+        # Only the GUI needs wx
+        from main import main as run_gui
+        run_gui(options.profile_startup)
+        return 0
+    if options.command == 'list':
+        return list_available()
+    if options.command == 'batch':
+        return run_batch_command(options)
+    return run_headless(options)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
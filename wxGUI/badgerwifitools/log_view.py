@@ -0,0 +1,166 @@
+# log_view.py
+
+import wx
+
+# Lines held in memory for display, older lines are only kept in the spill file
+LOG_MAX_LINES = 5000
+
+# Spill file rotation, in bytes and number of previous files kept
+LOG_SPILL_MAX_BYTES = 5 * 1024 * 1024
+LOG_SPILL_BACKUP_COUNT = 3
+
+LOG_SPILL_FILENAME = 'display_log.txt'
+
+
+class LogBuffer:
+    """
+    The most recent log lines in a fixed size ring, with the full history appended to a rotating spill file.
+
+    Text after the last newline is the open tail line, which replace_last_line edits in place,
+    the same text AppendText and Replace would leave in a TextCtrl. Only completed lines are spilled.
+    """
+
+    def __init__(self, spill_path, max_lines=LOG_MAX_LINES, max_bytes=LOG_SPILL_MAX_BYTES, backup_count=LOG_SPILL_BACKUP_COUNT):
+        self.spill_path = spill_path
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.tail = ''
+        self.longest_line = 0
+        self._lines = [None] * max_lines
+        self._start = 0
+        self._count = 0
+        self._session_rollovers = 0  # Spill files written since the last clear
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        self._rotate()
+
+    def __len__(self):
+        """Displayed line count, including a non-empty tail."""
+        return self._count + (1 if self.tail else 0)
+
+    def line(self, index):
+        if index < self._count:
+            return self._lines[(self._start + index) % self.max_lines]
+        return self.tail
+
+    def append_text(self, text):
+        """Append text as AppendText would, completed lines go to the ring and the spill file."""
+        lines = (self.tail + text).split('\n')
+        self.tail = lines.pop()
+        if not lines:
+            self.longest_line = max(self.longest_line, len(self.tail))
+            return
+
+        for line in lines[-self.max_lines:]:
+            self._lines[(self._start + self._count) % self.max_lines] = line
+            if self._count < self.max_lines:
+                self._count += 1
+            else:
+                self._start = (self._start + 1) % self.max_lines
+        self.longest_line = max(self.longest_line, len(self.tail), *map(len, lines))
+        self._spill('\n'.join(lines) + '\n')
+
+    def replace_last_line(self, message):
+        """Replace the text after the last newline, e.g. a progress update."""
+        self.tail = ''
+        self.append_text(message)
+
+    def clear(self):
+        """Empty the display and start a new spill file, the cleared history is kept as a backup."""
+        self.tail = ''
+        self.longest_line = 0
+        self._start = 0
+        self._count = 0
+        self._spill_file.close()
+        self._rotate()
+        self._session_rollovers = 0
+
+    def history_text(self):
+        """Everything logged since the last clear that is still on disk, plus the open tail line."""
+        self._spill_file.flush()
+        rollovers = min(self._session_rollovers, self.backup_count)
+        paths = [self._backup_path(number) for number in range(rollovers, 0, -1)] + [self.spill_path]
+        parts = []
+        for path in paths:
+            try:
+                parts.append(path.read_text(encoding='utf-8'))
+            except FileNotFoundError:
+                continue
+        return ''.join(parts) + self.tail
+
+    def close(self):
+        self._spill_file.close()
+
+    def _spill(self, text):
+        if self._spill_file.tell() and self._spill_file.tell() + len(text) > self.max_bytes:
+            self._spill_file.close()
+            self._rotate()
+            self._session_rollovers += 1
+        self._spill_file.write(text)
+        self._spill_file.flush()
+
+    def _backup_path(self, number):
+        return self.spill_path.with_name(f'{self.spill_path.name}.{number}')
+
+    def _rotate(self):
+        # Shift display_log.txt to .1, .1 to .2 and so on, dropping the oldest
+        if self.spill_path.exists() and self.spill_path.stat().st_size:
+            for number in range(self.backup_count - 1, 0, -1):
+                if self._backup_path(number).exists():
+                    self._backup_path(number).replace(self._backup_path(number + 1))
+            if self.backup_count:
+                self.spill_path.replace(self._backup_path(1))
+        self._spill_file = open(self.spill_path, 'w', encoding='utf-8')
+
+
+class LogView(wx.ListCtrl):
+    """
+    Virtual list showing a LogBuffer, only the visible rows are ever drawn or asked for.
+
+    Appending and editing the last line cost the same however long the log has grown.
+    """
+
+    def __init__(self, parent, spill_path, max_lines=LOG_MAX_LINES):
+        wx.ListCtrl.__init__(self, parent, style=wx.LC_REPORT | wx.LC_VIRTUAL | wx.LC_NO_HEADER | wx.LC_SINGLE_SEL)
+        self.buffer = LogBuffer(spill_path, max_lines)
+        self.InsertColumn(0, '')
+        self.Bind(wx.EVT_SIZE, self.on_size)
+
+    def OnGetItemText(self, item, column):
+        return self.buffer.line(item)
+
+    def write(self, text):
+        self.buffer.append_text(text)
+        self.refresh_lines()
+
+    def replace_last_line(self, message):
+        self.buffer.replace_last_line(message)
+        self.refresh_lines()
+
+    def clear(self):
+        self.buffer.clear()
+        self.refresh_lines()
+
+    def history_text(self):
+        return self.buffer.history_text()
+
+    def close(self):
+        self.buffer.close()
+
+    def refresh_lines(self):
+        count = len(self.buffer)
+        self.SetItemCount(count)
+        self.fit_column()
+        if count:
+            # Rows shift up once the ring is full, so redraw what is visible rather than only the last row
+            self.RefreshItems(self.GetTopItem(), count - 1)
+            self.EnsureVisible(count - 1)
+
+    def fit_column(self):
+        # Wide enough for the longest line held, so long lines scroll rather than truncate
+        char_width = self.GetTextExtent('M')[0]
+        self.SetColumnWidth(0, max(self.GetClientSize()[0], (self.buffer.longest_line + 2) * char_width))
+
+    def on_size(self, event):
+        self.fit_column()
+        event.Skip()
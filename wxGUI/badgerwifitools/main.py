@@ -1,17 +1,34 @@
 # main.py
 
-import wx
 import sys
 from pathlib import Path
-from my_frame import MyFrame
 
+import startup_profile
 
-def main():
+
+def finish_startup_profile(frame):
+    # Called once the event loop is running, after the window's first paint has been queued
+    startup_profile.mark('event loop running')
+    startup_profile.finish(frame.config_dir / 'logs')
+
+
+def main(profile_startup=False):
     sys.path.append(str(Path(__file__).resolve().parent))
+    if profile_startup or startup_profile.startup_profile_requested():
+        startup_profile.start()
+
+    # Imported here so a startup profile times them
+    import wx
+    startup_profile.mark('wx imported')
+    from my_frame import MyFrame
+    startup_profile.mark('my_frame imported')
+
     app = wx.App()
-    MyFrame(None, 'BadgerWiFi-tools')
+    frame = MyFrame(None, 'BadgerWiFi-tools')
+    startup_profile.mark('window created')
+    wx.CallAfter(finish_startup_profile, frame)
     app.MainLoop()
 
 
 if __name__ == '__main__':
-    main()
+    main(startup_profile.STARTUP_PROFILE_FLAG in sys.argv[1:])
@@ -1,15 +1,15 @@
 # create_custom_ap_location_maps.py
 
-import wx
 import shutil
-import threading
 from pathlib import Path
 from PIL import Image
 
 from common import nl
-from common import load_json
-from common import create_floor_plans_dict
-from common import create_simulated_radios_dict
+from common import copy_project_image
+from common import project_source
+
+from project_model import load_project_model
+from progress import ProgressTracker
 
 from map_creator.map_creator_comon import vector_source_check
 from map_creator.map_creator_comon import crop_assessment
@@ -19,32 +19,21 @@ from map_creator.map_creator_comon import add_project_filename_to_map
 
 
 CUSTOM_AP_ICON_SIZE_ADJUSTER = 4.87
+RENDER_IMAGES_HELD = 3  # Source, RGBA conversion and annotated copy
 
 
-def create_custom_ap_location_maps_threaded(working_directory, project_name, message_callback, custom_ap_icon_size, ap_name_label_size, stop_event):
-    # Wrapper function to run insert_images in a separate thread
-    def run_in_thread():
-        create_ap_location_maps(working_directory, project_name, message_callback, custom_ap_icon_size, ap_name_label_size, stop_event)
-    # Start the long-running task in a separate thread
-    threading.Thread(target=run_in_thread).start()
-
-
-def create_ap_location_maps(working_directory, project_name, message_callback, custom_ap_icon_size, ap_name_label_size, stop_event):
-    wx.CallAfter(message_callback, f'Creating custom AP location maps for: {project_name}{nl}'
-                                   f'Custom AP icon size: {custom_ap_icon_size}{nl}')
+def create_ap_location_maps(working_directory, project_name, message_callback, custom_ap_icon_size, ap_name_label_size, stop_event, esx_project=None, progress_callback=None):
+    message_callback(f'Creating custom AP location maps for: {project_name}{nl}'
+                     f'Custom AP icon size: {custom_ap_icon_size}{nl}')
 
     custom_ap_icon_size = int(custom_ap_icon_size * CUSTOM_AP_ICON_SIZE_ADJUSTER)
 
-    project_dir = Path(working_directory) / project_name
+    project_dir = project_source(working_directory, project_name, esx_project)
 
-    # Load JSON data
-    floor_plans_json = load_json(project_dir, 'floorPlans.json', message_callback)
-    access_points_json = load_json(project_dir, 'accessPoints.json', message_callback)
-    simulated_radios_json = load_json(project_dir, 'simulatedRadios.json', message_callback)
-
-    # Process data
-    floor_plans_dict = create_floor_plans_dict(floor_plans_json)
-    simulated_radio_dict = create_simulated_radios_dict(simulated_radios_json)
+    # Build or reuse the shared project model
+    model = load_project_model(project_dir, message_callback)
+    floor_plans_dict = model.floor_plans_dict
+    simulated_radio_dict = model.simulated_radio_dict
 
     # Create directory to hold output directories
     output_dir = working_directory / 'OUTPUT'
@@ -62,17 +51,23 @@ def create_ap_location_maps(working_directory, project_name, message_callback, c
     temp_dir = output_dir / 'temp'
     temp_dir.mkdir(parents=True, exist_ok=True)
 
-    for floor in sorted(floor_plans_json['floorPlans'], key=lambda i: i['name']):
+    # Report progress per AP annotated, with a phase per floor
+    floors = sorted(model.floor_plans_json['floorPlans'], key=lambda i: i['name'])
+    progress = ProgressTracker(progress_callback, 'AP location maps', total=sum(len(model.access_points_on_floor(floor['id'])) for floor in floors), unit='AP')
+
+    for floor in floors:
         if stop_event.is_set():
-            wx.CallAfter(message_callback, f'{nl}### PROCESS ABORTED ###')
+            message_callback(f'{nl}### PROCESS ABORTED ###')
+            progress.finish(cancelled=True)
             return
 
-        wx.CallAfter(message_callback, f"{nl}{nl}Processing floor: {floor['name']}{nl}")
+        message_callback(f"{nl}{nl}Processing floor: {floor['name']}{nl}")
 
+        progress.phase(floor['name'])
         floor_id = vector_source_check(floor, message_callback)
 
         # Move floor plan to temp_dir
-        shutil.copy(project_dir / ('image-' + floor_id), temp_dir / floor_id)
+        copy_project_image(project_dir, floor_id, temp_dir / floor_id)
 
         # Open the floor plan to be used for AP placement activities
         source_floor_plan_image = Image.open(temp_dir / floor_id)
@@ -82,20 +77,20 @@ def create_ap_location_maps(working_directory, project_name, message_callback, c
 
         # Ensure the map_image is in 'RGBA' mode
         if source_floor_plan_image.mode != 'RGBA':
-            wx.CallAfter(message_callback, f'Converting {floor_id} to RGBA colour space')
+            message_callback(f'Converting {floor_id} to RGBA colour space')
             source_floor_plan_image = source_floor_plan_image.convert('RGBA')
 
         map_cropped_within_ekahau, scaling_ratio, crop_bitmap = crop_assessment(floor, source_floor_plan_image, project_dir, floor_id, blank_plan_dir)
 
         aps_on_this_floor = []
 
-        for ap in sorted(access_points_json['accessPoints'], key=lambda i: i['name']):
+        for ap in sorted(model.access_points_on_floor(floor['id']), key=lambda i: i.name):
             if stop_event.is_set():
-                wx.CallAfter(message_callback, f'{nl}### PROCESS ABORTED ###')
+                message_callback(f'{nl}### PROCESS ABORTED ###')
+                progress.finish(cancelled=True)
                 return
 
-            if ap['location']['floorPlanId'] == floor['id']:
-                aps_on_this_floor.append(ap)
+            aps_on_this_floor.append(ap.raw)
 
         current_map_image = source_floor_plan_image.copy()
 
@@ -103,16 +98,18 @@ def create_ap_location_maps(working_directory, project_name, message_callback, c
         all_aps = None
 
         if not aps_on_this_floor:
-            wx.CallAfter(message_callback, "No APs on this floor.")
+            message_callback("No APs on this floor.")
             continue
 
         else:
             # Generate the all_aps map
             for ap in aps_on_this_floor:
                 if stop_event.is_set():
-                    wx.CallAfter(message_callback, "### PROCESS ABORTED ###")
+                    message_callback("### PROCESS ABORTED ###")
+                    progress.finish(cancelled=True)
                     return
                 all_aps = annotate_map(current_map_image, ap, scaling_ratio, custom_ap_icon_size, ap_name_label_size, simulated_radio_dict, message_callback, floor_plans_dict)
+                progress.advance()
 
         # If map was cropped within Ekahau, crop the all_AP map
         if map_cropped_within_ekahau:
@@ -120,13 +117,17 @@ def create_ap_location_maps(working_directory, project_name, message_callback, c
 
         # add project filename to the output image
         all_aps = add_project_filename_to_map(all_aps, ap_name_label_size, project_name)
-        wx.CallAfter(message_callback, "map stamped with project filename")
+        message_callback("map stamped with project filename")
 
         # Save the output images
-        all_aps.save(Path(custom_ap_location_maps / floor['name']).with_suffix('.png'))
+        output_path = Path(custom_ap_location_maps / floor['name']).with_suffix('.png')
+        all_aps.save(output_path)
+        progress.advance(0, output_path.stat().st_size)
+
+    progress.finish()
 
     try:
         shutil.rmtree(temp_dir)
-        wx.CallAfter(message_callback, f'{nl}### PROCESS COMPLETE ###{nl}')
+        message_callback(f'{nl}### PROCESS COMPLETE ###{nl}')
     except Exception as e:
-        wx.CallAfter(message_callback, e)
+        message_callback(e)
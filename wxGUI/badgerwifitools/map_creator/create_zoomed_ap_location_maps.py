@@ -3,13 +3,13 @@
 import shutil
 from pathlib import Path
 from PIL import Image
-import threading
-import wx
 
 from common import nl
-from common import load_json
-from common import create_floor_plans_dict
-from common import create_simulated_radios_dict
+from common import copy_project_image
+from common import project_source
+
+from project_model import load_project_model
+from progress import ProgressTracker
 
 from map_creator.map_creator_comon import vector_source_check
 from map_creator.map_creator_comon import crop_assessment
@@ -20,33 +20,22 @@ from map_creator.map_creator_comon import oversize_map_check
 from map_creator.map_creator_comon import OPACITY
 
 CUSTOM_AP_ICON_SIZE_ADJUSTER = 4.87
+RENDER_IMAGES_HELD = 6  # Source, annotated copy, faded background and blend, composite and per AP copy
 
 
-def create_zoomed_ap_location_maps_threaded(working_directory, project_name, message_callback, zoomed_ap_crop_size, custom_ap_icon_size, ap_name_label_size, stop_event):
-    # Wrapper function to run insert_images in a separate thread
-    def run_in_thread():
-        create_zoomed_ap_location_maps(working_directory, project_name, message_callback, zoomed_ap_crop_size, custom_ap_icon_size, ap_name_label_size, stop_event)
-    # Start the long-running task in a separate thread
-    threading.Thread(target=run_in_thread).start()
-
-
-def create_zoomed_ap_location_maps(working_directory, project_name, message_callback, zoomed_ap_crop_size, custom_ap_icon_size, ap_name_label_size, stop_event):
-    wx.CallAfter(message_callback, f'Creating zoomed per AP location maps for {project_name}:{nl}'
-                                   f'Custom AP icon size: {custom_ap_icon_size}{nl}'
-                                   f'Zoomed AP crop size: {zoomed_ap_crop_size}{nl}')
+def create_zoomed_ap_location_maps(working_directory, project_name, message_callback, zoomed_ap_crop_size, custom_ap_icon_size, ap_name_label_size, stop_event, esx_project=None, progress_callback=None):
+    message_callback(f'Creating zoomed per AP location maps for {project_name}:{nl}'
+                     f'Custom AP icon size: {custom_ap_icon_size}{nl}'
+                     f'Zoomed AP crop size: {zoomed_ap_crop_size}{nl}')
 
     custom_ap_icon_size = int(custom_ap_icon_size * CUSTOM_AP_ICON_SIZE_ADJUSTER)
 
-    project_dir = Path(working_directory) / project_name
+    project_dir = project_source(working_directory, project_name, esx_project)
 
-    # Load JSON data
-    floor_plans_json = load_json(project_dir, 'floorPlans.json', message_callback)
-    access_points_json = load_json(project_dir, 'accessPoints.json', message_callback)
-    simulated_radios_json = load_json(project_dir, 'simulatedRadios.json', message_callback)
-
-    # Process data
-    floor_plans_dict = create_floor_plans_dict(floor_plans_json)
-    simulated_radio_dict = create_simulated_radios_dict(simulated_radios_json)
+    # Build or reuse the shared project model
+    model = load_project_model(project_dir, message_callback)
+    floor_plans_dict = model.floor_plans_dict
+    simulated_radio_dict = model.simulated_radio_dict
 
     output_dir = working_directory / 'OUTPUT'
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -67,15 +56,22 @@ def create_zoomed_ap_location_maps(working_directory, project_name, message_call
     temp_dir = output_dir / 'temp'
     temp_dir.mkdir(parents=True, exist_ok=True)
 
-    for floor in sorted(floor_plans_json['floorPlans'], key=lambda i: i['name']):
+    # Report progress per image saved, an AP location map for each floor with APs plus a zoomed image per AP
+    floors = sorted(model.floor_plans_json['floorPlans'], key=lambda i: i['name'])
+    ap_counts = [len(model.access_points_on_floor(floor['id'])) for floor in floors]
+    progress = ProgressTracker(progress_callback, 'Zoomed AP location maps', total=sum(ap_counts) + sum(1 for count in ap_counts if count), unit='image')
+
+    for floor in floors:
         if stop_event.is_set():
-            wx.CallAfter(message_callback, f'{nl}### PROCESS ABORTED ###')
+            message_callback(f'{nl}### PROCESS ABORTED ###')
+            progress.finish(cancelled=True)
             return
 
+        progress.phase(floor['name'])
         floor_id = vector_source_check(floor, message_callback)
 
         # Extract floor plan and save to temp directory
-        shutil.copy(project_dir / ('image-' + floor_id), temp_dir / floor_id)
+        copy_project_image(project_dir, floor_id, temp_dir / floor_id)
 
         # Open the floor plan to be used for AP placement activities
         source_floor_plan_image = Image.open(temp_dir / floor_id)
@@ -84,17 +80,18 @@ def create_zoomed_ap_location_maps(working_directory, project_name, message_call
 
         aps_on_this_floor = []
 
-        for ap in sorted(access_points_json['accessPoints'], key=lambda i: i['name']):
+        for ap in sorted(model.access_points_on_floor(floor['id']), key=lambda i: i.name):
             if stop_event.is_set():
-                wx.CallAfter(message_callback, f'{nl}### PROCESS ABORTED ###')
+                message_callback(f'{nl}### PROCESS ABORTED ###')
+                progress.finish(cancelled=True)
                 return
 
-            if ap['location']['floorPlanId'] == floor['id']:
-                aps_on_this_floor.append(ap)
+            aps_on_this_floor.append(ap.raw)
 
         if aps_on_this_floor:
             if stop_event.is_set():
-                wx.CallAfter(message_callback, f'{nl}### PROCESS ABORTED ###')
+                message_callback(f'{nl}### PROCESS ABORTED ###')
+                progress.finish(cancelled=True)
                 return
 
             current_map_image = source_floor_plan_image.copy()
@@ -103,19 +100,22 @@ def create_zoomed_ap_location_maps(working_directory, project_name, message_call
             all_aps = None
 
             # Generate the all_aps map
-            wx.CallAfter(message_callback, f"{nl}Creating Custom AP location map for: {floor['name']}{nl}")
+            message_callback(f"{nl}Creating Custom AP location map for: {floor['name']}{nl}")
             for ap in aps_on_this_floor:
                 if stop_event.is_set():
-                    wx.CallAfter(message_callback, f'{nl}### PROCESS ABORTED ###')
+                    message_callback(f'{nl}### PROCESS ABORTED ###')
+                    progress.finish(cancelled=True)
                     return
                 all_aps = annotate_map(current_map_image, ap, scaling_ratio, custom_ap_icon_size, ap_name_label_size, simulated_radio_dict, message_callback, floor_plans_dict)
 
             # Save the output images
-            wx.CallAfter(message_callback, f"{nl}Saving annotated floor plan: {floor['name']}{nl}")
-            all_aps.save(Path(custom_ap_location_maps / floor['name']).with_suffix('.png'))
+            message_callback(f"{nl}Saving annotated floor plan: {floor['name']}{nl}")
+            output_path = Path(custom_ap_location_maps / floor['name']).with_suffix('.png')
+            all_aps.save(output_path)
+            progress.advance(1, output_path.stat().st_size)
 
             # Zoom faded AP map generation
-            wx.CallAfter(message_callback, f"{nl}Creating zoomed per AP images for: {floor['name']}{nl}")
+            message_callback(f"{nl}Creating zoomed per AP images for: {floor['name']}{nl}")
 
             # Check if the map is oversized
             oversize_map_check(source_floor_plan_image, message_callback)
@@ -126,7 +126,8 @@ def create_zoomed_ap_location_maps(working_directory, project_name, message_call
 
             for ap in aps_on_this_floor:
                 if stop_event.is_set():
-                    wx.CallAfter(message_callback, f'{nl}### PROCESS ABORTED ###')
+                    message_callback(f'{nl}### PROCESS ABORTED ###')
+                    progress.finish(cancelled=True)
                     return
 
                 per_ap_map_image = annotate_map(all_aps_faded.copy(), ap, scaling_ratio, custom_ap_icon_size, ap_name_label_size, simulated_radio_dict, message_callback, floor_plans_dict)
@@ -134,17 +135,21 @@ def create_zoomed_ap_location_maps(working_directory, project_name, message_call
                 cropped_per_ap_map_image = crop_map(per_ap_map_image, ap, scaling_ratio, zoomed_ap_crop_size)
 
                 # Save the cropped image with a new filename
-                cropped_per_ap_map_image.save(Path(zoom_faded_dir / (ap['name'] + '-zoomed')).with_suffix('.png'))
+                output_path = Path(zoom_faded_dir / (ap['name'] + '-zoomed')).with_suffix('.png')
+                cropped_per_ap_map_image.save(output_path)
+                progress.advance(1, output_path.stat().st_size)
 
             # If map was cropped within Ekahau, crop the all_AP map
             if map_cropped_within_ekahau:
                 all_aps = all_aps.crop(crop_bitmap)
 
         else:
-            wx.CallAfter(message_callback, f"{nl}No APs found on floor: {floor['name']}{nl}")
+            message_callback(f"{nl}No APs found on floor: {floor['name']}{nl}")
+
+    progress.finish()
 
     try:
         shutil.rmtree(temp_dir)
-        wx.CallAfter(message_callback, f'{nl}### Process Complete ###{nl}')
+        message_callback(f'{nl}### Process Complete ###{nl}')
     except Exception as e:
         print(e)
@@ -3,7 +3,6 @@
 import shutil
 from pathlib import Path
 
-import wx
 from PIL import Image
 
 from common import nl
@@ -18,7 +17,7 @@ def export_floor_plan(source, destination, crop_bitmap=None):
         img.save(destination)
 
 
-def extract_blank_maps(working_directory, project_name, message_callback):
+def extract_blank_maps(working_directory, project_name, message_callback, stop_event=None):
     project_dir = Path(working_directory) / project_name
     output_dir = working_directory / 'OUTPUT' / 'blank'
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -26,6 +25,9 @@ def extract_blank_maps(working_directory, project_name, message_callback):
     floor_plans_json = load_json(project_dir, 'floorPlans.json', message_callback)
 
     for floor in floor_plans_json['floorPlans']:
+        if stop_event and stop_event.is_set():
+            message_callback(f'{nl}### PROCESS ABORTED ###')
+            return
         floor_id = vector_source_check(floor, message_callback)
         source_path = project_dir / f'image-{floor_id}'
         dest_path = output_dir / f"{floor['name']}.png"
@@ -39,5 +41,5 @@ def extract_blank_maps(working_directory, project_name, message_callback):
         else:
             shutil.copy(source_path, dest_path)
 
-        wx.CallAfter(message_callback, f"{nl}Exported blank map for {floor['name']} to:{nl}{dest_path}{nl}")
-    wx.CallAfter(message_callback, f"{nl}### PROCESS COMPLETE ###")
+        message_callback(f"{nl}Exported blank map for {floor['name']} to:{nl}{dest_path}{nl}")
+    message_callback(f"{nl}### PROCESS COMPLETE ###")
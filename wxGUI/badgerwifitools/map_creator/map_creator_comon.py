@@ -1,19 +1,20 @@
 # map_creator_comon.py
 
 import os
-import wx
 import math
-import shutil
 import platform
 from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont
 
 from common import ekahau_color_dict
 from common import model_antenna_split
+from common import copy_project_image
 from common import FIVE_GHZ_RADIO_ID
 
 from common import OVERSIZE_MAP_LIMIT
 from common import nl
+from message_sink import post_detail
+from project_model import load_project_model
 
 # Static PIL Parameters
 EDGE_BUFFER = 80  # gap between rounded rectangle and cropped image edge
@@ -22,6 +23,9 @@ OPACITY = 0.5  # Value from 0 -> 1, defines the opacity of the 'other' APs on zo
 WINDOWS_FONT = 'Consola.ttf'
 MACOS_FONT = 'Menlo.ttc'
 
+# Bytes per pixel of the RGBA images maps are drawn on, used to estimate render memory
+RGBA_BYTES_PER_PIXEL = 4
+
 # Define assets directory path
 ASSETS_DIR = Path(__file__).parent / 'assets'
 
@@ -35,6 +39,17 @@ def set_font(font_size):
         return ImageFont.truetype(MACOS_FONT, font_size)
 
 
+def estimate_render_memory(project_dir, images_held, message_callback=print):
+    """
+    Peak bytes to render the project's largest floor plan, map creators render one floor at a time.
+
+    images_held is how many full size RGBA copies of the floor plan the map creator holds at once.
+    """
+    model = load_project_model(project_dir, message_callback)
+    largest_floor = max(((floor.width or 0) * (floor.height or 0) for floor in model.floor_plans.values()), default=0)
+    return int(largest_floor * RGBA_BYTES_PER_PIXEL * images_held)
+
+
 def get_rrect_text_border_space(font_size):
     return (font_size // 3) + 2
 
@@ -42,7 +57,7 @@ def get_rrect_text_border_space(font_size):
 def vector_source_check(floor, message_callback):
     # Check if the floor plan is a vector or bitmap image
     if 'bitmapImageId' in floor:
-        wx.CallAfter(message_callback, f'bitmapImageId detected, source floor plan image is probably a vector')
+        message_callback(f'bitmapImageId detected, source floor plan image is probably a vector')
         return floor['bitmapImageId']
     else:
         return floor['imageId']
@@ -120,7 +135,7 @@ def crop_assessment(floor, source_floor_plan_image, project_dir, floor_id, blank
         map_cropped_within_ekahau = False
 
         # save a blank copy of the floor plan
-        shutil.copy(project_dir / ('image-' + floor_id), Path(blank_plan_dir / floor['name']).with_suffix('.png'))
+        copy_project_image(project_dir, floor_id, Path(blank_plan_dir / floor['name']).with_suffix('.png'))
 
         return map_cropped_within_ekahau, scaling_ratio, None
 
@@ -142,7 +157,7 @@ def crop_map(map_image, ap, scaling_ratio, zoomed_ap_crop_size):
 
 def oversize_map_check(map_image, message_callback):
     if map_image.width > OVERSIZE_MAP_LIMIT or map_image.height > OVERSIZE_MAP_LIMIT:
-        wx.CallAfter(message_callback, f"{'#' * 20} WARNING {'#' * 20}{nl}Map is larger than {OVERSIZE_MAP_LIMIT} pixels.{nl}This may cause undesirable output artefacts.{nl}{'#' * 49}{nl}")
+        message_callback(f"{'#' * 20} WARNING {'#' * 20}{nl}Map is larger than {OVERSIZE_MAP_LIMIT} pixels.{nl}This may cause undesirable output artefacts.{nl}{'#' * 49}{nl}")
 
 
 def annotate_map(map_image, ap, scaling_ratio, custom_ap_icon_size, font_size, simulated_radio_dict, message_callback, floor_plans_dict):
@@ -155,7 +170,7 @@ def annotate_map(map_image, ap, scaling_ratio, custom_ap_icon_size, font_size, s
     x, y = (ap['location']['coord']['x'] * scaling_ratio,
             ap['location']['coord']['y'] * scaling_ratio)
 
-    wx.CallAfter(message_callback, f"{ap['name']} ({model_antenna_split(ap['model'])[0]}) ][ {floor_plans_dict.get(ap['location']['floorPlanId']).get('name')} ][ colour: {ekahau_color_dict.get(ap_color)} ][ coordinates {round(x)}, {round(y)}")
+    post_detail(message_callback, f"{ap['name']} ({model_antenna_split(ap['model'])[0]}) ][ {floor_plans_dict.get(ap['location']['floorPlanId']).get('name')} ][ colour: {ekahau_color_dict.get(ap_color)} ][ coordinates {round(x)}, {round(y)}")
 
     spot = get_ap_icon(ap, custom_ap_icon_size)
 
@@ -180,13 +195,13 @@ def annotate_map(map_image, ap, scaling_ratio, custom_ap_icon_size, font_size, s
     antenna_mounting = simulated_radio_dict[ap['id']][FIVE_GHZ_RADIO_ID]['antennaMounting']
 
     if antenna_mounting == 'WALL' or antenna_tilt_angle != 0:
-        wx.CallAfter(message_callback, f'AP directional arrow is considered relevant')
+        post_detail(message_callback, f'AP directional arrow is considered relevant')
 
         if antenna_mounting == 'WALL':
-            wx.CallAfter(message_callback, f'AP is WALL mounted')
+            post_detail(message_callback, f'AP is WALL mounted')
 
         if antenna_tilt_angle != 0:
-            wx.CallAfter(message_callback, f'AP has antenna tilt angle of: {round(antenna_tilt_angle)}')
+            post_detail(message_callback, f'AP has antenna tilt angle of: {round(antenna_tilt_angle)}')
 
         rotated_arrow = arrow.rotate(-antenna_direction_angle, expand=True)
 
@@ -233,7 +248,7 @@ def annotate_pds_map(map_image, ap, scaling_ratio, custom_ap_icon_size, font_siz
     x, y = (ap['location']['coord']['x'] * scaling_ratio,
             ap['location']['coord']['y'] * scaling_ratio)
 
-    wx.CallAfter(message_callback, f"{ap['name']} ({model_antenna_split(ap['model'])[0]}) ][ {floor_plans_dict.get(ap['location']['floorPlanId']).get('name')} ][ colour: {ekahau_color_dict.get(ap_color)} ][ coordinates {round(x)}, {round(y)}")
+    post_detail(message_callback, f"{ap['name']} ({model_antenna_split(ap['model'])[0]}) ][ {floor_plans_dict.get(ap['location']['floorPlanId']).get('name')} ][ colour: {ekahau_color_dict.get(ap_color)} ][ coordinates {round(x)}, {round(y)}")
 
     spot = Image.open(ASSETS_DIR / 'custom' / 'spot.png')
     spot = spot.resize((custom_ap_icon_size, custom_ap_icon_size))
@@ -259,13 +274,13 @@ def annotate_pds_map(map_image, ap, scaling_ratio, custom_ap_icon_size, font_siz
     antenna_mounting = simulated_radio_dict[ap['id']][FIVE_GHZ_RADIO_ID]['antennaMounting']
 
     if antenna_mounting == 'WALL' or antenna_tilt_angle != 0:
-        wx.CallAfter(message_callback, f'AP directional arrow is considered relevant')
+        post_detail(message_callback, f'AP directional arrow is considered relevant')
 
         if antenna_mounting == 'WALL':
-            wx.CallAfter(message_callback, f'AP is WALL mounted')
+            post_detail(message_callback, f'AP is WALL mounted')
 
         if antenna_tilt_angle != 0:
-            wx.CallAfter(message_callback, f'AP has antenna tilt angle of: {round(antenna_tilt_angle)}')
+            post_detail(message_callback, f'AP has antenna tilt angle of: {round(antenna_tilt_angle)}')
 
         rotated_arrow = arrow.rotate(-antenna_direction_angle, expand=True)
 
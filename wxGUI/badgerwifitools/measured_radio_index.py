@@ -0,0 +1,104 @@
+# measured_radio_index.py
+
+from functools import cached_property
+
+import numpy as np
+
+from common import range_two, range_five, range_six
+
+BAND_NAMES = ('two', 'five', 'six')
+
+
+def build_band_lookup(ranges=(range_two, range_five, range_six), band_names=BAND_NAMES):
+    """Map every centre frequency in MHz within the band ranges to its band name."""
+    lookup = {}
+    # Assign in reverse so the first matching range wins, as the chained range comparisons did
+    for band_name, (low, high) in reversed(list(zip(band_names, ranges))):
+        lookup.update(dict.fromkeys(range(low, high + 1), band_name))
+    return lookup
+
+
+BAND_BY_CENTRE_FREQUENCY = build_band_lookup()
+
+
+class MeasuredRadioIndex:
+    """
+    Surveyed measurements indexed by AP, band and BSSID, built in a single pass over measuredRadios.
+
+    The pass buckets each measurement under its AP and band, found from its lowest centre frequency
+    with a precomputed lookup. Flat per-band arrays and the BSSID view are derived on first use.
+    """
+
+    def __init__(self, measured_radios_json, access_point_measurements_json):
+        measurements_by_id = {measurement['id']: measurement for measurement in access_point_measurements_json['accessPointMeasurements']}
+        band_lookup = BAND_BY_CENTRE_FREQUENCY
+
+        # {access point id: {band name: {mac: measurement}}}, in the order APs first appear in measuredRadios
+        self.access_points = {}
+
+        for radio in measured_radios_json['measuredRadios']:
+            access_point_id = radio['accessPointId']
+            bands = self.access_points.get(access_point_id)
+            if bands is None:
+                bands = self.access_points[access_point_id] = {}
+
+            for measurement_id in radio.get('accessPointMeasurementIds', ()):
+                measurement = measurements_by_id.get(measurement_id)
+                if not measurement:
+                    continue
+                frequencies = measurement.get('channelByCenterFrequencyDefinedNarrowChannels')
+                band_name = band_lookup.get(frequencies[0]) if frequencies else None
+                if band_name is None:
+                    continue
+                band = bands.get(band_name)
+                if band is None:
+                    band = bands[band_name] = {}
+                band[measurement.get('mac')] = measurement
+
+    def __len__(self):
+        return sum(len(band) for bands in self.access_points.values() for band in bands.values())
+
+    def access_point(self, access_point_id):
+        """An AP's measurements keyed by band name then BSSID, e.g. {'five': {mac: measurement}}."""
+        return self.access_points.get(access_point_id, {})
+
+    @cached_property
+    def bands(self):
+        """
+        Compact per-band arrays, {band name: (access point ids, measurements)}.
+
+        access point ids is a NumPy array parallel to the measurements list, for vectorised per-band selection and counts.
+        """
+        bands = {}
+        for band_name in BAND_NAMES:
+            access_point_ids = []
+            measurements = []
+            for access_point_id, ap_bands in self.access_points.items():
+                band = ap_bands.get(band_name)
+                if band:
+                    access_point_ids.extend([access_point_id] * len(band))
+                    measurements.extend(band.values())
+            bands[band_name] = (np.array(access_point_ids, dtype=object), measurements)
+        return bands
+
+    def band_measurements(self, band_name):
+        """Every measurement in a band, 'two', 'five' or 'six'."""
+        return self.bands[band_name][1]
+
+    @cached_property
+    def bssids(self):
+        """{mac: [(access point id, band name, measurement), ...]} across every AP and band."""
+        bssids = {}
+        for access_point_id, ap_bands in self.access_points.items():
+            for band_name, band in ap_bands.items():
+                for mac, measurement in band.items():
+                    bssids.setdefault(mac, []).append((access_point_id, band_name, measurement))
+        return bssids
+
+    def bssid(self, mac):
+        """(access point id, band name, measurement) for every measurement of a BSSID."""
+        return self.bssids.get(mac, [])
+
+    def as_measured_radios_dict(self):
+        """The {access point id: {band: {mac: measurement}}} shape expected by the project profiles."""
+        return self.access_points
@@ -0,0 +1,67 @@
+# message_sink.py
+
+from collections import deque
+
+# Verbosity levels, a message is shown when its level is at or below the sink's verbosity
+INFO = 1
+DETAIL = 2  # Per-AP and per-item chatter
+
+LOG_FLUSH_INTERVAL_MS = 200
+
+
+def accepts_level(message_callback):
+    """Mark a message callback as taking a level argument, see post_detail."""
+    message_callback.accepts_level = True
+    return message_callback
+
+
+def post_detail(message_callback, message):
+    """Send per-item chatter, dropped by a sink whose verbosity is below DETAIL."""
+    if getattr(message_callback, 'accepts_level', False):
+        message_callback(message, DETAIL)
+    else:
+        message_callback(message)
+
+
+class MessageSink:
+    """
+    Buffer log messages from any thread and write them to the log on the UI thread in batches.
+
+    post only appends to a deque, which is safe to call from worker threads without a lock or wx.CallAfter.
+    A wx.Timer drains the deque a few times per second into a single write call.
+    """
+
+    def __init__(self, write, verbosity=INFO):
+        self.write = write
+        self.verbosity = verbosity
+        self._messages = deque()
+        self._timer = None
+
+    @accepts_level
+    def post(self, message, level=INFO):
+        if level <= self.verbosity:
+            self._messages.append(message)
+
+    def start(self, owner, interval_ms=LOG_FLUSH_INTERVAL_MS):
+        """Flush on a timer owned by a window, call from the UI thread."""
+        # Imported here so worker modules using post_detail never load wx, e.g. in a headless run
+        import wx
+
+        self._timer = wx.Timer(owner)
+        owner.Bind(wx.EVT_TIMER, lambda event: self.flush(), self._timer)
+        self._timer.Start(interval_ms)
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.Stop()
+            self._timer = None
+        self.flush()
+
+    def flush(self):
+        """Write every buffered message in one call, call from the UI thread."""
+        # Only take what is queued now, messages posted while writing wait for the next flush
+        count = len(self._messages)
+        if not count:
+            return
+        popleft = self._messages.popleft
+        self.write('\n'.join([str(popleft()) for _ in range(count)]) + '\n')
@@ -3,37 +3,47 @@
 import wx
 import os
 import json
-import threading
 import webbrowser
 import subprocess
 import importlib.util
 import platform
 import random
+import zipfile
 
 from pathlib import Path
-from importlib.machinery import SourceFileLoader
 
 from drop_target import DropTarget
+from project_model import ProjectCache
+from message_sink import MessageSink, accepts_level, INFO, DETAIL
+from log_view import LogView, LOG_SPILL_FILENAME
+from progress import record_job_timings, format_seconds, JOB_TIMINGS_FILENAME
+from progress_panel import ProgressPanel
+from job_executor import get_executor, QUEUED, RUNNING, DONE, FAILED, CANCELLED
 from common import file_or_dir_exists
+from common import project_source
 
-from esx_actions.validate_esx import validate_esx
 from esx_actions.unpack_esx import unpack_esx_file
+from esx_actions.unpack_esx import unpack_scope_covers
+from esx_actions.unpack_esx import UNPACK_JSON_ONLY
+from esx_actions.unpack_esx import UNPACK_JSON_AND_FLOOR_PLANS
+from esx_actions.unpack_esx import UNPACK_EVERYTHING
 from esx_actions.backup_esx import backup_esx
-from esx_actions.ap_list_creator import create_ap_list
+from esx_actions.backup_esx import restore_esx_backup
+from esx_actions.backup_esx import backup_folder_path
+from esx_actions.backup_esx import BACKUP_MANIFEST_SUFFIX
 from esx_actions.rebundle_esx import rebundle_project
+from esx_actions.diff_esx import diff_esx_projects
 
 from project_detail.Summarise import run as summarise_esx
 
-from rename_aps.rename_visualiser import visualise_ap_renaming
 from rename_aps.ap_renamer import ap_renamer
 
 from exports import export_ap_images
 from exports import export_note_images
 
-from map_creator.extract_blank_maps import extract_blank_maps
-from map_creator.create_ap_location_maps import create_custom_ap_location_maps_threaded
-from map_creator.create_zoomed_ap_location_maps import create_zoomed_ap_location_maps_threaded
-from map_creator.create_pds_maps import create_pds_maps_threaded
+from launcher import COMMANDS as BATCH_ACTIONS
+from launcher import DEFAULT_BATCH_ACTIONS
+from launcher import default_options
 
 from common import nl
 from common import CONFIGURATION_DIR
@@ -47,15 +57,22 @@ from common import CALL_TO_DONATE_MESSAGE
 from common import DIR_STRUCTURE_PROFILES_DIR
 
 from common import discover_available_scripts
-from common import import_module_from_path
+from common import deferred_import
+
+from plugin_registry import get_plugin_registry
 
-from admin import check_for_updates
 from admin.dir_creator import select_root_and_create_directory_structure
 from admin.dir_creator import preview_directory_structure
 
-from survey.surveyed_ap_list import create_surveyed_ap_list
 from survey.pds_project_creator import create_pds_project_esx
 
+# Heavier actions import their module on first use, on the job's worker thread, keeping numpy, pandas, PIL and multiprocessing out of startup
+validate_esx = deferred_import('esx_actions.validate_esx', 'validate_esx')
+create_ap_list = deferred_import('esx_actions.ap_list_creator', 'create_ap_list')
+create_surveyed_ap_list = deferred_import('survey.surveyed_ap_list', 'create_surveyed_ap_list')
+extract_blank_maps = deferred_import('map_creator.extract_blank_maps', 'extract_blank_maps')
+run_batch = deferred_import('batch_runner', 'run_batch')
+
 
 class MyFrame(wx.Frame):
     def __init__(self, parent, title):
@@ -104,9 +121,11 @@ class MyFrame(wx.Frame):
         self.esx_project_unpacked = False
         self.working_directory = None
         self.esx_project_unpacked = False  # Initialize the state variable
+        self.esx_unpacked_scope = None  # Which members were extracted, see unpack_esx_file member_filter
         self.working_directory = None
         self.esx_project_name = None
         self.esx_filepath = None
+        self.project_cache = ProjectCache()  # Open .esx archive and parsed project data, shared between actions
         self.current_project_profile_module = None
         self.rename_aps_boundary_separator = 200  # Initialize the boundary separator variable
         self.esx_required_tag_keys = {}
@@ -121,8 +140,11 @@ class MyFrame(wx.Frame):
         # Define the path for the application state file
         self.app_state_file_path = self.config_dir / 'app_state.json'
 
-        # Create a thread control variable
-        self.stop_event = threading.Event()  # Initialize the stop event
+        # Long running actions are queued on the shared job executor, each job has its own stop_event
+        self.executor = get_executor()
+        self.executor.add_listener(self.on_job_update)
+        self.action_jobs = {}  # Jobs started by run_action, {job: (exclusive, on_finished)}
+        self.pending_project_closes = []  # EsxProjects closed while jobs were running, closed once they finish
 
     def setup_list_box(self):
         # Set up your list box here
@@ -131,13 +153,20 @@ class MyFrame(wx.Frame):
         self.list_box.Bind(wx.EVT_KEY_DOWN, self.on_delete_key)
 
     def setup_display_log(self):
-        # Setup display log here
-        self.display_log = wx.TextCtrl(self.panel, style=wx.TE_MULTILINE | wx.TE_READONLY)
+        # Setup display log here, a virtual list of recent lines with the full history spilled to the configuration directory
+        self.display_log = LogView(self.panel, self.config_dir / 'logs' / LOG_SPILL_FILENAME)
 
         # Set a monospaced font for display_log
         monospace_font = wx.Font(14, wx.FONTFAMILY_TELETYPE, wx.FONTSTYLE_NORMAL, wx.FONTWEIGHT_NORMAL)
         self.display_log.SetFont(monospace_font)
 
+        # Messages are buffered and written to display_log in batches, see append_message
+        self.message_sink = MessageSink(self.display_log.write)
+        self.message_sink.start(self)
+
+        # Progress bar for long running jobs, workers send it ProgressEvents through progress_callback
+        self.progress_panel = ProgressPanel(self.panel, self.on_job_finished)
+
     def setup_dropdowns(self):
         """
         Setup all dropdown elements
@@ -228,11 +257,21 @@ class MyFrame(wx.Frame):
         self.rebundle_button.Bind(wx.EVT_BUTTON, self.on_rebundle_esx)
         self.rebundle_button.SetToolTip(wx.ToolTip("Re-bundle the unpacked project into a new .esx file"))
 
+        # Create batch button
+        self.batch_button = wx.Button(self.panel, label="Batch")
+        self.batch_button.Bind(wx.EVT_BUTTON, self.on_batch)
+        self.batch_button.SetToolTip(wx.ToolTip("Run a pipeline of actions on every .esx file in the file list, several projects at once"))
+
         # Create backup esx file button
         self.backup_button = wx.Button(self.panel, label="Backup .esx")
         self.backup_button.Bind(wx.EVT_BUTTON, self.on_backup)
         self.backup_button.SetToolTip(wx.ToolTip("Make a backup the of .esx file currently in the file list"))
 
+        # Create compare esx files button
+        self.compare_button = wx.Button(self.panel, label="Compare .esx")
+        self.compare_button.Bind(wx.EVT_BUTTON, self.on_compare_esx)
+        self.compare_button.SetToolTip(wx.ToolTip("Compare the .esx file currently in the file list against another revision"))
+
         # Create a button to execute the selected AP renaming script
         self.rename_aps_button = wx.Button(self.tab1, label="Rename APs")
         self.rename_aps_button.Bind(wx.EVT_BUTTON, self.on_rename_aps)
@@ -319,6 +358,19 @@ class MyFrame(wx.Frame):
         self.exit_button = wx.Button(self.panel, label="Exit")
         self.exit_button.Bind(wx.EVT_BUTTON, self.on_exit)
 
+        # Actions that rewrite the project directory, disabled while any project job runs
+        self.exclusive_action_buttons = [self.unpack_button, self.rename_aps_button, self.batch_button]
+
+        # Every action run as a project job, disabled while an exclusive job runs
+        self.project_action_buttons = [
+            self.unpack_button, self.rebundle_button, self.backup_button, self.compare_button, self.batch_button,
+            self.rename_aps_button, self.visualise_ap_renaming_button, self.create_ap_list, self.validate_button,
+            self.summarise_button, self.export_ap_images_button, self.export_note_images_button,
+            self.extract_blank_maps_button, self.create_ap_location_maps_button, self.create_zoomed_ap_maps_button,
+            self.export_pds_maps_button, self.create_pds_project_button, self.create_surveyed_ap_list_button,
+            self.display_project_detail_button,
+        ]
+
     def setup_text_input_boxes(self):
         # Create a text input box for the AP icon size
         self.ap_icon_size_text_box = wx.TextCtrl(self.tab2, value="25", style=wx.TE_PROCESS_ENTER)
@@ -362,6 +414,8 @@ class MyFrame(wx.Frame):
         self.button_row2_sizer.Add(self.unpack_button, 0, wx.LEFT | wx.RIGHT | wx.BOTTOM, self.widget_margin)
         self.button_row2_sizer.Add(self.rebundle_button, 0, wx.LEFT | wx.RIGHT | wx.BOTTOM, self.widget_margin)
         self.button_row2_sizer.Add(self.backup_button, 0, wx.LEFT | wx.RIGHT | wx.BOTTOM, self.widget_margin)
+        self.button_row2_sizer.Add(self.compare_button, 0, wx.LEFT | wx.RIGHT | wx.BOTTOM, self.widget_margin)
+        self.button_row2_sizer.Add(self.batch_button, 0, wx.LEFT | wx.RIGHT | wx.BOTTOM, self.widget_margin)
 
         self.button_exit_row_sizer = wx.BoxSizer(wx.HORIZONTAL)
         self.button_exit_row_sizer.AddStretchSpacer(1)
@@ -373,6 +427,7 @@ class MyFrame(wx.Frame):
         main_sizer.Add(self.list_box, 0, wx.EXPAND | wx.ALL, self.widget_margin)
         main_sizer.Add(self.button_row1_sizer, 0, wx.EXPAND | wx.LEFT | wx.RIGHT, self.sizer_edge_margin)
         main_sizer.Add(self.display_log, 1, wx.EXPAND | wx.ALL, self.widget_margin)
+        main_sizer.Add(self.progress_panel, 0, wx.EXPAND | wx.LEFT | wx.RIGHT, self.widget_margin)
         main_sizer.Add(self.button_row2_sizer, 0, wx.EXPAND | wx.ALL, self.sizer_edge_margin)
         main_sizer.Add(self.notebook, 0, wx.EXPAND | wx.ALL, self.notebook_margin)
         main_sizer.Add(self.button_exit_row_sizer, 0, wx.EXPAND | wx.ALL, self.sizer_edge_margin)
@@ -581,6 +636,9 @@ class MyFrame(wx.Frame):
         file_menu = wx.Menu()
         file_menu.Append(wx.ID_ADD, "&Add Files", "Add files to the list")
         file_menu.Append(wx.ID_SAVE, "&Save", "Save the current configuration")
+        restore_backup_menu_item = file_menu.Append(wx.ID_ANY, "&Restore Backup", "Rebuild an .esx file from a backup")
+        file_menu.AppendSeparator()
+        self.verbose_log_menu_item = file_menu.AppendCheckItem(wx.ID_ANY, "&Verbose Log", "Show per-AP detail messages in the log")
         file_menu.AppendSeparator()
         file_menu.Append(wx.ID_EXIT, "&Exit", "Exit the application")
         menubar.Append(file_menu, "&File")
@@ -601,6 +659,8 @@ class MyFrame(wx.Frame):
         self.Bind(wx.EVT_MENU, self.on_add_file, id=wx.ID_ADD)
         self.Bind(wx.EVT_MENU, self.on_save, id=wx.ID_SAVE)
         self.Bind(wx.EVT_MENU, self.on_exit, id=wx.ID_EXIT)
+        self.Bind(wx.EVT_MENU, self.on_restore_backup, restore_backup_menu_item)
+        self.Bind(wx.EVT_MENU, self.on_verbose_log, self.verbose_log_menu_item)
 
         self.Bind(wx.EVT_MENU, self.on_contribute, contribute_menu_item)
         self.Bind(wx.EVT_MENU, self.on_view_documentation, documentation_menu_item)
@@ -646,20 +706,17 @@ class MyFrame(wx.Frame):
             self.append_message(welcome_message)
 
     def load_module(self, module_subdir, module_name):
-        module_path = Path(__file__).resolve().parent / module_subdir / f"{module_name}.py"
-        spec = importlib.util.spec_from_file_location(module_name, str(module_path))
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        return module
+        # Executed once and reused until the file changes
+        return get_plugin_registry(module_subdir).load(module_name)
 
     def on_create_surveyed_ap_list(self, event):
         if not hasattr(self.current_profile_ap_list_module, 'create_custom_measured_ap_list'):
             self.append_message("Currently selected project profile has no survey ap list export definition.")
             return
-        elif not self.basic_checks():
+        elif not self.basic_checks(UNPACK_JSON_ONLY):
             return
         else:
-            create_surveyed_ap_list(self.working_directory, self.esx_project_name, self.current_profile_ap_list_module.create_custom_measured_ap_list, self.append_message)
+            self.run_action('Surveyed AP list', create_surveyed_ap_list, (self.working_directory, self.esx_project_name, self.current_profile_ap_list_module.create_custom_measured_ap_list, self.append_message), unpack_filter=UNPACK_JSON_ONLY)
 
     def on_admin_actions_dropdown_selection(self, event):
         selected_index = self.admin_actions_dropdown.GetSelection()
@@ -670,6 +727,7 @@ class MyFrame(wx.Frame):
         self.current_admin_action_module.run(self.append_message)
 
     def on_check_for_updates(self, event):
+        from admin import check_for_updates
         check_for_updates.check_for_updates(self.append_message)
 
     def on_project_detail_dropdown_selection(self, event):
@@ -680,7 +738,7 @@ class MyFrame(wx.Frame):
     def on_display_project_detail(self, event):
         if not self.basic_checks():
             return
-        self.current_project_detail_module.run(self.working_directory, self.esx_project_name, self.append_message)
+        self.run_action('Project detail', self.current_project_detail_module.run, (self.working_directory, self.esx_project_name, self.append_message), unpack_filter=UNPACK_EVERYTHING)
 
     def on_dir_structure_profile_dropdown_selection(self, event):
         selected_index = self.dir_structure_profile_dropdown.GetSelection()
@@ -699,26 +757,26 @@ class MyFrame(wx.Frame):
         drop_target = DropTarget(self.list_box, allowed_extensions, self.append_message, self.esx_project_unpacked, self.update_esx_project_unpacked, self.drop_target_label_callback)
         self.list_box.SetDropTarget(drop_target)
 
-    def append_message(self, message):
-        # Append a message to the message display area.
-        self.display_log.AppendText(message + '\n')
-
-    def update_last_message(self, message):
-        content = self.display_log.GetValue()
+    @accepts_level
+    def append_message(self, message, level=INFO):
+        # Queue a message for the display area, safe to call from worker threads
+        self.message_sink.post(message, level)
 
-        # Find the last occurrence of a newline character
-        last_newline_index = content.rfind('\n')
+    def on_verbose_log(self, event):
+        self.message_sink.verbosity = DETAIL if self.verbose_log_menu_item.IsChecked() else INFO
 
-        # If there's at least one newline, replace the text after the last newline
-        if last_newline_index != -1:
-            # Calculate the start position for replacement (after the newline character)
-            start_pos = last_newline_index + 1  # Start replacing after the newline
+    def on_job_finished(self, event):
+        # Keep per-phase timings, e.g. per floor render throughput, for later comparison, aborted runs would skew them
+        if not event.cancelled:
+            record_job_timings(self.config_dir / 'logs' / JOB_TIMINGS_FILENAME, event)
+        for phase, units, seconds, nbytes in event.phases:
+            rate = f', {units / seconds:.1f} {event.unit}s/s' if seconds > 0 and units else ''
+            self.append_message(f'{phase}: {units} {event.unit}s in {format_seconds(seconds)}{rate}', DETAIL)
 
-            # Use Replace method to replace the last line
-            self.display_log.Replace(start_pos, self.display_log.GetLastPosition(), message)
-        else:
-            # If there's no newline, this means there's only one line, so we can directly set the value
-            self.display_log.SetValue(message)
+    def update_last_message(self, message):
+        self.message_sink.flush()
+        # Replace the text after the last newline
+        self.display_log.replace_last_line(message)
 
     def save_application_state(self, event):
         """Save the application state to the defined path."""
@@ -732,7 +790,8 @@ class MyFrame(wx.Frame):
             'selected_tab_index': self.notebook.GetSelection(),
             'ap_icon_size_text_box': self.ap_icon_size_text_box.GetValue(),
             'zoomed_ap_crop_text_box': self.zoomed_ap_crop_text_box.GetValue(),
-            'boundary_separator_value': self.rename_aps_boundary_separator
+            'boundary_separator_value': self.rename_aps_boundary_separator,
+            'verbose_log': self.verbose_log_menu_item.IsChecked()
         }
         # Save the state to the defined path
         with open(self.app_state_file_path, 'w') as f:
@@ -751,6 +810,10 @@ class MyFrame(wx.Frame):
                     self.list_box.Append(item)
                     self.drop_target_label.Hide()  # Hide the drop target label
 
+                # Restore the log verbosity
+                self.verbose_log_menu_item.Check(state.get('verbose_log', False))
+                self.on_verbose_log(None)
+
                 # Restore the boundary separator value
                 self.rename_aps_boundary_separator = state.get('boundary_separator_value', 400)
 
@@ -789,17 +852,21 @@ class MyFrame(wx.Frame):
 
     def on_reset(self, event):
         self.list_box.Clear()  # Reset list_box contents
-        self.display_log.SetValue("")  # Clear the contents of the display_log
+        self.message_sink.flush()
+        self.display_log.clear()  # Clear the contents of the display_log
+        self.executor.cancel_all()  # Stop any jobs working on the previous project
+        self.progress_panel.reset()
         self.display_message_on_reset()
         self.esx_project_unpacked = False  # Reset project_unpacked state
+        self.close_esx_project()
         self.drop_target_label.Show()  # Show the drop target label
         self.ap_icon_size_text_box.SetValue("25")  # Reset the AP icon size
         self.zoomed_ap_crop_text_box.SetValue("2000")  # Reset the zoomed AP crop size
         self.rename_aps_boundary_separator = 200  # Reset the boundary separator value
-        self.stop_event.clear()  # Clear the stop event
 
     def on_clear_log(self, event):
-        self.display_log.SetValue("")  # Clear the contents of the display_log
+        self.message_sink.flush()
+        self.display_log.clear()  # Clear the contents of the display_log
 
     def on_add_file(self, event):
         existing_files = self.list_box.GetStrings()  # Get currently listed files
@@ -862,50 +929,109 @@ class MyFrame(wx.Frame):
                 self.list_box.Delete(index)
 
     def on_unpack(self, event):
-        if not self.esx_project_unpacked:
-            self.unpack_esx()
-            return
-        # Create a message dialog with Yes and No buttons
-        dlg = wx.MessageDialog(None, "Project has already been unpacked. Would you like to re-unpack it?",
-                               "Re-unpack project?", wx.YES_NO | wx.ICON_QUESTION)
-        # Show the dialog and check the response
-        result = dlg.ShowModal()
-
-        if result == wx.ID_YES:
+        if not self.unpack_needed(UNPACK_EVERYTHING):
+            # Create a message dialog with Yes and No buttons
+            dlg = wx.MessageDialog(None, "Project has already been unpacked. Would you like to re-unpack it?",
+                                   "Re-unpack project?", wx.YES_NO | wx.ICON_QUESTION)
+            # Show the dialog and check the response
+            result = dlg.ShowModal()
+            # Destroy the dialog after using it
+            dlg.Destroy()
+
+            if result != wx.ID_YES:
+                # User chose not to re-unpack the project
+                self.append_message(f"Re-unpack operation aborted{nl}")
+                return
             # User wants to re-unpack the project
             self.esx_project_unpacked = False
-            self.unpack_esx()
-        else:
-            # User chose not to re-unpack the project
-            self.append_message(f"Re-unpack operation aborted{nl}")
-        # Destroy the dialog after using it
+
+        if self.get_single_specific_file_type('.esx'):
+            self.run_action('Unpack', unpack_filter=UNPACK_EVERYTHING)
+
+    def on_batch(self, event):
+        esx_filepaths = self.get_multiple_specific_file_type('.esx')
+        if not esx_filepaths:
+            return
+
+        action_names = list(BATCH_ACTIONS)
+        dlg = wx.MultiChoiceDialog(self, f"Actions to run, in this order, on each of the {len(esx_filepaths)} .esx file(s)", "Batch", action_names)
+        dlg.SetSelections([action_names.index(action) for action in DEFAULT_BATCH_ACTIONS])
+        result = dlg.ShowModal()
+        actions = [action_names[index] for index in dlg.GetSelections()]
         dlg.Destroy()
+        if result != wx.ID_OK or not actions:
+            return
+
+        try:
+            options = default_options(
+                verbose=self.verbose_log_menu_item.IsChecked(),
+                profile=self.project_profile_dropdown.GetStringSelection(),
+                script=self.ap_rename_script_dropdown.GetStringSelection(),
+                boundary=self.rename_aps_boundary_separator,
+                icon_size=int(self.ap_icon_size_text_box.GetValue()),
+                label_size=int(self.ap_name_label_size_text_box.GetValue()),
+                crop_size=int(self.zoomed_ap_crop_text_box.GetValue()),
+            )
+        except ValueError:
+            wx.MessageBox("Please enter a valid number", "Error", wx.OK | wx.ICON_ERROR)
+            return
+
+        # Projects run in their own processes, each logging to OUTPUT beside its .esx
+        self.run_action('Batch', run_batch, (esx_filepaths, actions, options, self.append_message), exclusive=True, cancellable=True)
 
     def on_backup(self, event):
         if not self.esx_filepath:
             if not self.get_single_specific_file_type('.esx'):
                 return
-        backup_esx(self.working_directory, self.esx_project_name, self.esx_filepath, self.append_message)
+        self.run_action('Backup', backup_esx, (self.working_directory, self.esx_project_name, self.esx_filepath, self.append_message))
+
+    def on_compare_esx(self, event):
+        if not self.get_single_specific_file_type('.esx'):
+            return
+
+        wildcard = "Ekahau Project file (*.esx)|*.esx"
+        dlg = wx.FileDialog(self, f"Choose an .esx file to compare against {self.esx_filepath.name}",
+                            defaultDir=str(self.working_directory), wildcard=wildcard,
+                            style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST)
+        if dlg.ShowModal() == wx.ID_OK:
+            self.on_clear_log(None)
+            self.run_action('Compare', diff_esx_projects, (self.esx_filepath, dlg.GetPath(), self.append_message))
+        dlg.Destroy()
+
+    def on_restore_backup(self, event):
+        default_dir = ''
+        if self.working_directory and self.esx_project_name:
+            backup_folder = backup_folder_path(self.working_directory, self.esx_project_name)
+            if backup_folder.exists():
+                default_dir = str(backup_folder)
+
+        wildcard = f"BadgerWiFi backup (*{BACKUP_MANIFEST_SUFFIX})|*{BACKUP_MANIFEST_SUFFIX}"
+        dlg = wx.FileDialog(self, "Choose a backup to restore", defaultDir=default_dir, wildcard=wildcard,
+                            style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST)
+        if dlg.ShowModal() == wx.ID_OK:
+            self.run_action('Restore backup', restore_esx_backup, (dlg.GetPath(), self.append_message))
+        dlg.Destroy()
 
     def on_validate(self, event):
-        if not self.basic_checks():
+        if not self.archive_checks():
             return
-        validate_esx(self.working_directory, self.esx_project_name, self.append_message, self.esx_required_tag_keys, self.esx_optional_tag_keys)
+        self.run_action('Validate', validate_esx, (self.working_directory, self.esx_project_name, self.append_message, self.esx_required_tag_keys, self.esx_optional_tag_keys, self.get_esx_project()), unpack_filter=self.archive_unpack_filter(UNPACK_JSON_ONLY))
 
     def on_summarise(self, event):
-        if not self.basic_checks():
+        if not self.archive_checks():
             return
-        summarise_esx(self.working_directory, self.esx_project_name, self.append_message)
+        self.run_action('Summarise', summarise_esx, (self.working_directory, self.esx_project_name, self.append_message, self.get_esx_project()), unpack_filter=self.archive_unpack_filter(UNPACK_JSON_ONLY))
 
     def on_create_ap_list(self, event):
-        if not self.basic_checks():
+        if not self.archive_checks():
             return
         if hasattr(self, 'current_project_profile_module'):
-            create_ap_list(self.working_directory, self.esx_project_name, self.append_message, self.current_profile_ap_list_module.create_custom_ap_list)
+            self.run_action('AP list', create_ap_list, (self.working_directory, self.esx_project_name, self.append_message, self.current_profile_ap_list_module.create_custom_ap_list, self.get_esx_project()), unpack_filter=self.archive_unpack_filter(UNPACK_JSON_ONLY))
 
     def on_copy_log(self, event):
+        self.message_sink.flush()
         if wx.TheClipboard.Open():
-            wx.TheClipboard.SetData(wx.TextDataObject(self.display_log.GetValue()))
+            wx.TheClipboard.SetData(wx.TextDataObject(self.display_log.history_text()))
             wx.TheClipboard.Close()
             self.append_message("Log copied to clipboard.")
         else:
@@ -914,6 +1040,13 @@ class MyFrame(wx.Frame):
     def on_exit(self, event):
         # Save the application state before exiting
         self.save_application_state(None)
+        self.close_esx_project()
+        self.executor.remove_listener(self.on_job_update)
+        self.action_jobs.clear()
+        self.executor.shutdown()
+        self.progress_panel.stop()
+        self.message_sink.stop()
+        self.display_log.close()
         print(f'Application state saved on exit, file list and dropdown options should be the same next time you launch the application')
         self.Close()
         self.Destroy()
@@ -947,20 +1080,18 @@ class MyFrame(wx.Frame):
         self.append_message(f"No file with {extension} present in file list.")
         return False
 
-    def unpack_esx(self):
-        if not self.esx_project_unpacked:
-            if not self.get_single_specific_file_type('.esx'):
-                return
-            unpack_esx_file(self.working_directory, self.esx_project_name, self.esx_filepath, self.append_message)
+    def unpack_needed(self, member_filter=UNPACK_EVERYTHING):
+        """Whether the project directory lacks members selected by member_filter, a wider or equal unpack covers it."""
+        return not self.esx_project_unpacked or not unpack_scope_covers(self.esx_unpacked_scope, member_filter)
+
+    def mark_project_unpacked(self, esx_filepath, member_filter):
+        # Ignore unpacks finishing after the project was reset or replaced
+        if esx_filepath == self.esx_filepath:
             self.esx_project_unpacked = True
-        return True
+            self.esx_unpacked_scope = member_filter
 
     def load_project_profile(self, profile_name):
-        profile_path = Path(__file__).resolve().parent / PROJECT_PROFILES_DIR / f"{profile_name}.py"
-        spec = importlib.util.spec_from_file_location(profile_name, str(profile_path))
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        return module
+        return self.load_module(PROJECT_PROFILES_DIR, profile_name)
 
     def on_project_profile_dropdown_selection(self, event):
         selected_profile = self.project_profile_dropdown.GetStringSelection()
@@ -987,24 +1118,19 @@ class MyFrame(wx.Frame):
         self.on_project_profile_dropdown_selection(event)
 
     def on_rename_aps(self, event):
-        if not self.basic_checks():
+        if not self.basic_checks(UNPACK_JSON_ONLY):
             return
         selected_script = self.available_ap_rename_scripts[self.ap_rename_script_dropdown.GetSelection()]
-        script_path = str(Path(__file__).resolve().parent / RENAME_APS_DIR / (selected_script + ".py"))
-
-        # Load and execute the selected script
-        script_module = SourceFileLoader(selected_script, script_path).load_module()
-        ap_renamer(self.working_directory, self.esx_project_name, script_module, self.append_message, self.rename_aps_boundary_separator)
+        script_module = self.load_module(RENAME_APS_DIR, selected_script)
+        self.run_action('Rename APs', ap_renamer, (self.working_directory, self.esx_project_name, script_module, self.append_message, self.rename_aps_boundary_separator), unpack_filter=UNPACK_JSON_ONLY, exclusive=True)
 
     def on_ap_rename_script_dropdown_selection(self, event):
         """Handle rename script selection change."""
         selected_script = self.ap_rename_script_dropdown.GetStringSelection()
-        path_to_module = Path(__file__).resolve().parent / RENAME_APS_DIR / f'{selected_script}.py'
-
-        _, short_description = self.get_ap_rename_tooltips(selected_script)  # Ignore script_name
-        self.current_sorting_module = import_module_from_path(selected_script, path_to_module)
+        script = get_plugin_registry(RENAME_APS_DIR).info(selected_script)
+        self.current_sorting_module = script.module
 
-        self.ap_rename_script_dropdown.SetToolTip(wx.ToolTip(short_description))
+        self.ap_rename_script_dropdown.SetToolTip(wx.ToolTip(script.short_description))
 
         if event:
             self.display_boundary_separator_message()
@@ -1012,18 +1138,10 @@ class MyFrame(wx.Frame):
 
     def display_boundary_separator_message(self):
         if hasattr(self.current_sorting_module, BOUNDARY_SEPARATION_WIDGET):
-            self.display_log.SetValue("")  # Clear the contents of the display_log
+            self.on_clear_log(None)
             self.append_message(f"Selected AP renaming script contains a configurable boundary parameter{nl}Boundary separator value: {self.rename_aps_boundary_separator}")
         else:
-            self.display_log.SetValue("")  # Clear the contents of the display_log
-
-    def get_ap_rename_tooltips(self, script_name):
-        script_path = str(Path(__file__).resolve().parent / RENAME_APS_DIR / f"{script_name}.py")
-        spec = importlib.util.spec_from_file_location(script_name, script_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        short_description = getattr(module, 'SHORT_DESCRIPTION', "No short description available.")
-        return script_name, short_description
+            self.on_clear_log(None)
 
     def update_esx_project_unpacked(self, unpacked):
         self.esx_project_unpacked = unpacked
@@ -1034,59 +1152,51 @@ class MyFrame(wx.Frame):
     def on_export_ap_images(self, event):
         if not self.basic_checks():
             return
-        export_ap_images.export_ap_images(self.working_directory, self.esx_project_name, self.append_message)
+        self.run_action('AP image export', export_ap_images.export_ap_images, (self.working_directory, self.esx_project_name, self.append_message), unpack_filter=UNPACK_EVERYTHING, cancellable=True)
 
     def on_export_note_images(self, event):
         if not self.basic_checks():
             return
-        export_note_images.export_note_images(self.working_directory, self.esx_project_name, self.append_message)
+        self.run_action('Note image export', export_note_images.export_note_images, (self.working_directory, self.esx_project_name, self.append_message), unpack_filter=UNPACK_EVERYTHING)
 
     def on_export_pds_maps(self, event):
-        if not self.basic_checks():
+        if not self.archive_checks(UNPACK_JSON_AND_FLOOR_PLANS):
             return
 
         # Retrieve the number from the custom AP icon size text box
         ap_icon_size = self.ap_icon_size_text_box.GetValue()
         ap_name_label_size = self.ap_name_label_size_text_box.GetValue()
 
-        # Clear the stop event flag before starting the thread
-        self.stop_event.clear()
-
         try:
             ap_icon_size = int(ap_icon_size)  # Convert the input to a float
             ap_name_label_size = int(ap_name_label_size)  # Ensure the AP name label size value is an integer
-            create_pds_maps_threaded(self.working_directory, self.esx_project_name, self.append_message, ap_icon_size, ap_name_label_size, self.stop_event)
+            self.run_map_creator('PDS maps', 'create_pds_maps', (self.working_directory, self.esx_project_name, self.append_message, ap_icon_size, ap_name_label_size))
 
         except ValueError:
             # Handle the case where the input is not a valid number
             wx.MessageBox("Please enter a valid number", "Error", wx.OK | wx.ICON_ERROR)
 
     def on_create_ap_location_maps(self, event):
-        if not self.basic_checks():
+        if not self.archive_checks(UNPACK_JSON_AND_FLOOR_PLANS):
             return
 
         # Retrieve the number from the custom AP icon size text box
         ap_icon_size = self.ap_icon_size_text_box.GetValue()
         ap_name_label_size = self.ap_name_label_size_text_box.GetValue()
 
-        # Clear the stop event flag before starting the thread
-        self.stop_event.clear()
-
         try:
             ap_icon_size = int(ap_icon_size)  # Ensure the AP icon size value is an integer
             ap_name_label_size = int(ap_name_label_size)  # Ensure the AP name label size value is an integer
-            create_custom_ap_location_maps_threaded(self.working_directory, self.esx_project_name, self.append_message, ap_icon_size, ap_name_label_size, self.stop_event)
+            self.run_map_creator('AP location maps', 'create_ap_location_maps', (self.working_directory, self.esx_project_name, self.append_message, ap_icon_size, ap_name_label_size))
 
         except ValueError:
             # Handle the case where the input is not a valid number
             wx.MessageBox("Please enter a valid number", "Error", wx.OK | wx.ICON_ERROR)
 
     def on_create_zoomed_ap_maps(self, event):
-        if not self.basic_checks():
+        if not self.archive_checks(UNPACK_JSON_AND_FLOOR_PLANS):
             return
 
-        self.stop_event.clear()
-
         # Retrieve the number from the zoomed AP crop size text box
         zoomed_ap_crop_size = self.zoomed_ap_crop_text_box.GetValue()
         ap_icon_size = self.ap_icon_size_text_box.GetValue()
@@ -1095,20 +1205,20 @@ class MyFrame(wx.Frame):
         try:
             zoomed_ap_crop_size = int(zoomed_ap_crop_size)  # Convert the input to a float
             custom_ap_icon_size = int(ap_icon_size)  # Convert the input to a float
-            create_zoomed_ap_location_maps_threaded(self.working_directory, self.esx_project_name, self.append_message, zoomed_ap_crop_size, custom_ap_icon_size, ap_name_label_size, self.stop_event)
+            self.run_map_creator('Zoomed AP location maps', 'create_zoomed_ap_location_maps', (self.working_directory, self.esx_project_name, self.append_message, zoomed_ap_crop_size, custom_ap_icon_size, ap_name_label_size))
         except ValueError:
             # Handle the case where the input is not a valid number
             wx.MessageBox("Please enter a valid number", "Error", wx.OK | wx.ICON_ERROR)
 
     def on_export_blank_maps(self, event):
-        if not self.basic_checks():
+        if not self.basic_checks(UNPACK_JSON_AND_FLOOR_PLANS):
             return
-        extract_blank_maps(self.working_directory, self.esx_project_name, self.append_message)
+        self.run_action('Blank maps', extract_blank_maps, (self.working_directory, self.esx_project_name, self.append_message), unpack_filter=UNPACK_JSON_AND_FLOOR_PLANS, cancellable=True)
 
     def on_create_pds_project(self, event):
-        if not self.basic_checks():
+        if not self.archive_checks():
             return
-        create_pds_project_esx(self, self.append_message)
+        self.run_action('PDS project', create_pds_project_esx, (self.working_directory, self.esx_project_name, self.esx_filepath, getattr(self, 'project_profile_module', None), self.append_message, self.get_esx_project()), unpack_filter=self.archive_unpack_filter(UNPACK_JSON_ONLY))
 
     def on_tab_changed(self, event):
         # Get the index of the newly selected tab
@@ -1124,7 +1234,7 @@ class MyFrame(wx.Frame):
             self.get_single_specific_file_type('.esx')
         # Check that working directory and project name directories exist
         if self.working_directory and (self.working_directory / self.esx_project_name).exists():
-            rebundle_project(self.working_directory, self.esx_project_name, self.append_message)
+            self.run_action('Re-bundle', rebundle_project, (self.working_directory, self.esx_project_name, self.append_message))
 
     def drop_target_label_callback(self, hide=False):
         if hide:
@@ -1133,15 +1243,152 @@ class MyFrame(wx.Frame):
             self.drop_target_label.Show()
         self.panel.Refresh()  # Refresh the panel to reflect the change
 
-    def basic_checks(self):
+    def basic_checks(self, member_filter=UNPACK_EVERYTHING):
+        """Checks for actions reading the unpacked project, pass the same member_filter to run_action to unpack as part of the job."""
+        if self.unpack_needed(member_filter) and not self.get_single_specific_file_type('.esx'):
+            return False
+        self.on_clear_log(None)
+        return True
+
+    def archive_unpack_filter(self, member_filter=UNPACK_JSON_ONLY):
+        """The unpack an archive action needs, only when the project directory is in use and lacks members it reads."""
+        if self.esx_project_unpacked and self.unpack_needed(member_filter):
+            return member_filter
+        return None
+
+    def archive_checks(self, member_filter=UNPACK_JSON_ONLY):
+        """Checks for actions able to run straight off the .esx archive, no unpacking required."""
         if not self.esx_project_unpacked:
-            if not self.unpack_esx():
+            if not self.get_single_specific_file_type('.esx'):
+                return False
+            try:
+                self.get_esx_project()
+            except (OSError, zipfile.BadZipFile) as e:
+                self.append_message(f'Failed to open project file: {e}')
                 return False
         self.on_clear_log(None)
         return True
 
+    def get_esx_project(self):
+        """Return the EsxProject for the current .esx file, or None once the project has been unpacked."""
+        if self.esx_project_unpacked:
+            # Unpacked projects may contain manual edits, read from the project directory instead
+            return None
+        return self.project_cache.get_esx_project(self.esx_filepath)
+
+    def close_esx_project(self):
+        if not self.action_jobs:
+            self.project_cache.close()
+            return
+        # Cancelled jobs may still be reading the archive, close it once they have all finished
+        esx_project = self.project_cache.detach()
+        if esx_project is not None:
+            self.pending_project_closes.append(esx_project)
+
+    def close_pending_projects(self):
+        while self.pending_project_closes:
+            self.pending_project_closes.pop().close()
+
+    def run_action(self, name, target=None, args=(), kwargs=None, unpack_filter=None, exclusive=False, cancellable=False, memory_estimate=0, on_done=None):
+        """
+        Run target(*args, **kwargs) as a job so the UI stays responsive, returns the Job or None if it can't start yet.
+
+        With unpack_filter the project is first unpacked to that scope as part of the job, if it isn't already.
+        Exclusive jobs, and any job that unpacks, only start when nothing else is running and disable every
+        project action until they finish. Other jobs only disable the exclusive actions.
+        Cancellable targets are passed the job's stop_event. on_done(job) is called on the UI thread after success.
+        """
+        needs_unpack = unpack_filter is not None and self.unpack_needed(unpack_filter)
+        exclusive = exclusive or needs_unpack
+        if any(job_exclusive for job_exclusive, _ in self.action_jobs.values()) or (exclusive and self.action_jobs):
+            self.append_message(f"{name} can't start until the running job(s) have finished.")
+            return None
+
+        working_directory, project_name, esx_filepath = self.working_directory, self.esx_project_name, self.esx_filepath
+        kwargs = kwargs or {}
+        unpacked = []
+
+        def run(stop_event):
+            if needs_unpack:
+                if not unpack_esx_file(working_directory, project_name, esx_filepath, self.append_message, unpack_filter, stop_event=stop_event):
+                    return None
+                unpacked.append(unpack_filter)
+            if target is None or stop_event.is_set():
+                return None
+            if cancellable:
+                return target(*args, stop_event=stop_event, **kwargs)
+            return target(*args, **kwargs)
+
+        def on_finished(job):
+            if unpacked:
+                self.mark_project_unpacked(esx_filepath, unpacked[0])
+            if on_done and job.state == DONE and (unpacked or not needs_unpack):
+                on_done(job)
+
+        job = self.executor.submit(name, run, memory_estimate=memory_estimate)
+        self.action_jobs[job] = (exclusive, on_finished)
+        self.update_action_buttons()
+        return job
+
+    def run_map_creator(self, name, creator, args):
+        """
+        Run the map_creator module named creator through its function of the same name, admitted by the
+        executor once the memory to render the largest floor plan is available.
+        """
+        # Imported on first use, the map creators load PIL
+        creator_module = importlib.import_module(f'map_creator.{creator}')
+        from map_creator.map_creator_comon import estimate_render_memory
+        target = getattr(creator_module, creator)
+        esx_project = self.get_esx_project()
+        try:
+            project_dir = project_source(self.working_directory, self.esx_project_name, esx_project)
+            memory_estimate = estimate_render_memory(project_dir, creator_module.RENDER_IMAGES_HELD, self.append_message)
+        except (OSError, KeyError, ValueError):
+            # The project directory has not been unpacked yet, admit on worker slots alone
+            memory_estimate = 0
+        return self.run_action(name, target, args, {'esx_project': esx_project, 'progress_callback': self.progress_panel.post},
+                               unpack_filter=self.archive_unpack_filter(UNPACK_JSON_AND_FLOOR_PLANS), cancellable=True, memory_estimate=memory_estimate)
+
+    def on_action_finished(self, job):
+        # Runs on the UI thread once a job started by run_action has finished
+        self.progress_panel.job_ended(job.id)
+        entry = self.action_jobs.pop(job, None)
+        if not self.action_jobs:
+            self.close_pending_projects()
+        if entry is None:
+            return
+        self.update_action_buttons()
+        _, on_finished = entry
+        on_finished(job)
+
+    def update_action_buttons(self):
+        exclusive_running = any(job_exclusive for job_exclusive, _ in self.action_jobs.values())
+        for button in self.project_action_buttons:
+            button.Enable(not exclusive_running)
+        for button in self.exclusive_action_buttons:
+            button.Enable(not self.action_jobs)
+
     def on_abort_thread(self, event):
-        self.stop_event.set()
+        self.executor.cancel_all()
+
+    def on_job_update(self, job):
+        # Called from the executor's worker threads, append_message is thread safe
+        if job.is_finished:
+            wx.CallAfter(self.on_action_finished, job)
+        if job.state == QUEUED:
+            waiting = len(self.executor.active_jobs()) - 1
+            if waiting:
+                self.append_message(f'{job.name} queued behind {waiting} job(s)')
+        elif job.state == RUNNING:
+            self.append_message(f'{job.name} started', DETAIL)
+        elif job.state == DONE:
+            self.append_message(job.describe(), DETAIL)
+        elif job.state == CANCELLED:
+            self.append_message(f'{nl}{job.name} cancelled')
+        elif job.state == FAILED:
+            self.append_message(f'{nl}{job.describe()}')
+            if job.error_traceback:
+                self.append_message(job.error_traceback.rstrip(), DETAIL)
 
     def on_open_working_directory(self, event):
         if not self.esx_project_unpacked:
@@ -1167,8 +1414,16 @@ class MyFrame(wx.Frame):
         return result
 
     def on_visualise_ap_renaming(self, event):
-        if not self.basic_checks():
+        if not self.basic_checks(UNPACK_JSON_AND_FLOOR_PLANS):
             return
+        if self.unpack_needed(UNPACK_JSON_AND_FLOOR_PLANS):
+            # The visualiser is a window, open it back on the UI thread once the project is unpacked
+            self.run_action('Unpack', unpack_filter=UNPACK_JSON_AND_FLOOR_PLANS, on_done=lambda job: self.open_ap_renaming_visualiser())
+        else:
+            self.open_ap_renaming_visualiser()
+
+    def open_ap_renaming_visualiser(self):
+        from rename_aps.rename_visualiser import visualise_ap_renaming  # Imported on first use, matplotlib is slow to load
         visualise_ap_renaming(self.working_directory, self.esx_project_name, self.append_message, self)
 
     def update_boundary_separator_value(self, value):
@@ -1181,6 +1436,11 @@ class MyFrame(wx.Frame):
         self.on_ap_rename_script_dropdown_selection(None)
 
     def check_for_updates_on_startup(self):
+        # A job, so the request to GitHub and importing requests don't hold up the window appearing
+        self.executor.submit('Check for updates', self.check_for_updates_in_background, cancellable=False)
+
+    def check_for_updates_in_background(self):
+        from admin import check_for_updates
         try:
             latest_sha = check_for_updates.get_latest_commit_sha()
             local_commit_sha = check_for_updates.get_git_commit_sha()
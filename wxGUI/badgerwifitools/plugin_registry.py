@@ -0,0 +1,88 @@
+# plugin_registry.py
+
+import os
+import threading
+import importlib.util
+from pathlib import Path
+
+from common import file_signature
+from common import BOUNDARY_SEPARATION_WIDGET
+
+DEFAULT_IGNORE_FILES = ("_", "common")
+
+
+class PluginInfo:
+    """A loaded plugin module and the metadata the GUI reads from it, valid while its file signature is unchanged."""
+
+    def __init__(self, name, path, signature, module):
+        self.name = name
+        self.path = path
+        self.signature = signature
+        self.module = module
+        self.one_liner_description = getattr(module, 'ONE_LINER_DESCRIPTION', None)
+        self.short_description = getattr(module, 'SHORT_DESCRIPTION', "No short description available.")
+        self.boundary_separator = hasattr(module, BOUNDARY_SEPARATION_WIDGET)
+
+
+class PluginRegistry:
+    """
+    The plugin scripts in one directory (rename scripts, project profiles, detail views...).
+
+    The directory is only listed again when its mtime changes, i.e. a script was added, removed or renamed.
+    Each module is executed once and reused until its file's mtime or size changes, then reloaded.
+    """
+
+    def __init__(self, directory, ignore_files=DEFAULT_IGNORE_FILES):
+        self.directory = Path(__file__).resolve().parent / directory
+        self.ignore_files = tuple(ignore_files)
+        self._names = None
+        self._names_signature = None
+        self._plugins = {}
+        self._lock = threading.RLock()  # Reentrant, a plugin may use the registry while it is being executed
+
+    def names(self):
+        """Sorted script names, file names without .py, excluding names starting with ignore_files."""
+        with self._lock:
+            signature = file_signature(self.directory)
+            if self._names is None or signature != self._names_signature:
+                self._names = sorted(filename[:-3] for filename in os.listdir(self.directory)
+                                     if filename.endswith(".py") and not filename.startswith(self.ignore_files))
+                self._names_signature = signature
+                # Forget plugins whose file has gone
+                for name in set(self._plugins) - set(self._names):
+                    del self._plugins[name]
+            return list(self._names)
+
+    def info(self, name):
+        """PluginInfo for a script, executing its file only if it is new or has changed since it was loaded."""
+        path = self.directory / f"{name}.py"
+        with self._lock:
+            signature = file_signature(path)
+            plugin = self._plugins.get(name)
+            if plugin is None or plugin.signature != signature:
+                plugin = PluginInfo(name, path, signature, self._execute(name, path))
+                self._plugins[name] = plugin
+            return plugin
+
+    def load(self, name):
+        return self.info(name).module
+
+    @staticmethod
+    def _execute(name, path):
+        spec = importlib.util.spec_from_file_location(name, str(path))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_plugin_registry(directory, ignore_files=DEFAULT_IGNORE_FILES):
+    """The registry shared by the GUI, the visualiser and the launcher for a plugin directory."""
+    key = (directory, tuple(ignore_files))
+    with _registries_lock:
+        if key not in _registries:
+            _registries[key] = PluginRegistry(directory, ignore_files)
+        return _registries[key]
@@ -0,0 +1,202 @@
+# progress.py
+
+import json
+import time
+import itertools
+
+from job_executor import current_job
+
+# Minimum seconds between progress events sent for one job, phase changes and completion are always sent
+PROGRESS_MIN_INTERVAL = 0.1
+
+# Weight of the latest unit in the smoothed seconds per unit used for the ETA
+UNIT_TIME_SMOOTHING = 0.2
+
+JOB_TIMINGS_FILENAME = 'job_timings.jsonl'
+
+_job_numbers = itertools.count(1)
+
+
+class ProgressEvent:
+    """
+    A snapshot of a job's progress, sent by a ProgressTracker to a progress_callback.
+
+    job_id is the executor Job.id of the job sending it, or a 'name-number' string for work run outside the executor.
+    done and total count units (APs, images...) across the whole job, total is None when unknown.
+    phases lists (phase, units, seconds, bytes) for each completed phase, e.g. one per floor.
+    The final event has finished set, and cancelled too when the job was aborted part way.
+    """
+
+    __slots__ = ('job_id', 'job_name', 'phase', 'unit', 'done', 'total', 'bytes_done', 'unit_seconds', 'elapsed', 'finished', 'cancelled', 'phases')
+
+    def __init__(self, job_id, job_name, phase, unit, done, total, bytes_done, unit_seconds, elapsed, finished, cancelled, phases):
+        self.job_id = job_id
+        self.job_name = job_name
+        self.phase = phase
+        self.unit = unit
+        self.done = done
+        self.total = total
+        self.bytes_done = bytes_done
+        self.unit_seconds = unit_seconds
+        self.elapsed = elapsed
+        self.finished = finished
+        self.cancelled = cancelled
+        self.phases = phases
+
+    @property
+    def fraction(self):
+        """Share of the job done between 0 and 1, None when the total is unknown."""
+        if not self.total:
+            return None
+        return min(1.0, self.done / self.total)
+
+    @property
+    def rate(self):
+        """Units per second over the whole job so far."""
+        return self.done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes_done / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """Estimated seconds remaining from the smoothed time per unit, None when it can't be estimated."""
+        if self.finished:
+            return 0.0
+        if not self.total or self.unit_seconds is None:
+            return None
+        return max(0, self.total - self.done) * self.unit_seconds
+
+    def describe(self):
+        """One line summary for a status label, e.g. 'Level 1: 40/120 APs, 12.5 APs/s, 0:06 remaining'."""
+        count = f'{self.done}/{self.total}' if self.total else f'{self.done}'
+        parts = [f'{self.phase}: {count} {self.unit}s' if self.phase else f'{count} {self.unit}s']
+        if self.done and self.elapsed > 0:
+            parts.append(f'{self.rate:.1f} {self.unit}s/s')
+        if self.bytes_done:
+            parts.append(f'{self.bytes_per_second / 1048576:.1f} MB/s')
+        if self.cancelled:
+            parts.append(f'cancelled after {format_seconds(self.elapsed)}')
+        elif self.finished:
+            parts.append(f'done in {format_seconds(self.elapsed)}')
+        elif self.eta is not None:
+            parts.append(f'{format_seconds(self.eta)} remaining')
+        return ', '.join(parts)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def format_seconds(seconds):
+    """Seconds as m:ss, or h:mm:ss from an hour."""
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}:{minutes:02}:{seconds:02}' if hours else f'{minutes}:{seconds:02}'
+
+
+class ProgressTracker:
+    """
+    Emit ProgressEvents for a long running job from its worker thread.
+
+    Call phase() as each stage starts (e.g. per floor), advance() per unit of work, and finish() at the end,
+    finish(cancelled=True) when the job is aborted. Events are rate limited to PROGRESS_MIN_INTERVAL.
+    progress_callback may be None, timings are still recorded. Events carry the id of the executor job
+    the tracker was created in, unless job_id is given.
+    """
+
+    def __init__(self, progress_callback, job_name, total=None, unit='item', min_interval=PROGRESS_MIN_INTERVAL, job_id=None):
+        self.progress_callback = progress_callback
+        self.job_name = job_name
+        if job_id is None:
+            job = current_job()
+            job_id = job.id if job is not None else f'{job_name}-{next(_job_numbers)}'
+        self.job_id = job_id
+        self.total = total
+        self.unit = unit
+        self.min_interval = min_interval
+        self.done = 0
+        self.bytes_done = 0
+        self.unit_seconds = None
+        self.phase_name = None
+        self.phases = []
+        self.finished = False
+        self.cancelled = False
+
+        self._started = self._last_unit = self._phase_started = time.perf_counter()
+        self._phase_done = 0
+        self._phase_bytes = 0
+        self._last_emit = None
+
+    def phase(self, name, total=None):
+        """Start a new phase, ending the current one. total adds units to the job total if it was not known upfront."""
+        self._end_phase()
+        self.phase_name = name
+        if total is not None and self.total is None:
+            self.total = total
+        self._emit(force=True)
+
+    def advance(self, units=1, nbytes=0):
+        """Record units of work done and bytes written or read since the last call."""
+        now = time.perf_counter()
+        if units:
+            seconds_per_unit = (now - self._last_unit) / units
+            if self.unit_seconds is None:
+                self.unit_seconds = seconds_per_unit
+            else:
+                self.unit_seconds += UNIT_TIME_SMOOTHING * (seconds_per_unit - self.unit_seconds)
+        self._last_unit = now
+        self.done += units
+        self.bytes_done += nbytes
+        self._phase_done += units
+        self._phase_bytes += nbytes
+        self._emit(now=now)
+
+    def finish(self, cancelled=False):
+        """Send the final event, only the first call counts."""
+        if self.finished:
+            return
+        self._end_phase()
+        self.finished = True
+        self.cancelled = cancelled
+        self._emit(force=True)
+
+    def _end_phase(self):
+        now = time.perf_counter()
+        if self.phase_name is not None:
+            self.phases.append((self.phase_name, self._phase_done, now - self._phase_started, self._phase_bytes))
+        self.phase_name = None
+        self._phase_started = self._last_unit = now
+        self._phase_done = 0
+        self._phase_bytes = 0
+
+    def _emit(self, force=False, now=None):
+        if self.progress_callback is None:
+            return
+        now = time.perf_counter() if now is None else now
+        if not force and self._last_emit is not None and now - self._last_emit < self.min_interval:
+            return
+        self._last_emit = now
+        self.progress_callback(ProgressEvent(
+            self.job_id, self.job_name, self.phase_name, self.unit, self.done, self.total, self.bytes_done,
+            self.unit_seconds, now - self._started, self.finished, self.cancelled, list(self.phases),
+        ))
+
+
+def record_job_timings(file_path, event):
+    """Append a finished job's per-phase timings to a JSON lines file."""
+    record = {
+        'job': event.job_name,
+        'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'unit': event.unit,
+        'units': event.done,
+        'seconds': round(event.elapsed, 3),
+        'bytes': event.bytes_done,
+        'phases': [
+            {'phase': phase, 'units': units, 'seconds': round(seconds, 3), 'bytes': nbytes,
+             'units_per_second': round(units / seconds, 2) if seconds > 0 else None}
+            for phase, units, seconds, nbytes in event.phases
+        ],
+    }
+    with open(file_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
@@ -0,0 +1,74 @@
+# progress_panel.py
+
+from collections import deque
+
+import wx
+
+PROGRESS_REFRESH_INTERVAL_MS = 200
+GAUGE_RANGE = 1000
+
+
+class ProgressPanel(wx.Panel):
+    """
+    Progress bar and status line for the most recent ProgressEvent.
+
+    post is the progress_callback handed to workers, it only stores the event so it is safe from any thread.
+    A timer redraws the latest event on the UI thread, on_finished is called there with each finished event.
+    """
+
+    def __init__(self, parent, on_finished=None):
+        wx.Panel.__init__(self, parent)
+        self.on_finished = on_finished
+        self._latest = None
+        self._shown = None
+        self._finished = deque()
+
+        self.gauge = wx.Gauge(self, range=GAUGE_RANGE, style=wx.GA_HORIZONTAL | wx.GA_SMOOTH)
+        self.status = wx.StaticText(self, label='')
+
+        sizer = wx.BoxSizer(wx.HORIZONTAL)
+        sizer.Add(self.gauge, 1, wx.ALIGN_CENTER_VERTICAL | wx.RIGHT, 5)
+        sizer.Add(self.status, 2, wx.ALIGN_CENTER_VERTICAL)
+        self.SetSizer(sizer)
+
+        self.timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, lambda event: self.refresh(), self.timer)
+        self.timer.Start(PROGRESS_REFRESH_INTERVAL_MS)
+
+    def post(self, event):
+        self._latest = event
+        if event.finished:
+            self._finished.append(event)
+
+    def refresh(self):
+        while self._finished:
+            event = self._finished.popleft()
+            if self.on_finished:
+                self.on_finished(event)
+
+        event = self._latest
+        if event is None or event is self._shown:
+            return
+        self._shown = event
+
+        fraction = event.fraction
+        if fraction is None and not event.finished:
+            self.gauge.Pulse()
+        else:
+            self.gauge.SetValue(int((1.0 if fraction is None else fraction) * GAUGE_RANGE))
+        self.status.SetLabel(event.describe())
+
+    def job_ended(self, job_id):
+        """Clear the bar if it still shows an unfinished event from a job that has ended, e.g. one that failed."""
+        event = self._latest
+        if event is not None and event.job_id == job_id and not event.finished:
+            self.reset()
+
+    def reset(self):
+        self._latest = self._shown = None
+        self.gauge.SetValue(0)
+        self.status.SetLabel('')
+
+    def stop(self):
+        self.timer.Stop()
+        self.refresh()
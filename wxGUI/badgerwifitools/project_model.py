@@ -0,0 +1,359 @@
+# project_model.py
+
+import threading
+from functools import cached_property
+from pathlib import Path
+
+from common import load_json
+from common import file_signature
+from common import model_antenna_split
+from common import create_floor_plans_dict
+from common import create_tag_keys_dict
+from common import create_simulated_radios_dict
+from common import create_antenna_types_dict
+from common import create_notes_dict
+from common import FIVE_GHZ_RADIO_ID
+
+from esx_project import EsxProject
+
+DUPLICATE_AP_NAME_MARKER = '_BW_DUPLICATE_AP_NAME_'
+
+
+class FloorPlan:
+    __slots__ = ('id', 'name', 'width', 'height', 'meters_per_unit', 'image_id', 'bitmap_image_id', 'access_points', 'raw')
+
+    def __init__(self, floor):
+        self.id = floor['id']
+        self.name = floor['name']
+        self.width = floor.get('width')
+        self.height = floor.get('height')
+        self.meters_per_unit = floor.get('metersPerUnit')
+        self.image_id = floor.get('imageId')
+        self.bitmap_image_id = floor.get('bitmapImageId')
+        self.access_points = []
+        self.raw = floor
+
+    def __repr__(self):
+        return f"FloorPlan('{self.name}')"
+
+
+class Radio:
+    __slots__ = ('id', 'access_point_id', 'index', 'raw')
+
+    def __init__(self, radio):
+        self.id = radio.get('id')
+        self.access_point_id = radio['accessPointId']
+        self.index = radio['accessPointIndex']
+        self.raw = radio
+
+    def get(self, key, default=None):
+        return self.raw.get(key, default)
+
+    def __repr__(self):
+        return f"Radio('{self.access_point_id}', {self.index})"
+
+
+class Tag:
+    __slots__ = ('key_id', 'key', 'value')
+
+    def __init__(self, key_id, key, value):
+        self.key_id = key_id
+        self.key = key
+        self.value = value
+
+    def __repr__(self):
+        return f"Tag('{self.key}', '{self.value}')"
+
+
+class Note:
+    __slots__ = ('id', 'text', 'image_ids', 'raw')
+
+    def __init__(self, note):
+        self.id = note['id']
+        self.text = note.get('text', '')
+        self.image_ids = note.get('imageIds', [])
+        self.raw = note
+
+    def __repr__(self):
+        return f"Note('{self.id}')"
+
+
+class AccessPoint:
+    """An AP with its floor, radios, tags and notes resolved, raw is the untouched accessPoints.json record."""
+    __slots__ = ('id', 'name', 'unique_name', 'model', 'antenna', 'antenna_description', 'color', 'floor', 'radios', 'tags', 'notes', 'raw')
+
+    def __init__(self, ap, unique_name, floor, radios, tags, notes):
+        self.id = ap['id']
+        self.name = ap['name']
+        self.unique_name = unique_name
+        self.model, self.antenna, self.antenna_description = model_antenna_split(ap.get('model', ''))
+        self.color = ap.get('color', 'none')
+        self.floor = floor
+        self.radios = radios
+        self.tags = tags
+        self.notes = notes
+        self.raw = ap
+
+    @property
+    def five_ghz_radio(self):
+        return self.radios.get(FIVE_GHZ_RADIO_ID)
+
+    def five_ghz_value(self, key, default=''):
+        """Read a setting from the 5 GHz radio, e.g. antennaTilt, antennaMounting or antennaHeight."""
+        radio = self.radios.get(FIVE_GHZ_RADIO_ID)
+        return radio.get(key, default) if radio else default
+
+    @property
+    def floor_name(self):
+        return self.floor.name if self.floor else None
+
+    @property
+    def tag_values(self):
+        """Tag values keyed by tag key name."""
+        return {tag.key: tag.value for tag in self.tags}
+
+    def __repr__(self):
+        return f"AccessPoint('{self.name}')"
+
+
+class ProjectModel:
+    """
+    In-memory model of a project shared by all actions.
+
+    Each record type is built on first access from the parsed JSON, cross-references such as
+    AP to floor, AP to radios by index and AP to notes are resolved once.
+    The dict builders from common are also available as properties for code that still expects them.
+    """
+
+    def __init__(self, project_dir, message_callback=print):
+        self.project_dir = project_dir
+        self.message_callback = message_callback
+        self._sources = {}
+
+    def _source_signature(self, filename):
+        # Members of an open EsxProject cannot change, ProjectCache reopens the archive when the .esx does
+        if isinstance(self.project_dir, EsxProject):
+            return None
+        return file_signature(Path(self.project_dir) / filename)
+
+    def _load(self, filename):
+        # Stat before reading so a write racing the load is seen as a change
+        self._sources[filename] = self._source_signature(filename)
+        return load_json(self.project_dir, filename, self.message_callback)
+
+    def is_current(self):
+        """True while none of the JSON files this model was built from have changed on disk, checked by stat only."""
+        return all(self._source_signature(filename) == signature for filename, signature in self._sources.items())
+
+    # Raw JSON documents
+    @cached_property
+    def floor_plans_json(self):
+        return self._load('floorPlans.json')
+
+    @cached_property
+    def access_points_json(self):
+        return self._load('accessPoints.json')
+
+    @cached_property
+    def simulated_radios_json(self):
+        return self._load('simulatedRadios.json')
+
+    @cached_property
+    def tag_keys_json(self):
+        return self._load('tagKeys.json')
+
+    @cached_property
+    def notes_json(self):
+        return self._load('notes.json')
+
+    @cached_property
+    def antenna_types_json(self):
+        return self._load('antennaTypes.json')
+
+    @cached_property
+    def project_configuration_json(self):
+        return self._load('projectConfiguration.json')
+
+    # Typed records
+    @cached_property
+    def floor_plans(self):
+        """FloorPlan objects keyed by floor plan id."""
+        if not self.floor_plans_json:
+            return {}
+        return {floor['id']: FloorPlan(floor) for floor in self.floor_plans_json['floorPlans']}
+
+    @cached_property
+    def tag_keys(self):
+        """Tag key names keyed by tag key id."""
+        if not self.tag_keys_json:
+            return {}
+        return {tag_key['id']: tag_key['key'] for tag_key in self.tag_keys_json.get('tagKeys', [])}
+
+    @cached_property
+    def notes(self):
+        """Note objects keyed by note id."""
+        if not self.notes_json:
+            return {}
+        return {note['id']: Note(note) for note in self.notes_json.get('notes', [])}
+
+    @cached_property
+    def radios(self):
+        """Radio objects keyed by AP id, then by accessPointIndex."""
+        radios = {}
+        if self.simulated_radios_json:
+            for radio in self.simulated_radios_json['simulatedRadios']:
+                radio = Radio(radio)
+                radios.setdefault(radio.access_point_id, {})[radio.index] = radio
+        return radios
+
+    @cached_property
+    def access_points(self):
+        """AccessPoint objects in accessPoints.json order, duplicate names are given a unique_name."""
+        access_points = []
+        if not self.access_points_json:
+            return access_points
+
+        floor_plans = self.floor_plans
+        radios = self.radios
+        tag_keys = self.tag_keys
+        notes = self.notes
+        name_count = {}
+
+        for ap in self.access_points_json['accessPoints']:
+            unique_name = ap['name']
+            if unique_name in name_count:
+                name_count[unique_name] += 1
+                unique_name = f"{unique_name}{DUPLICATE_AP_NAME_MARKER}{name_count[unique_name]}"
+            else:
+                name_count[unique_name] = 1
+
+            floor = floor_plans.get(ap['location']['floorPlanId'])
+            access_point = AccessPoint(
+                ap,
+                unique_name,
+                floor,
+                radios.get(ap['id'], {}),
+                [Tag(tag['tagKeyId'], tag_keys.get(tag['tagKeyId']), tag['value']) for tag in ap.get('tags', [])],
+                [notes[note_id] for note_id in ap.get('noteIds', []) if note_id in notes]
+            )
+            if floor:
+                floor.access_points.append(access_point)
+            access_points.append(access_point)
+        return access_points
+
+    @cached_property
+    def access_points_by_id(self):
+        return {ap.id: ap for ap in self.access_points}
+
+    def access_points_on_floor(self, floor_id):
+        """APs placed on a floor, in accessPoints.json order."""
+        self.access_points  # Ensure the floor cross-references have been resolved
+        floor = self.floor_plans.get(floor_id)
+        return floor.access_points if floor else []
+
+    @cached_property
+    def ap_table(self):
+        """Columnar APTable of every AP, for vectorised selection, sorting and range checks."""
+        from ap_table import APTable  # numpy is only loaded once a project is analysed
+        return APTable.from_model(self)
+
+    @cached_property
+    def spatial_index(self):
+        """FloorSpatialIndex per floor plan id, queries return rows of ap_table."""
+        from spatial_index import build_floor_indexes
+        return build_floor_indexes(self.ap_table, self.floor_plans)
+
+    # The dict shapes built by common, for project profiles and helpers that expect them
+    @cached_property
+    def floor_plans_dict(self):
+        return create_floor_plans_dict(self.floor_plans_json)
+
+    @cached_property
+    def tag_keys_dict(self):
+        return create_tag_keys_dict(self.tag_keys_json)
+
+    @cached_property
+    def simulated_radio_dict(self):
+        return create_simulated_radios_dict(self.simulated_radios_json)
+
+    @cached_property
+    def antenna_types_dict(self):
+        return create_antenna_types_dict(self.antenna_types_json)
+
+    @cached_property
+    def notes_dict(self):
+        return create_notes_dict(self.notes_json)
+
+
+class ProjectCache:
+    """
+    The project a session is working on, held between actions so each JSON document is parsed once.
+
+    The .esx archive is kept open and reopened only when its size or modification time changes.
+    Unpacked projects are checked per JSON file when the model is requested.
+    """
+
+    def __init__(self):
+        self.esx_project = None
+        self._esx_signature = None
+
+    def get_esx_project(self, esx_filepath):
+        """Return the open EsxProject for a .esx file, reopening it if the file has changed on disk."""
+        esx_filepath = Path(esx_filepath)
+        signature = file_signature(esx_filepath)
+        if self.esx_project is None or self.esx_project.esx_filepath != esx_filepath or signature != self._esx_signature:
+            self.close()
+            self.esx_project = EsxProject(esx_filepath)
+            self._esx_signature = signature
+        return self.esx_project
+
+    def detach(self):
+        """Stop holding the open EsxProject and return it without closing it, the caller closes it."""
+        esx_project = self.esx_project
+        self.esx_project = None
+        self._esx_signature = None
+        clear_project_model_cache()
+        return esx_project
+
+    def close(self):
+        """Close the archive and drop every cached model."""
+        if self.esx_project is not None:
+            self.esx_project.close()
+            self.esx_project = None
+            self._esx_signature = None
+        clear_project_model_cache()
+
+
+_model_cache = {}
+_model_cache_lock = threading.Lock()
+
+
+def _project_key(project_dir):
+    if isinstance(project_dir, EsxProject):
+        return 'esx', id(project_dir)
+    return 'dir', str(Path(project_dir).resolve())
+
+
+def clear_project_model_cache():
+    with _model_cache_lock:
+        _model_cache.clear()
+
+
+def load_project_model(project_dir, message_callback=print):
+    """
+    Return the ProjectModel for an unpacked project directory or an EsxProject.
+
+    The model is reused across actions until one of the JSON documents it was built from changes on disk.
+    """
+    project_key = _project_key(project_dir)
+    with _model_cache_lock:
+        model = _model_cache.get(project_key)
+        if model is not None and model.is_current():
+            model.message_callback = message_callback
+            return model
+
+        model = ProjectModel(project_dir, message_callback)
+        # Only the most recent project is kept, a session works on one project at a time
+        _model_cache.clear()
+        _model_cache[project_key] = model
+        return model
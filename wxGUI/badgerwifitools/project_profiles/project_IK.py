@@ -11,6 +11,11 @@ from common import get_tx_power_from_ies
 from common import wifi_channel_dict
 from common import get_channel_from_ies
 from common import get_wifi_band_from_ie_channel
+from common import get_channel_width_from_ies
+from common import get_standards_from_ies
+from common import get_rsn_from_ies
+from common import get_bss_load_from_ies
+from common import get_country_from_ies
 
 from common import UNKNOWN, FIVE_GHZ_RADIO_ID
 
@@ -95,6 +100,11 @@ def create_custom_measured_ap_list(access_points_json, floor_plans_dict, tag_key
             '2.4 Security / Standards': get_security_and_technologies(measured_radios.get('two', {})),
             '2.4 Tx Power': get_tx_power_from_ies(measured_radios.get('two', {})),
             '2.4 Supported Rates': get_supported_rates_from_ies(measured_radios.get('two', {})),
+            '2.4 Channel from IEs': get_channel_from_ies(measured_radios.get('two', {})),
+            '2.4 Width from IEs': get_channel_width_from_ies(measured_radios.get('two', {})),
+            '2.4 Standards from IEs': get_standards_from_ies(measured_radios.get('two', {})),
+            '2.4 RSN': get_rsn_from_ies(measured_radios.get('two', {})),
+            '2.4 Stations / Utilisation': get_bss_load_from_ies(measured_radios.get('two', {})),
             ' -  ': '',
             '5 GHz': extract_frequency_channel_and_width(measured_radios, 'five')[0][1],
             '5 Ch Primary': wifi_channel_dict.get(extract_frequency_channel_and_width(measured_radios, 'five')[0][0], ''),
@@ -102,9 +112,13 @@ def create_custom_measured_ap_list(access_points_json, floor_plans_dict, tag_key
             '5 SSIDs': get_ssid_and_mac(measured_radios.get('five', {})),
             '5 Security / Standards': get_security_and_technologies(measured_radios.get('five', {})),
             '5 Channel from IEs': get_channel_from_ies(measured_radios.get('five', {})),
-            '5 WiFi Band': get_wifi_band_from_ie_channel(measured_radios.get('five', {})),
+            '5 WiFi Band': get_wifi_band_from_ie_channel(measured_radios.get('five', {}), 'five'),
             '5 Tx Power': get_tx_power_from_ies(measured_radios.get('five', {})),
             '5 Supported Rates': get_supported_rates_from_ies(measured_radios.get('five', {})),
+            '5 Width from IEs': get_channel_width_from_ies(measured_radios.get('five', {})),
+            '5 Standards from IEs': get_standards_from_ies(measured_radios.get('five', {})),
+            '5 RSN': get_rsn_from_ies(measured_radios.get('five', {})),
+            '5 Stations / Utilisation': get_bss_load_from_ies(measured_radios.get('five', {})),
             '  - ': '',
             '6 GHz': extract_frequency_channel_and_width(measured_radios, 'six')[0][1],
             '6 Ch Primary': wifi_channel_dict.get(extract_frequency_channel_and_width(measured_radios, 'six')[0][0], ''),
@@ -113,7 +127,13 @@ def create_custom_measured_ap_list(access_points_json, floor_plans_dict, tag_key
             '6 Security / Standards': get_security_and_technologies(measured_radios.get('six', {})),
             '6 Tx Power': get_tx_power_from_ies(measured_radios.get('six', {})),
             '6 Supported Rates': get_supported_rates_from_ies(measured_radios.get('six', {})),
+            '6 Channel from IEs': get_channel_from_ies(measured_radios.get('six', {})),
+            '6 Width from IEs': get_channel_width_from_ies(measured_radios.get('six', {})),
+            '6 Standards from IEs': get_standards_from_ies(measured_radios.get('six', {})),
+            '6 RSN': get_rsn_from_ies(measured_radios.get('six', {})),
+            '6 Stations / Utilisation': get_bss_load_from_ies(measured_radios.get('six', {})),
             '   -': '',
+            'Country': get_country_from_ies(*measured_radios.values()),
             'Colour': ekahau_color_dict.get(ap.get('color', 'None'), UNKNOWN),
             'Floor': floor_plans_dict.get(ap.get('location', {}).get('floorPlanId'), {}).get('name', UNKNOWN),
             'flagged as My AP': ap.get('mine', UNKNOWN),
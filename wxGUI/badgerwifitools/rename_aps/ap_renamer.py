@@ -5,7 +5,7 @@ from pathlib import Path
 from common import load_json
 from common import create_floor_plans_dict
 
-from common import save_and_move_json
+from common import save_json_records
 from common import re_bundle_project
 from common import rename_aps
 
@@ -18,7 +18,7 @@ def ap_renamer(working_directory, project_name, script_module, message_callback,
     message_callback(f'Renaming APs within project: {project_name}')
 
     floor_plans_json = load_json(working_directory / project_name, 'floorPlans.json', message_callback)
-    access_points_json = load_json(working_directory / project_name, 'accessPoints.json', message_callback)
+    access_points_json = load_json(working_directory / project_name, 'accessPoints.json', message_callback, mutable=True)
 
     floor_plans_dict = create_floor_plans_dict(floor_plans_json)
 
@@ -32,11 +32,8 @@ def ap_renamer(working_directory, project_name, script_module, message_callback,
     renamed_aps_project_dir = output_dir / 'RENAMED APs'
     renamed_aps_project_dir.mkdir(parents=True, exist_ok=True)
 
-    # Convert access_points_json from dictionary to list
-    # We do this to make the sorting procedure more simple
-    access_points_list = []
-    for ap in access_points_json['accessPoints']:
-        access_points_list.append(ap)
+    # access_points_json is our own copy, sort its list of APs directly rather than duplicating it
+    access_points_list = access_points_json['accessPoints']
 
     if hasattr(script_module, 'SAR'):
         script_module.run(working_directory, project_name, message_callback)
@@ -52,11 +49,12 @@ def ap_renamer(working_directory, project_name, script_module, message_callback,
         access_points_list_renamed = rename_aps(access_points_list_sorted, message_callback, floor_plans_dict)
 
         # Save and Move the Updated JSON
-        updated_access_points_json = {'accessPoints': access_points_list_renamed}
-        save_and_move_json(updated_access_points_json, working_directory / project_name / 'accessPoints.json')
+        save_json_records(access_points_list_renamed, working_directory / project_name / 'accessPoints.json', 'accessPoints')
 
         output_project_name = f"{project_name}{RENAMED_APS_PROJECT_APPENDIX}"
 
         # Re-bundle into .esx File
-        re_bundle_project(project_dir, renamed_aps_project_dir, output_project_name)
+        # Only accessPoints.json has changed, all other members are copied from the original .esx
+        re_bundle_project(project_dir, renamed_aps_project_dir, output_project_name,
+                          source_esx=Path(working_directory) / f'{project_name}.esx', modified_members=['accessPoints.json'])
         completion_message(message_callback, output_project_name)
@@ -1,6 +1,6 @@
 # simple, x-axis.py
 
-from common import model_sort_order
+from ap_table import APTable
 
 ONE_LINER_DESCRIPTION = 'APs sorted by: floor, model, y-axis value'
 
@@ -35,6 +35,5 @@ resulting AP names should look like:
     AP-001, AP-002, AP-003..."""
 
 def sort_logic(access_points_list, floor_plans_dict):
-    return sorted(access_points_list, key=lambda i: (floor_plans_dict.get(i['location']['floorPlanId']).get('name'),
-                                                     model_sort_order.get(i['model'], i['model']),
-                                                     i['location']['coord']['y']))
+    table = APTable.from_access_points(access_points_list, floor_plans_dict)
+    return table.take(table.sort_order('floor_name', 'model', 'y'))
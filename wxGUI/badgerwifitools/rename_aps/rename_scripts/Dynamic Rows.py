@@ -1,6 +1,8 @@
 # Fuzzy y-axis.py
 
-from common import model_sort_order
+import numpy as np
+
+from ap_table import APTable
 
 SPLIT_BOUNDARY_GROUPS = True  # flag attribute
 BOUNDARY_SEPARATOR = True  # flag attribute
@@ -54,54 +56,24 @@ resulting AP names will look like:
 
 
 def sort_logic(access_points_list, floor_plans_dict, y_axis_threshold, output_boundaries=False):
+    table = APTable.from_access_points(access_points_list, floor_plans_dict)
+
     # First, sort APs by floor name (via floorPlanId) and then by y-coordinate.
-    access_points_list_sorted = sorted(access_points_list, key=lambda ap: (
-                                    floor_plans_dict.get(ap['location']['floorPlanId']).get('name', ''),
-                                    ap['location']['coord']['y']))
-
-    # Initialize variables for grouping.
-    y_coordinate_group = 1
-    current_group_start_y = None
-    current_floor_id = None
-    boundaries = []
-
-    for ap in access_points_list_sorted:
-        ap_floor_id = ap['location']['floorPlanId']  # Get the current AP's floor ID.
-
-        if current_floor_id is None:
-            # First AP in the list defines the start of the first group and floor.
-            current_floor_id = ap_floor_id
-
-        elif current_floor_id != ap_floor_id:
-            # Floor has changed, reset the group counter and update current floor ID.
-            y_coordinate_group = 1
-            current_group_start_y = None  # Reset group start Y coordinate.
-            current_floor_id = ap_floor_id
-
-        if current_group_start_y is None:
-            # This is either the first AP or the first AP of a new floor.
-            current_group_start_y = ap['location']['coord']['y']
-            boundaries.append(current_group_start_y)
-
-        elif (ap['location']['coord']['y'] - current_group_start_y) > y_axis_threshold:
-            while (ap['location']['coord']['y'] - current_group_start_y) > y_axis_threshold:
-                # Current AP's y-coordinate is outside the threshold of the current group; start a new group.
-                y_coordinate_group += 1
-                current_group_start_y += y_axis_threshold
-                boundaries.append(current_group_start_y)
-
-        # Assign group ID to the AP.
-        ap['location']['coord']['y_group'] = y_coordinate_group
-
-    # Final sorting by group ID, then x-coordinate within each group.
-    access_points_list_sorted = sorted(access_points_list_sorted,
-                                       key=lambda i: (floor_plans_dict.get(i['location']['floorPlanId']).get('name'),
-                                                      model_sort_order.get(i['model'], i['model']),
-                                                      i['location']['coord']['y_group'],
-                                                      i['location']['coord']['x']))
+    rows = table.sort_order('floor_name', 'y')
+
+    # Band each floor's APs into rows of y_axis_threshold pixels, numbered from 1 per floor.
+    groups, boundaries = table.coordinate_groups('y', y_axis_threshold, rows)
+
+    # Assign group ID to the AP.
+    for ap, group in zip(table.take(rows), groups.tolist()):
+        ap['location']['coord']['y_group'] = group
+
+    # Final sorting by floor, model, group ID, then x-coordinate within each group.
+    group_by_row = np.empty(len(table), dtype=np.int64)
+    group_by_row[rows] = groups
+    access_points_list_sorted = table.take(table.sort_order('floor_name', 'model', group_by_row, 'x', rows=rows))
 
     if output_boundaries:
-        # Calculate the center for the last group.
         return access_points_list_sorted, boundaries, 'horizontal'
 
     return access_points_list_sorted
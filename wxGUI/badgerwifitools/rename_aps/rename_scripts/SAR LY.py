@@ -4,7 +4,7 @@ from pathlib import Path
 from common import load_json
 from common import create_floor_plans_dict
 
-from common import save_and_move_json
+from common import save_json_records
 from common import re_bundle_project
 from common import rename_process_completion_message as completion_message
 
@@ -79,7 +79,7 @@ def run(working_directory, project_name, message_callback):
 
     # Load JSON data
     floor_plans_json = load_json(project_dir, 'floorPlans.json', message_callback)
-    access_points_json = load_json(project_dir, 'accessPoints.json', message_callback)
+    access_points_json = load_json(project_dir, 'accessPoints.json', message_callback, mutable=True)
     tag_keys_json = load_json(project_dir, 'tagKeys.json', message_callback)
 
     # Process data
@@ -93,10 +93,11 @@ def run(working_directory, project_name, message_callback):
     rename_aps(sorted_access_points, tag_keys_dict, floor_plans_dict, message_callback)
 
     # Save and Move the Updated JSON
-    updated_access_points_json = {'accessPoints': sorted_access_points}
-    save_and_move_json(updated_access_points_json, project_dir / 'accessPoints.json')
+    save_json_records(sorted_access_points, project_dir / 'accessPoints.json', 'accessPoints')
 
     output_project_name = f"{project_name}{RENAMED_APS_PROJECT_APPENDIX}"
     # Re-bundle into .esx File
-    re_bundle_project(project_dir, renamed_aps_project_dir, output_project_name)
+    # Only accessPoints.json has changed, all other members are copied from the original .esx
+    re_bundle_project(project_dir, renamed_aps_project_dir, output_project_name,
+                      source_esx=Path(working_directory) / f'{project_name}.esx', modified_members=['accessPoints.json'])
     completion_message(message_callback, output_project_name)
@@ -1,5 +1,7 @@
 # simple, x-axis.py
 
+from ap_table import APTable
+
 ONE_LINER_DESCRIPTION = 'APs sorted by: floor, x-axis value'
 
 SHORT_DESCRIPTION = f"""Intended for simulated APs
@@ -29,8 +31,8 @@ resulting AP names should look like:
 
 
 def sort_logic(access_points_list, floor_plans_dict):
-    return sorted(access_points_list, key=lambda i: (floor_plans_dict.get(i['location']['floorPlanId']).get('name'),
-                                                     i['location']['coord']['x']))
+    table = APTable.from_access_points(access_points_list, floor_plans_dict)
+    return table.take(table.sort_order('floor_name', 'x'))
 
 
 def connections_colour_logic():
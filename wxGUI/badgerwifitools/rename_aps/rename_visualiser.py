@@ -4,14 +4,12 @@ import platform
 import matplotlib.image as mpimg
 from matplotlib.backends.backend_wxagg import FigureCanvasWxAgg as FigureCanvas
 from matplotlib.figure import Figure
-from pathlib import Path
 
-from common import import_module_from_path
 from common import load_json
 from common import create_floor_plans_dict
 from common import model_antenna_split
 
-from common import discover_available_scripts
+from plugin_registry import get_plugin_registry
 from common import RENAME_APS_DIR
 from common import BOUNDARY_SEPARATION_WIDGET
 
@@ -71,7 +69,7 @@ class MapDialog(wx.Dialog):
         self.map_choice = wx.Choice(self.panel, choices=sorted(self.map_data.keys()))
         self.map_choice.Bind(wx.EVT_CHOICE, self.on_map_change)
 
-        self.rename_choice = wx.Choice(self.panel, choices=discover_available_scripts(RENAME_APS_DIR))
+        self.rename_choice = wx.Choice(self.panel, choices=get_plugin_registry(RENAME_APS_DIR).names())
         self.rename_choice.Bind(wx.EVT_CHOICE, self.on_rename_change)
         self.rename_choice.SetSelection(self.current_dropdown_selection)
 
@@ -122,19 +120,20 @@ class MapDialog(wx.Dialog):
         # pass index back to parent
         self.update_ap_rename_script_dropdown_selection(self.rename_choice.GetSelection())
 
-        path_to_module = Path(__file__).resolve().parent.parent / RENAME_APS_DIR / f'{selected_script}.py'
-        self.current_sorting_module = import_module_from_path(selected_script, path_to_module)
+        # Scripts are executed once and reused until their file changes, so switching is instant
+        script = get_plugin_registry(RENAME_APS_DIR).info(selected_script)
+        self.current_sorting_module = script.module
 
         # Update the one-liner label with a description from the selected module
-        if hasattr(self.current_sorting_module, 'ONE_LINER_DESCRIPTION'):
-            self.rename_script_one_liner.SetLabel(self.current_sorting_module.ONE_LINER_DESCRIPTION)
+        if script.one_liner_description:
+            self.rename_script_one_liner.SetLabel(script.one_liner_description)
 
         # Remove existing rename_aps_boundary_separator widgets if they exist
         if hasattr(self, 'spin_ctrl'):
             self.remove_boundary_separation_widget()
 
         # Add the boundary separator widgets only if the selected script has attribute "visualise_boundaries"
-        if hasattr(self.current_sorting_module, BOUNDARY_SEPARATION_WIDGET):
+        if script.boundary_separator:
             self.add_boundary_separation_widget()
 
         self.panel.Layout()  # Re-layout the panel to reflect changes
@@ -357,7 +356,7 @@ def create_reversed_floor_plans_dict(floor_plans_json):
 
 def visualise_ap_renaming(working_directory, project_name, message_callback, parent_frame):
     floor_plans_json = load_json(working_directory / project_name, 'floorPlans.json', message_callback)
-    access_points_json = load_json(working_directory / project_name, 'accessPoints.json', message_callback)
+    access_points_json = load_json(working_directory / project_name, 'accessPoints.json', message_callback, mutable=True)
 
     floor_plans_dict_reversed = create_reversed_floor_plans_dict(floor_plans_json)
     floor_plans_dict = create_floor_plans_dict(floor_plans_json)
@@ -20,9 +20,13 @@ setup(
         'python-docx>=1.1.0',
         'docx2pdf>=0.1.8',
         'pillow>=10.2.0',
+        'numpy>=1.24.0',
         'matplotlib>=3.8.3',
         'requests>=2.31.0',
     ],
+    extras_require={
+        'fast-json': ['orjson>=3.9.0'],
+    },
     classifiers=[
         'Intended Audience :: End Users/Desktop',
         'License :: OSI Approved :: MIT License',
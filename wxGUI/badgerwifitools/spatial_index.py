@@ -0,0 +1,124 @@
+# spatial_index.py
+
+import math
+
+import numpy as np
+
+# Grid cell edge in metres, a few metres keeps radius queries for typical AP spacing to the 3x3 cells around a point
+DEFAULT_CELL_SIZE = 5.0
+
+
+class FloorSpatialIndex:
+    """
+    Uniform grid over the APs of one floor, in metres.
+
+    Built from pixel coordinates scaled by the floor's metersPerUnit. Queries return the row
+    indices the index was built with, e.g. rows of an APTable, nearest first where distance matters.
+    A floor without a metersPerUnit is indexed in pixels and scaled is False, its distances aren't metres.
+    """
+
+    def __init__(self, rows, x, y, meters_per_unit=None, cell_size=DEFAULT_CELL_SIZE):
+        self.rows = np.asarray(rows)
+        self.scaled = bool(meters_per_unit)
+        self.meters_per_unit = meters_per_unit if self.scaled else 1.0
+        self.cell_size = cell_size
+        self.x = np.asarray(x, dtype=np.float64) * self.meters_per_unit
+        self.y = np.asarray(y, dtype=np.float64) * self.meters_per_unit
+
+        # Group point positions by grid cell, each cell maps to the positions of its points
+        cell_x = np.floor(self.x / cell_size).astype(np.int64)
+        cell_y = np.floor(self.y / cell_size).astype(np.int64)
+        order = np.lexsort((cell_y, cell_x))
+        cells = np.stack((cell_x[order], cell_y[order]), axis=1)
+        boundaries = np.flatnonzero(np.any(cells[1:] != cells[:-1], axis=1)) + 1
+        self.cells = {
+            (int(group[0, 0]), int(group[0, 1])): positions
+            for group, positions in zip(np.split(cells, boundaries), np.split(order, boundaries))
+            if len(positions)
+        }
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def from_table(cls, table, floor_id, meters_per_unit=None, cell_size=DEFAULT_CELL_SIZE):
+        """Index the APs of one floor of an APTable."""
+        rows = table.on_floor(floor_id)
+        return cls(rows, table.x[rows], table.y[rows], meters_per_unit, cell_size)
+
+    def _cell(self, x, y):
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def _positions_in_cells(self, min_cell_x, min_cell_y, max_cell_x, max_cell_y):
+        # Walk the occupied cells when the range covers more cells than exist
+        if (max_cell_x - min_cell_x + 1) * (max_cell_y - min_cell_y + 1) > len(self.cells):
+            found = [positions for (cell_x, cell_y), positions in self.cells.items()
+                     if min_cell_x <= cell_x <= max_cell_x and min_cell_y <= cell_y <= max_cell_y]
+        else:
+            found = [self.cells[cell] for cell in
+                     ((cell_x, cell_y) for cell_x in range(min_cell_x, max_cell_x + 1) for cell_y in range(min_cell_y, max_cell_y + 1))
+                     if cell in self.cells]
+        return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+    def _positions_in_box(self, min_x, min_y, max_x, max_y):
+        positions = self._positions_in_cells(*self._cell(min_x, min_y), *self._cell(max_x, max_y))
+        inside = (self.x[positions] >= min_x) & (self.x[positions] <= max_x) & (self.y[positions] >= min_y) & (self.y[positions] <= max_y)
+        return positions[inside]
+
+    def within_radius(self, x, y, radius):
+        """Rows within radius metres of the point (x, y) in metres, nearest first. Returns (rows, distances)."""
+        positions = self._positions_in_box(x - radius, y - radius, x + radius, y + radius)
+        distances = np.hypot(self.x[positions] - x, self.y[positions] - y)
+        inside = distances <= radius
+        positions, distances = positions[inside], distances[inside]
+        order = np.argsort(distances, kind='stable')
+        return self.rows[positions[order]], distances[order]
+
+    def in_box(self, min_x, min_y, max_x, max_y):
+        """Rows inside a bounding box given in metres."""
+        return self.rows[np.sort(self._positions_in_box(min_x, min_y, max_x, max_y))]
+
+    def nearest(self, x, y, k=1):
+        """Up to k rows nearest the point (x, y) in metres. Returns (rows, distances)."""
+        if not len(self):
+            return self.rows[:0], np.zeros(0)
+        k = min(k, len(self))
+        cell_x, cell_y = self._cell(x, y)
+        ring = 0
+        while True:
+            positions = self._positions_in_cells(cell_x - ring, cell_y - ring, cell_x + ring, cell_y + ring)
+            if len(positions) >= k:
+                distances = np.hypot(self.x[positions] - x, self.y[positions] - y)
+                kth_distance = np.partition(distances, k - 1)[k - 1]
+                # Points outside the searched rings are at least ring cells away, stop once that is beyond the kth distance
+                if kth_distance <= ring * self.cell_size or len(positions) == len(self):
+                    rows, distances = self.within_radius(x, y, kth_distance)
+                    return rows[:k], distances[:k]
+            ring += 1
+
+    def pairs_within(self, distance):
+        """
+        Every pair of rows no more than distance metres apart, each pair reported once.
+
+        Returns a list of (row_a, row_b, distance) sorted by distance. Only the cells around each cell are compared.
+        """
+        reach = max(1, math.ceil(distance / self.cell_size))
+        pairs = []
+        for (cell_x, cell_y), positions in self.cells.items():
+            candidates = self._positions_in_cells(cell_x - reach, cell_y - reach, cell_x + reach, cell_y + reach)
+            distances = np.hypot(self.x[positions][:, None] - self.x[candidates][None, :],
+                                 self.y[positions][:, None] - self.y[candidates][None, :])
+            # positions < candidates reports each pair once, from whichever cell holds the lower position
+            close = (distances <= distance) & (positions[:, None] < candidates[None, :])
+            for i, j in zip(*np.nonzero(close)):
+                pairs.append((int(self.rows[positions[i]]), int(self.rows[candidates[j]]), float(distances[i, j])))
+        return sorted(pairs, key=lambda pair: pair[2])
+
+
+def build_floor_indexes(table, floor_plans, cell_size=DEFAULT_CELL_SIZE):
+    """A FloorSpatialIndex for every floor holding APs, keyed by floor plan id. floor_plans maps ids to FloorPlan records."""
+    indexes = {}
+    for floor_id in table.floor_ids:
+        floor = floor_plans.get(floor_id)
+        indexes[floor_id] = FloorSpatialIndex.from_table(table, floor_id, floor.meters_per_unit if floor else None, cell_size)
+    return indexes
@@ -0,0 +1,127 @@
+# startup_profile.py
+
+"""
+Startup timing report, enabled with --profile-startup or the BADGERWIFI_PROFILE_STARTUP environment variable.
+
+Times every first import made after start() and the startup milestones passed to mark(). finish() prints
+the slowest imports and appends the run to a JSON lines file, so a regression shows against earlier runs.
+"""
+
+import os
+import sys
+import json
+import time
+import builtins
+import threading
+
+STARTUP_PROFILE_FLAG = '--profile-startup'
+STARTUP_PROFILE_ENV = 'BADGERWIFI_PROFILE_STARTUP'
+STARTUP_TIMINGS_FILENAME = 'startup_timings.jsonl'
+
+# Imports listed in the printed report, slowest first
+STARTUP_REPORT_TOP = 25
+
+_profiler = None
+
+
+class StartupProfiler:
+    """
+    Wrap builtins.__import__ to time each module the first time it is imported.
+
+    imports maps module name to [inclusive seconds, self seconds], self time excludes the imports it triggered.
+    For 'from package import module' the submodule is timed under its full name.
+    Only the starting thread's imports are timed, imports on job threads don't delay the window.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports = {}
+        self.marks = []
+        self._stack = []
+        self._thread_id = threading.get_ident()
+        self._original_import = builtins.__import__
+
+    def install(self):
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        if builtins.__import__ is self._import:
+            builtins.__import__ = self._original_import
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter() - self.started))
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or threading.get_ident() != self._thread_id:
+            return self._original_import(name, globals, locals, fromlist, level)
+        candidates = [name] + [f'{name}.{attribute}' for attribute in fromlist or () if attribute != '*']
+        new_names = [candidate for candidate in candidates if candidate not in sys.modules]
+        if not new_names:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            inclusive = time.perf_counter() - started
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += inclusive
+            # fromlist entries that are attributes rather than submodules never appear in sys.modules
+            imported = [candidate for candidate in new_names if candidate in sys.modules]
+            if imported:
+                self.imports[imported[0]] = [inclusive, inclusive - nested]
+
+    def report(self, top=STARTUP_REPORT_TOP):
+        lines = ['### STARTUP PROFILE ###']
+        lines.extend(f'{seconds * 1000:8.0f} ms  {label}' for label, seconds in self.marks)
+        total_import = sum(self_seconds for _, self_seconds in self.imports.values())
+        lines.append(f'{len(self.imports)} modules imported in {total_import * 1000:.0f} ms, slowest first:')
+        lines.append(f"{'inclusive':>10}  {'self':>8}  module")
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        lines.extend(f'{inclusive * 1000:7.1f} ms  {self_seconds * 1000:5.1f} ms  {name}' for name, (inclusive, self_seconds) in slowest)
+        return '\n'.join(lines)
+
+    def as_record(self):
+        return {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': sys.version.split()[0],
+            'marks': {label: round(seconds, 4) for label, seconds in self.marks},
+            'imports': {name: round(inclusive, 4) for name, (inclusive, _) in self.imports.items()},
+        }
+
+
+def startup_profile_requested(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    return STARTUP_PROFILE_FLAG in argv or os.environ.get(STARTUP_PROFILE_ENV, '').lower() not in ('', '0', 'false', 'no')
+
+
+def start():
+    """Start timing imports, call as early as possible, ideally before importing wx."""
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler()
+        _profiler.install()
+    return _profiler
+
+
+def mark(label):
+    """Record a startup milestone, does nothing unless profiling was started."""
+    if _profiler is not None:
+        _profiler.mark(label)
+
+
+def finish(log_dir=None, stream=None):
+    """Stop profiling, print the report and append it to log_dir/startup_timings.jsonl."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is None:
+        return None
+    profiler.uninstall()
+    print(profiler.report(), file=stream or sys.stderr)
+    if log_dir is not None:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        with open(log_dir / STARTUP_TIMINGS_FILENAME, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(profiler.as_record()) + '\n')
+    return profiler
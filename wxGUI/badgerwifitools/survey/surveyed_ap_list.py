@@ -4,12 +4,12 @@ from pathlib import Path
 from common import load_json
 from common import create_floor_plans_dict
 from common import create_tag_keys_dict
-from common import create_access_point_measurements_dict
-from common import create_measured_radios_dict
 from common import create_notes_dict
 
 from common import nl
 
+from measured_radio_index import MeasuredRadioIndex
+
 channel_bands = ['2.4', '5', '6']
 
 
@@ -26,6 +26,9 @@ narrow_fixed_width_cols =\
         [f'{band} Width' for band in channel_bands] +
         [f'{band} Tx Power' for band in channel_bands] +
         [f'{band} WiFi Band' for band in channel_bands] +
+        [f'{band} Width from IEs' for band in channel_bands] +
+        [f'{band} Standards from IEs' for band in channel_bands] +
+        [f'{band} Stations / Utilisation' for band in channel_bands] +
         ['Colour', 'hidden']
     )
 
@@ -33,6 +36,7 @@ wide_fixed_width_cols =\
     (
         [f'{band} Security / Standards' for band in channel_bands] +
         [f'{band} Channel from IEs' for band in channel_bands] +
+        [f'{band} RSN' for band in channel_bands] +
         ['flagged as My AP', 'manually positioned']
     )
 
@@ -101,8 +105,7 @@ def create_surveyed_ap_list(working_directory, project_name, create_custom_measu
     # Process data
     floor_plans_dict = create_floor_plans_dict(floor_plans_json)
     tag_keys_dict = create_tag_keys_dict(tag_keys_json)
-    access_point_measurements_dict = create_access_point_measurements_dict(access_point_measurements_json)
-    measured_radios_dict = create_measured_radios_dict(measured_radios_json, access_point_measurements_dict)
+    measured_radios_dict = MeasuredRadioIndex(measured_radios_json, access_point_measurements_json).as_measured_radios_dict()
     notes_dict = create_notes_dict(notes_json)
 
     surveyed_ap_list = create_custom_measured_ap_list(access_points_json, floor_plans_dict, tag_keys_dict, measured_radios_dict, notes_dict)
@@ -0,0 +1,153 @@
+# test_esx_archive.py
+#
+# Round trips through rebundle_esx_incremental. Set BADGERWIFI_TEST_ESX to the path of an Ekahau .esx
+# to also round trip a project saved by Ekahau, the generated archive below only mimics its layout.
+
+import io
+import os
+import sys
+import json
+import zlib
+import zipfile
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from esx_archive import member_record_span
+from esx_archive import rebundle_esx_incremental
+
+TEST_ESX_ENV = 'BADGERWIFI_TEST_ESX'
+
+# Smallest valid PNG, a 1x1 white pixel
+PNG_BYTES = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010802000000907753de'
+    '0000000c49444154789c63f8ffff3f0005fe02fe0def46b80000000049454e44ae426082'
+)
+
+
+class _Unseekable(io.RawIOBase):
+    """Write-only stream, ZipFile writes a data descriptor after each member it can't seek back over."""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+
+def write_sample_esx(path):
+    """A small archive laid out like an Ekahau project, including members with data descriptors."""
+    members = {
+        'project.json': json.dumps({'project': {'name': 'sample'}}).encode(),
+        'floorPlans.json': json.dumps({'floorPlans': [{'id': 'f1', 'name': 'Ground', 'imageId': 'i1'}]}).encode(),
+        'accessPoints.json': json.dumps({'accessPoints': [{'id': f'ap{n}', 'name': f'AP-{n:03}'} for n in range(50)]}).encode(),
+        'image-i1': PNG_BYTES,
+        'notes.json': json.dumps({'notes': []}).encode(),
+    }
+    stream = _Unseekable()
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for member_name, data in members.items():
+            compress_type = zipfile.ZIP_STORED if member_name.startswith('image-') else zipfile.ZIP_DEFLATED
+            zip_file.writestr(member_name, data, compress_type=compress_type)
+    Path(path).write_bytes(stream.buffer.getvalue())
+    return members
+
+
+def read_members(path):
+    with zipfile.ZipFile(path) as zip_file:
+        assert zip_file.testzip() is None
+        return {info.filename: zip_file.read(info) for info in zip_file.infolist()}
+
+
+def raw_records(path):
+    """Local record bytes of each member, header, compressed data and data descriptor."""
+    records = {}
+    with zipfile.ZipFile(path) as zip_file, open(path, 'rb') as f:
+        for info in zip_file.infolist():
+            record_start, _, record_end = member_record_span(zip_file, info)
+            f.seek(record_start)
+            records[info.filename] = f.read(record_end - record_start)
+    return records
+
+
+class RebundleRoundTripTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name)
+        self.source_esx = self.directory / 'sample.esx'
+        self.members = write_sample_esx(self.source_esx)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_unchanged_project_is_byte_identical(self):
+        output_esx = self.directory / 'copy.esx'
+        copied_count, written_count = rebundle_esx_incremental(self.source_esx, output_esx, {})
+
+        self.assertEqual((copied_count, written_count), (len(self.members), 0))
+        self.assertEqual(output_esx.read_bytes(), self.source_esx.read_bytes())
+
+    def test_modified_added_and_removed_members(self):
+        replacement_path = self.directory / 'replacement.json'
+        replacement_path.write_bytes(json.dumps({'accessPoints': []}).encode())
+        modified = {
+            'accessPoints.json': replacement_path,
+            'image-new': PNG_BYTES,
+            'unicode-ñame.json': b'{}' * 1000,
+        }
+        output_esx = self.directory / 'modified.esx'
+        copied_count, written_count = rebundle_esx_incremental(self.source_esx, output_esx, modified, {'notes.json'})
+
+        self.assertEqual((copied_count, written_count), (3, 3))
+        expected = dict(self.members)
+        del expected['notes.json']
+        expected['accessPoints.json'] = replacement_path.read_bytes()
+        expected['image-new'] = PNG_BYTES
+        expected['unicode-ñame.json'] = b'{}' * 1000
+        self.assertEqual(read_members(output_esx), expected)
+        # Member order is kept, replaced members stay in place and added ones go last
+        self.assertEqual(list(read_members(output_esx)), ['project.json', 'floorPlans.json', 'accessPoints.json', 'image-i1',
+                                                          'image-new', 'unicode-ñame.json'])
+
+        # Untouched members are copied raw, data descriptors included
+        source_records, output_records = raw_records(self.source_esx), raw_records(output_esx)
+        for member_name in ('project.json', 'floorPlans.json', 'image-i1'):
+            self.assertEqual(output_records[member_name], source_records[member_name])
+
+        with zipfile.ZipFile(output_esx) as zip_file:
+            self.assertEqual(zip_file.getinfo('image-new').compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zip_file.getinfo('accessPoints.json').compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(zip_file.getinfo('accessPoints.json').CRC, zlib.crc32(expected['accessPoints.json']))
+
+    def test_rebundled_project_rebundles_again(self):
+        first_esx = self.directory / 'first.esx'
+        second_esx = self.directory / 'second.esx'
+        rebundle_esx_incremental(self.source_esx, first_esx, {'image-new': PNG_BYTES})
+        rebundle_esx_incremental(first_esx, second_esx, {})
+
+        self.assertEqual(second_esx.read_bytes(), first_esx.read_bytes())
+
+    @unittest.skipUnless(os.environ.get(TEST_ESX_ENV), f'set {TEST_ESX_ENV} to round trip an Ekahau .esx')
+    def test_ekahau_project_round_trip(self):
+        ekahau_esx = Path(os.environ[TEST_ESX_ENV])
+        output_esx = self.directory / 'ekahau.esx'
+        with zipfile.ZipFile(ekahau_esx) as zip_file:
+            first_json = next(name for name in zip_file.namelist() if name.endswith('.json'))
+            modified = {first_json: zip_file.read(first_json)}
+        rebundle_esx_incremental(ekahau_esx, output_esx, modified)
+
+        self.assertEqual(read_members(output_esx), read_members(ekahau_esx))
+        source_records, output_records = raw_records(ekahau_esx), raw_records(output_esx)
+        for member_name in source_records:
+            if member_name != first_json:
+                self.assertEqual(output_records[member_name], source_records[member_name])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+# test_information_elements.py
+#
+# parse_information_elements against hand-built beacon IE blobs, each element written out field by field.
+
+import sys
+import base64
+import struct
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from information_elements import parse_information_elements
+from information_elements import BAND_5_GHZ, BAND_6_GHZ, BSS_TRANSITION
+from common import lookup_wifi_band
+from common import get_wifi_band_from_ie_channel
+
+
+def element(element_id, body):
+    return bytes((element_id, len(body))) + bytes(body)
+
+
+def extension(extension_id, body):
+    return element(255, bytes((extension_id,)) + bytes(body))
+
+
+def suite(suite_type):
+    return b'\x00\x0f\xac' + bytes((suite_type,))
+
+
+def parse(*elements):
+    return parse_information_elements(base64.b64encode(b''.join(elements)).decode('ascii'))
+
+
+# Supported Rates, 6, 12 and 24 Mbps basic, 9, 18 and 36 Mbps supported
+OFDM_RATES = element(1, (0x8c, 0x12, 0x98, 0x24, 0xb0, 0x48))
+
+# HT and VHT Capabilities, only their presence is read
+HT_CAPABILITIES = element(45, bytes(26))
+VHT_CAPABILITIES = element(191, bytes(12))
+HE_CAPABILITIES = extension(35, bytes(21))
+EHT_CAPABILITIES = extension(108, bytes(12))
+
+
+def he_operation(parameters, primary_channel=None, control=0, vht_info=False, co_hosted=False):
+    """HE Operation: parameters (3), BSS color (1), basic HE-MCS and NSS set (2), then the optional fields in order."""
+    body = parameters.to_bytes(3, 'little') + b'\x01' + b'\xfc\xff'
+    if vht_info:
+        body += b'\x01\x2a\x00'
+    if co_hosted:
+        body += b'\x03'
+    if primary_channel is not None:
+        # Primary channel, control, CCFS0, CCFS1, minimum rate
+        body += bytes((primary_channel, control, 15, 15, 6))
+    return extension(36, body)
+
+
+def ht_operation(primary_channel, info):
+    # Primary channel, HT operation information (5), basic HT-MCS set (16)
+    return element(61, bytes((primary_channel, info)) + bytes(4) + bytes(16))
+
+
+def vht_operation(channel_width, ccfs0, ccfs1):
+    # Channel width, CCFS0, CCFS1, basic VHT-MCS and NSS set (2)
+    return element(192, bytes((channel_width, ccfs0, ccfs1)) + b'\xfc\xff')
+
+
+class SixGhzBeaconTest(unittest.TestCase):
+
+    def test_he_only_beacon(self):
+        # No DS Parameter Set or HT Operation, the channel is only in the HE 6 GHz Operation Information
+        record = parse(OFDM_RATES, HE_CAPABILITIES, he_operation(1 << 17, primary_channel=5, control=0x03))
+
+        self.assertEqual(record.primary_channel, 5)
+        self.assertEqual(record.band, BAND_6_GHZ)
+        self.assertEqual(record.channel_width, 160)
+        self.assertEqual(record.standards, ['HE'])
+        self.assertIsNone(record.channel)
+        self.assertIsNone(record.ht_primary_channel)
+        self.assertEqual(record.supported_rates, {6.0: True, 9.0: False, 12.0: True, 18.0: False, 24.0: True, 36.0: False})
+        # 6 GHz channel 5 is in UNII-5, not the 2.4 GHz channel of the same number
+        self.assertEqual(lookup_wifi_band(record.primary_channel, record.band), 'UNII-5')
+
+    def test_optional_fields_before_6ghz_information(self):
+        # VHT Operation Information and the co-hosted BSSID indicator come first when flagged
+        parameters = 1 << 14 | 1 << 15 | 1 << 17
+        record = parse(he_operation(parameters, primary_channel=101, control=0x02, vht_info=True, co_hosted=True))
+
+        self.assertEqual(record.he_6ghz_primary_channel, 101)
+        self.assertEqual(record.he_6ghz_width, 80)
+        self.assertEqual(lookup_wifi_band(record.primary_channel, record.band), 'UNII-6')
+
+    def test_eht_width(self):
+        # EHT Operation: parameters with the information present flag, basic EHT-MCS and NSS set (4), control, CCFS0, CCFS1
+        eht_operation = extension(106, b'\x01' + bytes(4) + bytes((0x04, 31, 63)))
+        record = parse(HE_CAPABILITIES, EHT_CAPABILITIES, he_operation(1 << 17, primary_channel=37, control=0x03), eht_operation)
+
+        self.assertEqual(record.channel_width, 320)
+        self.assertEqual(record.he_6ghz_width, 160)
+        self.assertEqual(record.standards, ['HE', 'EHT'])
+
+    def test_band_column_of_surveyed_ap_list(self):
+        radios = {
+            'b': {'id': 'm2', 'mac': 'b', 'informationElements': base64.b64encode(he_operation(1 << 17, primary_channel=149)).decode('ascii')},
+            'a': {'id': 'm1', 'mac': 'a', 'informationElements': base64.b64encode(he_operation(1 << 17, primary_channel=1)).decode('ascii')},
+        }
+        self.assertEqual(get_wifi_band_from_ie_channel(radios), 'UNII-5\nUNII-7')
+
+
+class VhtBeaconTest(unittest.TestCase):
+
+    def test_80mhz(self):
+        # HT 40 MHz above channel 36, VHT 80 MHz centred on channel 42
+        record = parse(OFDM_RATES, HT_CAPABILITIES, ht_operation(36, 0x05), VHT_CAPABILITIES, vht_operation(1, 42, 0))
+
+        self.assertEqual(record.primary_channel, 36)
+        self.assertEqual(record.band, BAND_5_GHZ)
+        self.assertEqual(record.ht_width, 40)
+        self.assertEqual(record.vht_width, 80)
+        self.assertEqual(record.channel_width, 80)
+        self.assertEqual(record.standards, ['HT', 'VHT'])
+        self.assertEqual(lookup_wifi_band(record.primary_channel, record.band), 'UNII-1')
+
+    def test_160mhz(self):
+        # 160 MHz signalled with CCFS0 at the 80 MHz segment and CCFS1 at the 160 MHz centre
+        record = parse(HT_CAPABILITIES, ht_operation(100, 0x05), VHT_CAPABILITIES, vht_operation(1, 106, 114))
+
+        self.assertEqual(record.channel_width, 160)
+        self.assertEqual(lookup_wifi_band(record.primary_channel, record.band), 'UNII-2e')
+
+    def test_20_40mhz_defers_to_ht(self):
+        record = parse(ht_operation(149, 0x07), vht_operation(0, 0, 0))
+
+        self.assertIsNone(record.vht_width)
+        self.assertEqual(record.channel_width, 40)
+
+
+class Wpa3BeaconTest(unittest.TestCase):
+
+    def test_rsn_with_mfp_required(self):
+        # Version 1, group CCMP, one pairwise suite, two AKM suites, capabilities MFPR | MFPC, PMKID count 0, group management BIP
+        rsn = element(48, struct.pack('<H', 1) + suite(4)
+                      + struct.pack('<H', 1) + suite(4)
+                      + struct.pack('<H', 2) + suite(8) + suite(9)
+                      + struct.pack('<H', 0x00c0) + struct.pack('<H', 0) + suite(6))
+        country = element(7, b'US ' + bytes((36, 4, 23, 149, 5, 30, 201, 1, 0)))
+        bss_load = element(11, struct.pack('<HBH', 7, 128, 0))
+        tpc_report = element(35, bytes((20, 0)))
+        extended_capabilities = element(127, (1 << BSS_TRANSITION).to_bytes(3, 'little'))
+        vendor = element(221, b'\x00\x50\xf2\x02\x01\x01')
+
+        record = parse(element(3, b'\x24'), rsn, country, bss_load, tpc_report, extended_capabilities, vendor)
+
+        self.assertEqual(record.group_cipher, 'CCMP-128')
+        self.assertEqual(record.pairwise_ciphers, ['CCMP-128'])
+        self.assertEqual(record.akm_suites, ['SAE', 'FT-SAE'])
+        self.assertTrue(record.mfp_required)
+        self.assertTrue(record.mfp_capable)
+        self.assertEqual(record.security, 'SAE, FT-SAE / CCMP-128 / MFP required')
+        # The operating extension triplet, first byte 201 and above, is not a subband
+        self.assertEqual((record.country, record.country_environment), ('US', ' '))
+        self.assertEqual(record.country_channels, [(36, 4, 23), (149, 5, 30)])
+        self.assertEqual((record.station_count, record.channel_utilization), (7, 50))
+        self.assertEqual((record.tx_power, record.link_margin), (20, 0))
+        self.assertTrue(record.has_extended_capability(BSS_TRANSITION))
+        self.assertEqual(record.vendor_ouis, ['00:50:F2'])
+
+    def test_open_network(self):
+        self.assertEqual(parse(element(3, b'\x06')).security, 'Open')
+
+
+class TruncatedElementTest(unittest.TestCase):
+
+    def test_element_running_past_the_blob(self):
+        # The RSN element claims 20 bytes and only 6 follow, the walk stops there and keeps what came before
+        blob = element(3, b'\x0b') + bytes((48, 20)) + struct.pack('<H', 1) + suite(4)
+        record = parse(blob)
+
+        self.assertEqual(record.primary_channel, 11)
+        self.assertEqual(record.band, 'two')
+        self.assertIsNone(record.group_cipher)
+        self.assertEqual(record.security, 'Open')
+
+    def test_suite_count_beyond_the_element(self):
+        # Three pairwise suites announced and one present, reading stops at the element end rather than the next element
+        rsn = element(48, struct.pack('<H', 1) + suite(4) + struct.pack('<H', 3) + suite(4))
+        record = parse(rsn, element(3, b'\x01'))
+
+        self.assertEqual(record.pairwise_ciphers, ['CCMP-128'])
+        self.assertEqual(record.akm_suites, [])
+        self.assertIsNone(record.mfp_required)
+        self.assertEqual(record.channel, 1)
+
+    def test_he_operation_too_short_for_6ghz_information(self):
+        body = (1 << 17).to_bytes(3, 'little') + b'\x01\xfc\xff' + bytes((37, 0x03))
+        record = parse(extension(36, body))
+
+        self.assertIsNone(record.he_6ghz_primary_channel)
+        self.assertIsNone(record.band)
+
+    def test_trailing_byte(self):
+        record = parse(element(3, b'\x06'), b'\x30')
+
+        self.assertEqual(record.channel, 6)
+
+
+if __name__ == '__main__':
+    unittest.main()